@@ -1,17 +1,14 @@
-from flask import Flask, render_template_string, request
-import math
+from flask import Flask, jsonify, render_template, request
+import os
+import sys
 
-app = Flask(__name__)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_estimator import DEFAULT_HARDWARE, HARDWARE_PROFILES, EstimateConfig, estimate, parse_params, performance
+from llm_estimator.web import BOOTSTRAP_CSS, STATIC_MAX_AGE, CachedPage, gzip_response, solve_response, wants_json
 
-# --- Helper to parse model size like "7B", "350M" ---
-def parse_params(val: str) -> float:
-    val = val.strip().upper()
-    if val.endswith("B"):
-        return float(val[:-1]) * 1e9
-    elif val.endswith("M"):
-        return float(val[:-1]) * 1e6
-    else:
-        return float(val)
+app = Flask(__name__)
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = STATIC_MAX_AGE
 
 # --- HTML Template (Dark Professional Theme) ---
 TEMPLATE = """
@@ -20,7 +17,7 @@ TEMPLATE = """
 <head>
     <meta charset="utf-8">
     <title>LLM Resource Calculator</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+    <link href="{{ bootstrap_css }}" rel="stylesheet">
     <style>
         body { background-color: #121212; color: #e0e0e0; }
         .card { border-radius: 16px; background-color: #1e1e1e; box-shadow: 0 4px 12px rgba(0,0,0,0.6); }
@@ -32,13 +29,14 @@ TEMPLATE = """
         .form-control, .form-select { background-color: #2a2a2a; border: 1px solid #444; color: #e0e0e0; }
         .form-control:focus, .form-select:focus { background-color: #333; border-color: #0d6efd; color: #fff; }
         .list-group-item { background-color: transparent; border-color: #333; color: #e0e0e0; }
+        [hidden] { display: none !important; }
     </style>
 </head>
 <body>
     <div class="container py-5">
         <div class="card p-4">
             <h2 class="mb-4">LLM Resource Calculator</h2>
-            <form method="post" class="row g-3">
+            <form method="post" class="row g-3" id="calc-form">
                 <div class="col-md-6">
                     <label>Model Parameters</label>
                     <input type="text" class="form-control" name="params" 
@@ -74,32 +72,97 @@ TEMPLATE = """
                     <label>GPU Memory Capacity (GB per GPU)</label>
                     <input type="number" class="form-control" name="gpu_capacity" value="{{ form_data.gpu_capacity if form_data else 80 }}" required>
                 </div>
+                <div class="col-md-6">
+                    <label>GPU Model (for throughput and latency)</label>
+                    <select name="hardware" class="form-select">
+                        {% set selected = form_data.hardware if form_data and form_data.hardware else default_hardware %}
+                        {% for name in hardware_profiles %}
+                        <option value="{{ name }}" {% if name == selected %}selected{% endif %}>{{ name|upper }}</option>
+                        {% endfor %}
+                    </select>
+                </div>
                 <div class="col-12">
                     <button type="submit" class="btn btn-primary px-4">Calculate</button>
                 </div>
             </form>
         </div>
 
-        {% if result %}
+        <div class="alert alert-danger mt-4" id="calc-error" hidden></div>
+
+        <div id="results" {% if not result %}hidden{% endif %}>
         <div class="card p-4 mt-4 result-card">
             <h4>Fine-tuning Requirements</h4>
             <ul class="list-group list-group-flush">
-                <li class="list-group-item"><b>Total GPU Memory Needed:</b> {{ result['fine_tune']['total_mem'] }} GB</li>
-                <li class="list-group-item"><b>GPUs Required:</b> {{ result['fine_tune']['gpus'] }}</li>
-                <li class="list-group-item"><b>Compute per token:</b> {{ result['fine_tune']['flops'] | scientific }} FLOPs</li>
+                <li class="list-group-item"><b>Total GPU Memory Needed:</b> <span data-field="fine_tune.total_mem">{{ result['fine_tune']['total_mem'] if result }}</span> GB</li>
+                <li class="list-group-item"><b>GPUs Required:</b> <span data-field="fine_tune.gpus">{{ result['fine_tune']['gpus'] if result }}</span></li>
+                <li class="list-group-item"><b>Compute per token:</b> <span data-field="fine_tune.flops" data-format="scientific">{{ result['fine_tune']['flops'] | scientific if result }}</span> FLOPs</li>
             </ul>
         </div>
 
         <div class="card p-4 mt-4 result-card">
             <h4>Inference Requirements</h4>
             <ul class="list-group list-group-flush">
-                <li class="list-group-item"><b>GPU Memory per Batch:</b> {{ result['inference']['total_mem'] }} GB</li>
-                <li class="list-group-item"><b>GPUs Required:</b> {{ result['inference']['gpus'] }}</li>
-                <li class="list-group-item"><b>Compute per forward pass:</b> {{ result['inference']['flops'] | scientific }} FLOPs</li>
+                <li class="list-group-item"><b>GPU Memory per Batch:</b> <span data-field="inference.total_mem">{{ result['inference']['total_mem'] if result }}</span> GB</li>
+                <li class="list-group-item"><b>GPUs Required:</b> <span data-field="inference.gpus">{{ result['inference']['gpus'] if result }}</span></li>
+                <li class="list-group-item"><b>Compute per forward pass:</b> <span data-field="inference.flops" data-format="scientific">{{ result['inference']['flops'] | scientific if result }}</span> FLOPs</li>
             </ul>
         </div>
-        {% endif %}
+
+        <div class="card p-4 mt-4 result-card">
+            <h4>Performance on <span data-field="performance.hardware" data-format="upper">{{ result['performance']['hardware'] | upper if result }}</span></h4>
+            <ul class="list-group list-group-flush">
+                <li class="list-group-item"><b>Training Throughput:</b> <span data-field="performance.train_tokens_per_sec">{{ result['performance']['train_tokens_per_sec'] if result }}</span> tokens/s on <span data-field="performance.gpus_ft">{{ result['performance']['gpus_ft'] if result }}</span> GPU(s)</li>
+                <li class="list-group-item"><b>Time to First Token:</b> <span data-field="performance.ttft_ms">{{ result['performance']['ttft_ms'] if result }}</span> ms on <span data-field="performance.gpus_inf">{{ result['performance']['gpus_inf'] if result }}</span> GPU(s)</li>
+                <li class="list-group-item"><b>Decode Latency:</b> <span data-field="performance.decode_ms_per_token">{{ result['performance']['decode_ms_per_token'] if result }}</span> ms/token, <span data-field="performance.decode_tokens_per_sec">{{ result['performance']['decode_tokens_per_sec'] if result }}</span> tokens/s per batch</li>
+                <li class="list-group-item"><b>KV Cache:</b> <span data-field="performance.kv_cache_gb">{{ result['performance']['kv_cache_gb'] if result }}</span> GB</li>
+            </ul>
+        </div>
+        </div>
     </div>
+    <script>
+        // Recalculate in place as inputs change (debounced) instead of posting and reloading the page.
+        // Without JavaScript, or if the request fails on submit, the form still posts normally.
+        (function() {
+            const form = document.getElementById('calc-form');
+            const results = document.getElementById('results');
+            const errorBox = document.getElementById('calc-error');
+            let timer = null;
+            let latest = 0;
+            function lookup(result, path) {
+                return path.split('.').reduce(function(obj, key) { return obj == null ? obj : obj[key]; }, result);
+            }
+            function show(result) {
+                errorBox.hidden = !result.error;
+                errorBox.textContent = result.error || '';
+                if (result.error) return;
+                document.querySelectorAll('[data-field]').forEach(function(el) {
+                    const value = lookup(result, el.dataset.field);
+                    el.textContent = el.dataset.format === 'scientific' ? Number(value).toExponential(2)
+                        : el.dataset.format === 'upper' ? String(value).toUpperCase() : value;
+                });
+                results.hidden = false;
+            }
+            function update(submitted) {
+                if (!form.checkValidity()) return;
+                const id = ++latest;
+                fetch('/api/estimate', {method: 'POST', body: new FormData(form)})
+                    .then(function(r) { return r.json(); })
+                    .then(function(result) { if (id === latest) show(result); })
+                    .catch(function() { if (submitted) form.submit(); });
+            }
+            function schedule() {
+                clearTimeout(timer);
+                timer = setTimeout(function() { update(false); }, 250);
+            }
+            form.addEventListener('input', schedule);
+            form.addEventListener('change', schedule);
+            form.addEventListener('submit', function(event) {
+                event.preventDefault();
+                clearTimeout(timer);
+                update(true);
+            });
+        })();
+    </script>
 </body>
 </html>
 """
@@ -108,6 +171,45 @@ TEMPLATE = """
 def scientific_notation(value):
     return "{:.2e}".format(value)
 
+app.jinja_env.globals["bootstrap_css"] = BOOTSTRAP_CSS
+app.jinja_env.globals["hardware_profiles"] = list(HARDWARE_PROFILES)
+app.jinja_env.globals["default_hardware"] = DEFAULT_HARDWARE
+
+# Compiled once at startup instead of on every request
+PAGE = app.jinja_env.from_string(TEMPLATE)
+
+# The empty form is the same for everyone: render and gzip it once, serve it with an ETag
+with app.app_context():
+    SHELL = CachedPage(PAGE.render(result=None, form_data=None))
+
+# Estimate for the submitted fields (a form, a JSON object or query args)
+def estimate_form(form_data):
+    params = parse_params(str(form_data["params"]))
+    method = form_data["method"]
+    precision = form_data["precision"]
+    seq_len = int(form_data["seq_len"])
+    batch_size = int(form_data["batch_size"])
+    gpu_capacity = int(form_data["gpu_capacity"])
+    hardware = form_data.get("hardware") or DEFAULT_HARDWARE
+
+    est = estimate(EstimateConfig(params=params, method=method, precision=precision, seq_len=seq_len,
+                                  batch_size=batch_size, gpu_capacity=gpu_capacity))
+    return {
+        "fine_tune": {
+            "total_mem": round(est.total_mem_ft, 2),
+            "gpus": est.gpus_ft,
+            "flops": est.flops_ft
+        },
+        "inference": {
+            "total_mem": round(est.total_mem_inf, 2),
+            "gpus": est.gpus_inf,
+            "flops": est.flops_inf
+        },
+        # Roofline throughput / latency on the selected GPU model, over as many of its cards as the
+        # job needs at that model's memory (not gpu_capacity); no dataset here, so no training time
+        "performance": performance(params, method, precision, seq_len, batch_size, hardware=hardware)
+    }
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     result = None
@@ -115,58 +217,34 @@ def index():
 
     if request.method == "POST":
         form_data = request.form
-        params = parse_params(form_data["params"])
-        method = form_data["method"]
-        precision = form_data["precision"]
-        seq_len = int(form_data["seq_len"])
-        batch_size = int(form_data["batch_size"])
-        gpu_capacity = int(form_data["gpu_capacity"])
-
-        # Bytes per param
-        if precision == "fp32":
-            bytes_per_param = 4
-        elif precision == "fp16":
-            bytes_per_param = 2
-        elif precision == "int8":
-            bytes_per_param = 1
-        elif precision == "int4":
-            bytes_per_param = 0.5
-        else:
-            bytes_per_param = 2
-
-        # === Fine-tuning ===
-        param_mem = (params * bytes_per_param) / 1e9
-        if method == "full":
-            opt_mem = param_mem * 2
-            act_mem = param_mem * (seq_len / 2048) * (batch_size / 4)
-            total_mem_ft = param_mem + opt_mem + act_mem
-        elif method == "lora":
-            total_mem_ft = (param_mem * 0.25) + 2
-        else:  # qlora
-            total_mem_ft = (param_mem * 0.15) + 1.5
-        gpus_ft = math.ceil(total_mem_ft / gpu_capacity)
-        flops_ft = 6 * params  # FLOPs per token
-
-        # === Inference ===
-        act_mem_inf = param_mem * (seq_len / 2048) * (batch_size / 4)
-        total_mem_inf = param_mem + act_mem_inf
-        gpus_inf = math.ceil(total_mem_inf / gpu_capacity)
-        flops_inf = 2 * params  # forward pass FLOPs
-
-        result = {
-            "fine_tune": {
-                "total_mem": round(total_mem_ft, 2),
-                "gpus": gpus_ft,
-                "flops": flops_ft
-            },
-            "inference": {
-                "total_mem": round(total_mem_inf, 2),
-                "gpus": gpus_inf,
-                "flops": flops_inf
-            }
-        }
+        result = estimate_form(form_data)
+    elif not wants_json():
+        return SHELL.response(request)
+
+    if wants_json():
+        if result is None:
+            return jsonify({"error": "POST the form fields to get an estimate"}), 400
+        return jsonify(result)
+    return render_template(PAGE, result=result, form_data=form_data)
+
+# Result fields only, for the page script: a few hundred bytes instead of the whole page
+@app.route("/api/estimate", methods=["GET", "POST"])
+def api_estimate():
+    try:
+        return jsonify(estimate_form(request.get_json(silent=True) or request.values))
+    except KeyError as e:
+        return jsonify({"error": f"missing field '{e.args[0]}'"}), 400
+    except (ValueError, TypeError, ArithmeticError) as e:
+        return jsonify({"error": str(e)}), 400
+
+# Largest batch size / sequence length that fits a memory budget (see llm_estimator.web.solve_response)
+@app.route("/api/solve", methods=["GET", "POST"])
+def solve_config():
+    return solve_response(request.get_json(silent=True) or request.values)
 
-    return render_template_string(TEMPLATE, result=result, form_data=form_data)
+@app.after_request
+def compress(response):
+    return gzip_response(response, request)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,4 @@
+# WSGI entry point for production servers (settings in gunicorn.conf.py at the repository root):
+#   gunicorn -c gunicorn.conf.py --chdir "Assignment 2" wsgi:app
+# `python app.py` still starts the development server; set FLASK_DEBUG=1 for the debugger and reloader.
+from app import app
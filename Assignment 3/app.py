@@ -1,70 +1,135 @@
-from flask import Flask, render_template_string, request
-import requests
+from flask import Flask, Response, jsonify, render_template, request
+from markupsafe import Markup, escape
+from contextlib import closing
+import numpy as np
 import json
 import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_estimator import (DEFAULT_HARDWARE, HARDWARE_PROFILES, EstimateConfig, LookupTable, estimate, estimate_batch,
+                           gpu_hours, inf_gpu_hours, params_to_gb, parse_finite, parse_params, performance,
+                           performance_arrays, round2)
+from llm_estimator.web import BOOTSTRAP_CSS, STATIC_MAX_AGE, CachedPage, gzip_response, solve_response, wants_json
+from cache import cache_from_env, make_key
+from gemini import GEMINI_API_URL, GEMINI_MAX_CONCURRENCY, generate_content, is_retryable, stream_generate_content
+from jobs import JobRunner, QueueFull
+from jsonstream import JSONObjectStream, extract_json_object
+from metrics import count_error, observe_stage, registry, requests_total, stage
+from providers import FunctionProvider, fan_out, get_provider, register_provider
+from resilience import Rejected, guard_from_env
 
 app = Flask(__name__)
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
 
-# Dummy Gemini API key (replace with your real key)
-GEMINI_API_KEY = 'YOUR_GEMINI_API_KEY'
-GEMINI_API_URL = 'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent'
-
-# Helper to parse parameter input like '7B', '750M', etc.
-def parse_params(val: str) -> float:
-    val = val.strip().upper()
-    if val.endswith("B"):
-        return float(val[:-1]) * 1e9
-    elif val.endswith("M"):
-        return float(val[:-1]) * 1e6
-    else:
-        return float(val)
-
-# Convert number of parameters to model size in GB (assuming FP16, 2 bytes per param)
-def params_to_gb(params: float, precision: str) -> float:
-    if precision == "fp32":
-        bytes_per_param = 4
-    elif precision == "fp16":
-        bytes_per_param = 2
-    elif precision == "int8":
-        bytes_per_param = 1
-    elif precision == "int4":
-        bytes_per_param = 0.5
-    else:
-        bytes_per_param = 2
-    return params * bytes_per_param / 1e9
+# Run Gemini calls in the background and let the page poll for the answer (GEMINI_ASYNC=0 to disable).
+# JOBS_DB_PATH shares job states between worker processes (set by gunicorn.conf.py)
+GEMINI_ASYNC = os.environ.get('GEMINI_ASYNC', '1') != '0'
+gemini_jobs = JobRunner(max_workers=GEMINI_MAX_CONCURRENCY,
+                        max_pending=int(os.environ.get('GEMINI_MAX_PENDING', 256)),
+                        name='gemini', store_path=os.environ.get('JOBS_DB_PATH') or None)
+# Seconds a client is asked to wait (Retry-After) when the job queue is full
+GEMINI_QUEUE_RETRY_AFTER = int(os.environ.get('GEMINI_QUEUE_RETRY_AFTER', 2))
 
-# Local estimation logic with method/precision
+# Local estimation logic with method/precision (shared llm_estimator core)
 def estimate_resources_local(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80):
-    model_size_gb = params_to_gb(params, precision)
-    # === Fine-tuning ===
-    param_mem = model_size_gb
-    if method == "full":
-        opt_mem = param_mem * 2
-        act_mem = param_mem * (seq_len / 2048) * (batch_size / 4)
-        total_mem_ft = param_mem + opt_mem + act_mem
-    elif method == "lora":
-        total_mem_ft = (param_mem * 0.25) + 2
-    else:  # qlora
-        total_mem_ft = (param_mem * 0.15) + 1.5
-    gpus_ft = math.ceil(total_mem_ft / gpu_capacity)
-    flops_ft = 6 * params  # FLOPs per token
-    # === Inference ===
-    act_mem_inf = param_mem * (seq_len / 2048) * (batch_size / 4)
-    total_mem_inf = param_mem + act_mem_inf
-    gpus_inf = math.ceil(total_mem_inf / gpu_capacity)
-    flops_inf = 2 * params  # forward pass FLOPs
+    config = EstimateConfig(params=params, method=method, precision=precision, seq_len=seq_len,
+                            batch_size=batch_size, gpu_capacity=gpu_capacity,
+                            dataset_size_gb=dataset_size_gb, epochs=epochs)
+    # Common model sizes with dropdown values are answered from the precomputed table
+    hit = lookup_table.get(params, method, precision, batch_size, seq_len, gpu_capacity)
+    if hit is not None:
+        memory_gb, inf_memory_gb, gpus_ft, gpus_inf = hit
+    else:
+        est = estimate(config)
+        memory_gb, inf_memory_gb = round(est.total_mem_ft, 2), round(est.total_mem_inf, 2)
+        gpus_ft, gpus_inf = est.gpus_ft, est.gpus_inf
     return {
-        'memory_gb': round(total_mem_ft, 2),
-        'gpu_hours': round(dataset_size_gb * epochs * 0.5 / batch_size, 2),
-        'inf_memory_gb': round(total_mem_inf, 2),
-        'inf_gpu_hours': round(dataset_size_gb * 0.1 / batch_size, 2),
+        'memory_gb': memory_gb,
+        'gpu_hours': round(gpu_hours(config), 2),
+        'inf_memory_gb': inf_memory_gb,
+        'inf_gpu_hours': round(inf_gpu_hours(config), 2),
         'gpus_ft': gpus_ft,
-        'flops_ft': flops_ft,
+        'flops_ft': 6 * params,  # FLOPs per token
         'gpus_inf': gpus_inf,
-        'flops_inf': flops_inf
+        'flops_inf': 2 * params  # forward pass FLOPs
     }
 
+# Vectorized estimate_resources_local, element-for-element identical
+estimate_resources_local_batch = estimate_batch
+
+# Roofline throughput and latency of the job on the selected GPU model (llm_estimator.perf), over as
+# many of its cards as the job needs: the GPU count follows the model's own memory, not the
+# gpu_capacity field, so an L4 (24 GB) is never credited with an 80 GB card's fit. It does not depend
+# on the calculation method, so it is returned next to local and Gemini answers alike.
+def estimate_performance(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80,
+                         hardware=DEFAULT_HARDWARE):
+    return performance(params, method, precision, seq_len, batch_size, dataset_size_gb, epochs, hardware)
+
+# Largest number of configs accepted by /api/batch in one request
+MAX_BATCH_CONFIGS = 1_000_000
+
+# Cache for Gemini answers, configured via GEMINI_CACHE_SIZE / GEMINI_CACHE_TTL / GEMINI_CACHE_PATH
+gemini_cache = cache_from_env()
+
+# Normalized inputs so equivalent submits ('7B' vs '7e9', '4' vs 4) share a cache entry
+def gemini_cache_key(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80):
+    return make_key({
+        'params': float(params),
+        'dataset_size_gb': float(dataset_size_gb),
+        'batch_size': int(batch_size),
+        'epochs': int(epochs),
+        'method': str(method).lower(),
+        'precision': str(precision).lower(),
+        'seq_len': int(seq_len),
+        'gpu_capacity': int(gpu_capacity),
+        'model': GEMINI_API_URL,
+    })
+
+# Admission control, circuit breaker and retries for Gemini calls (GEMINI_RATE, GEMINI_BURST,
+# GEMINI_MAX_INFLIGHT, GEMINI_MAX_ATTEMPTS, GEMINI_BREAKER_*; see resilience.guard_from_env)
+gemini_guard = guard_from_env('GEMINI', max_inflight=GEMINI_MAX_CONCURRENCY, retryable=is_retryable)
+# Answer with the local estimate when Gemini is shed, the breaker is open or the call fails (GEMINI_FALLBACK=0 to show the error)
+GEMINI_FALLBACK = os.environ.get('GEMINI_FALLBACK', '1') != '0'
+gemini_fallbacks = registry.counter(
+    'llmcalc_gemini_fallbacks_total', 'Gemini requests answered by the local estimate', ['reason'])
+
+# Cached Gemini answer or {'error': ...}; identical in-flight requests share one upstream call
+def cached_gemini_estimate(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80):
+    args = (params, dataset_size_gb, batch_size, epochs, method, precision, seq_len, gpu_capacity)
+    return gemini_cache.get_or_compute(
+        gemini_cache_key(*args),
+        lambda: fetch_gemini_estimate(*args),
+        cacheable=lambda result: 'error' not in result,
+    )
+
+# The local estimate standing in for a Gemini answer; reason is the shed reason or 'error'
+def local_fallback(args, reason):
+    if registry.enabled:
+        gemini_fallbacks.inc(reason)
+    return dict(estimate_resources_local(*args), source=f'local fallback ({reason})')
+
+# Cached Gemini estimate, falling back to the local one when Gemini is unavailable
 def estimate_resources_gemini(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80):
+    args = (params, dataset_size_gb, batch_size, epochs, method, precision, seq_len, gpu_capacity)
+    result = cached_gemini_estimate(*args)
+    if 'error' in result and GEMINI_FALLBACK:
+        return local_fallback(args, result.get('shed', 'error'))
+    return result
+
+# Providers for calculation_method=parallel: the local answer is shown at once and replaced by
+# the remote one (PARALLEL_MODE=first) or the median of several (ensemble) if they answer within
+# PARALLEL_DEADLINE seconds. More backends can be added with register_provider().
+register_provider(FunctionProvider('local', lambda *args: estimate_resources_local(*args)))
+register_provider(FunctionProvider('gemini', lambda *args: cached_gemini_estimate(*args)))
+PARALLEL_PROVIDERS = [name.strip() for name in os.environ.get('PARALLEL_PROVIDERS', 'gemini').split(',') if name.strip()]
+PARALLEL_DEADLINE = float(os.environ.get('PARALLEL_DEADLINE', 5))
+PARALLEL_MODE = os.environ.get('PARALLEL_MODE', 'first')
+
+def gemini_prompt(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80):
     model_size_gb = params_to_gb(params, precision)
     prompt = (
         f"""
@@ -82,35 +147,132 @@ def estimate_resources_gemini(params, dataset_size_gb, batch_size, epochs, metho
         "Estimate the required GPU memory (in GB), number of GPUs, and total compute (in GPU-hours) for this fine-tuning job, and also for inference (single forward pass per batch).\n"
         "Respond ONLY in the following JSON format: {\"memory_gb\": <float>, \"gpu_hours\": <float>, \"inf_memory_gb\": <float>, \"inf_gpu_hours\": <float>, \"gpus_ft\": <int>, \"flops_ft\": <float>, \"gpus_inf\": <int>, \"flops_inf\": <float>}"
     )
-    headers = {
-        'Content-Type': 'application/json',
-        'X-goog-api-key': GEMINI_API_KEY
-    }
-    data = {
-        "contents": [{"parts": [{"text": prompt}]}]
-    }
+    return prompt
+
+# Fields Gemini is asked for; an object in its answer counts only if it has at least one of them
+GEMINI_FIELDS = ('memory_gb', 'gpu_hours', 'inf_memory_gb', 'inf_gpu_hours', 'gpus_ft', 'flops_ft', 'gpus_inf', 'flops_inf')
+
+def fetch_gemini_estimate(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80):
+    prompt = gemini_prompt(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len, gpu_capacity)
     try:
-        response = requests.post(GEMINI_API_URL, headers=headers, data=json.dumps(data), timeout=20)
-        response.raise_for_status()
-        gemini_text = response.json()['candidates'][0]['content']['parts'][0]['text']
-        # Extract JSON from Gemini's response
-        json_start = gemini_text.find('{')
-        json_end = gemini_text.rfind('}') + 1
-        if json_start != -1 and json_end != -1:
-            result_json = gemini_text[json_start:json_end]
-            return json.loads(result_json)
-        else:
-            return {'error': 'Invalid JSON from Gemini'}
+        with stage('gemini_request'):
+            gemini_text = gemini_guard.call(generate_content, prompt)
+        # Extract JSON from Gemini's response, skipping any prose (and braces in it) around it
+        with stage('gemini_extract'):
+            result = extract_json_object(gemini_text, GEMINI_FIELDS)
+            if result is not None:
+                return result
+            else:
+                count_error('gemini_extract', 'InvalidJSON')
+                return {'error': 'Invalid JSON from Gemini'}
+    except Rejected as e:
+        return {'error': str(e), 'shed': e.reason}
     except Exception as e:
+        count_error('gemini', e)
         return {'error': str(e)}
 
+# Stream Gemini's answer (GEMINI_STREAM=0 keeps the page on the job-polling path)
+GEMINI_STREAM = os.environ.get('GEMINI_STREAM', '1') != '0'
+# A Gemini number more than this factor away from the local estimate is replaced by the local one
+GEMINI_SANITY_RATIO = float(os.environ.get('GEMINI_SANITY_RATIO', 10))
+
+def sane_field(value, local_value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        return False
+    # small absolute slack for values the local estimate rounds to 0
+    return local_value / GEMINI_SANITY_RATIO - 0.01 <= value <= local_value * GEMINI_SANITY_RATIO + 0.01
+
+# Gemini's answer with implausible or missing fields replaced by the local estimate (listed in 'rejected')
+def checked_gemini_result(answer, local):
+    result, rejected = {}, []
+    for name in GEMINI_FIELDS:
+        if name in answer and sane_field(answer[name], local[name]):
+            result[name] = answer[name]
+        else:
+            result[name] = local[name]
+            rejected.append(name)
+    if rejected:
+        result['rejected'] = rejected
+    return result
+
+# A remote answer good enough to replace the local estimate outright: every field present and sane
+def plausible_answer(answer, local):
+    return all(name in answer and sane_field(answer[name], local[name]) for name in GEMINI_FIELDS)
+
+# Gemini estimate as a stream of (event, data): 'local' (the local estimate, at once), 'field' for each
+# value as soon as it is parsed, 'reset' if fields already sent turn out not to be the answer, then
+# 'result' or 'failure'. The raw answer is cached like estimate_resources_gemini's, and identical
+# concurrent requests (streamed or not) share one upstream call: the others wait for its answer.
+# The call is admitted and recorded by gemini_guard but not retried, since fields may already have been sent.
+def stream_gemini_estimate(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80):
+    args = (params, dataset_size_gb, batch_size, epochs, method, precision, seq_len, gpu_capacity)
+    local = estimate_resources_local(*args)
+    yield 'local', local
+    answer, finish = gemini_cache.claim(gemini_cache_key(*args), cacheable=lambda answer: 'error' not in answer)
+    if finish is not None:
+        # What callers waiting on this stream get if it ends early (e.g. the client went away)
+        outcome = {'error': 'Gemini stream abandoned'}
+        try:
+            parser = JSONObjectStream(GEMINI_FIELDS)
+            start = time.perf_counter()
+            first = True
+            try:
+                with gemini_guard.attempt(), closing(stream_generate_content(gemini_prompt(*args))) as chunks:
+                    for chunk in chunks:
+                        for event in parser.feed(chunk):
+                            if event[0] == 'reset':
+                                yield 'reset', {}
+                            elif event[0] == 'field':
+                                _, name, value = event
+                                if first:
+                                    observe_stage('gemini_first_field', time.perf_counter() - start)
+                                    first = False
+                                yield 'field', {'field': name, 'value': value, 'local': local[name],
+                                                'ok': sane_field(value, local[name])}
+                        if parser.result is not None:
+                            break
+            except Exception as e:
+                if isinstance(e, Rejected):
+                    outcome = {'error': str(e), 'shed': e.reason}
+                else:
+                    count_error('gemini_stream', e)
+                    outcome = {'error': str(e)}
+                if GEMINI_FALLBACK:
+                    yield 'result', local_fallback(args, outcome.get('shed', 'error'))
+                else:
+                    yield 'failure', {'error': str(e)}
+                return
+            observe_stage('gemini_stream', time.perf_counter() - start)
+            answer = parser.result
+            if answer is None:
+                count_error('gemini_extract', 'InvalidJSON')
+                outcome = {'error': 'Invalid JSON from Gemini'}
+                yield 'failure', outcome
+                return
+            outcome = answer
+        finally:
+            finish(outcome)
+    elif 'error' in answer:
+        # the call this request waited for failed
+        if GEMINI_FALLBACK:
+            yield 'result', local_fallback(args, answer.get('shed', 'error'))
+        else:
+            yield 'failure', {'error': answer['error']}
+        return
+    else:
+        for name in GEMINI_FIELDS:
+            if name in answer:
+                yield 'field', {'field': name, 'value': answer[name], 'local': local[name],
+                                'ok': sane_field(answer[name], local[name])}
+    yield 'result', checked_gemini_result(answer, local)
+
 TEMPLATE = """
 <!doctype html>
 <html lang=\"en\" data-bs-theme=\"dark\">
 <head>
     <meta charset=\"utf-8\">
     <title>LLM Resource Calculator</title>
-    <link href=\"https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css\" rel=\"stylesheet\">
+    <link href=\"{{ bootstrap_css }}\" rel=\"stylesheet\">
     <style>
         body { background-color: #121212; color: #e0e0e0; }
         .card { border-radius: 16px; background-color: #1e1e1e; box-shadow: 0 4px 12px rgba(0,0,0,0.6); }
@@ -124,6 +286,7 @@ TEMPLATE = """
         .list-group-item { background-color: transparent; border-color: #333; color: #e0e0e0; }
         .inline-loader { display: none; vertical-align: middle; margin-left: 10px; }
         .show-inline-loader { display: inline-block !important; }
+        [hidden] { display: none !important; }
     </style>
 </head>
 <body>
@@ -142,57 +305,49 @@ TEMPLATE = """
                 <div class=\"col-md-6\">
                     <label>Batch Size</label>
                     <select name=\"batch_size\" class=\"form-select\">
-                        {% for val in [1, 2, 4, 8, 16, 32, 64] %}
-                        <option value=\"{{ val }}\" {% if form_data and form_data.batch_size == val|string %}selected{% endif %}>{{ val }}</option>
-                        {% endfor %}
+                        {{ options("batch_size", form_data) }}
                     </select>
                 </div>
                 <div class=\"col-md-6\">
                     <label>Epochs</label>
                     <select name=\"epochs\" class=\"form-select\">
-                        {% for val in [1, 2, 3, 5, 10, 20, 50] %}
-                        <option value=\"{{ val }}\" {% if form_data and form_data.epochs == val|string %}selected{% endif %}>{{ val }}</option>
-                        {% endfor %}
+                        {{ options("epochs", form_data) }}
                     </select>
                 </div>
                 <div class=\"col-md-6\">
                     <label>Fine-tuning Method</label>
                     <select name=\"method\" class=\"form-select\">
-                        <option value=\"full\" {% if form_data and form_data.method == 'full' %}selected{% endif %}>Full Fine-tuning</option>
-                        <option value=\"lora\" {% if form_data and form_data.method == 'lora' %}selected{% endif %}>LoRA</option>
-                        <option value=\"qlora\" {% if form_data and form_data.method == 'qlora' %}selected{% endif %}>QLoRA</option>
+                        {{ options("method", form_data) }}
                     </select>
                 </div>
                 <div class=\"col-md-6\">
                     <label>Precision</label>
                     <select name=\"precision\" class=\"form-select\">
-                        <option value=\"fp16\" {% if form_data and form_data.precision == 'fp16' %}selected{% endif %}>FP16 / BF16</option>
-                        <option value=\"fp32\" {% if form_data and form_data.precision == 'fp32' %}selected{% endif %}>FP32</option>
-                        <option value=\"int8\" {% if form_data and form_data.precision == 'int8' %}selected{% endif %}>8-bit</option>
-                        <option value=\"int4\" {% if form_data and form_data.precision == 'int4' %}selected{% endif %}>4-bit</option>
+                        {{ options("precision", form_data) }}
                     </select>
                 </div>
                 <div class=\"col-md-6\">
                     <label>Sequence Length (tokens)</label>
                     <select name=\"seq_len\" class=\"form-select\">
-                        {% for val in [512, 1024, 2048, 4096, 8192, 16384] %}
-                        <option value=\"{{ val }}\" {% if form_data and form_data.seq_len == val|string %}selected{% endif %}>{{ val }}</option>
-                        {% endfor %}
+                        {{ options("seq_len", form_data) }}
                     </select>
                 </div>
                 <div class=\"col-md-6\">
                     <label>GPU Memory Capacity (GB per GPU)</label>
                     <select name=\"gpu_capacity\" class=\"form-select\">
-                        {% for val in [16, 24, 32, 40, 48, 80] %}
-                        <option value=\"{{ val }}\" {% if form_data and form_data.gpu_capacity == val|string %}selected{% endif %}>{{ val }}</option>
-                        {% endfor %}
+                        {{ options("gpu_capacity", form_data) }}
+                    </select>
+                </div>
+                <div class=\"col-md-6\">
+                    <label>GPU Model (for throughput and latency)</label>
+                    <select name=\"hardware\" class=\"form-select\">
+                        {{ options("hardware", form_data) }}
                     </select>
                 </div>
                 <div class=\"col-md-6\">
                     <label>Calculation Method</label>
                     <select name=\"calculation_method\" class=\"form-select\">
-                        <option value=\"local\" {% if form_data and form_data.calculation_method == 'local' %}selected{% endif %}>Local Estimate</option>
-                        <option value=\"gemini\" {% if not form_data or form_data.calculation_method == 'gemini' %}selected{% endif %}>Gemini (LLM-powered)</option>
+                        {{ options("calculation_method", form_data) }}
                     </select>
                 </div>
                 <div class=\"col-12\" style=\"display: flex; align-items: center;\">
@@ -204,41 +359,164 @@ TEMPLATE = """
                 </div>
             </form>
         </div>
-        {% if result %}
+        <div id=\"results\" {% if not (result or job_id) %}hidden{% endif %}>
         <div class=\"card p-4 mt-4 result-card\">
             <h4>Fine-tuning Requirements</h4>
-            <ul class=\"list-group list-group-flush\">
-                {% if result.error %}
-                    <li class=\"list-group-item text-danger\"><b>Error:</b> {{ result.error }}</li>
-                {% else %}
-                    <li class=\"list-group-item\"><b>Total GPU Memory Needed:</b> {{ result.memory_gb }} GB</li>
-                    <li class=\"list-group-item\"><b>GPUs Required:</b> {{ result.gpus_ft }}</li>
-                    <li class=\"list-group-item\"><b>Compute per token:</b> {{ result.flops_ft | scientific }} FLOPs</li>
-                {% endif %}
+            <p class=\"small text-muted mb-0\" data-source {% if not (result and result.source) %}hidden{% endif %}>Source: <span data-field=\"source\">{{ result.source if result and result.source }}</span></p>
+            <p class=\"text-danger mb-0\" data-error {% if not (result and result.error) %}hidden{% endif %}><b>Error:</b> <span data-error-text>{{ result.error if result and result.error }}</span></p>
+            <ul class=\"list-group list-group-flush\" data-result {% if result and result.error %}hidden{% endif %}>
+                <li class=\"list-group-item\"><b>Total GPU Memory Needed:</b> <span data-field=\"memory_gb\">{{ result.memory_gb if result and not result.error else '&hellip;'|safe }}</span> GB</li>
+                <li class=\"list-group-item\"><b>GPUs Required:</b> <span data-field=\"gpus_ft\">{{ result.gpus_ft if result and not result.error else '&hellip;'|safe }}</span></li>
+                <li class=\"list-group-item\"><b>Compute per token:</b> <span data-field=\"flops_ft\" data-format=\"scientific\">{{ result.flops_ft | scientific if result and not result.error else '&hellip;'|safe }}</span> FLOPs</li>
             </ul>
         </div>
         <div class=\"card p-4 mt-4 result-card\">
             <h4>Inference Requirements</h4>
+            <p class=\"text-danger mb-0\" data-error {% if not (result and result.error) %}hidden{% endif %}><b>Error:</b> <span data-error-text>{{ result.error if result and result.error }}</span></p>
+            <ul class=\"list-group list-group-flush\" data-result {% if result and result.error %}hidden{% endif %}>
+                <li class=\"list-group-item\"><b>GPU Memory per Batch:</b> <span data-field=\"inf_memory_gb\">{{ result.inf_memory_gb if result and not result.error else '&hellip;'|safe }}</span> GB</li>
+                <li class=\"list-group-item\"><b>GPUs Required:</b> <span data-field=\"gpus_inf\">{{ result.gpus_inf if result and not result.error else '&hellip;'|safe }}</span></li>
+                <li class=\"list-group-item\"><b>Compute per forward pass:</b> <span data-field=\"flops_inf\" data-format=\"scientific\">{{ result.flops_inf | scientific if result and not result.error else '&hellip;'|safe }}</span> FLOPs</li>
+            </ul>
+        </div>
+        <div class=\"card p-4 mt-4 result-card\" data-perf {% if not perf %}hidden{% endif %}>
+            <h4>Performance on <span data-perf-field=\"hardware\">{{ perf.hardware|upper if perf }}</span></h4>
             <ul class=\"list-group list-group-flush\">
-                {% if result.error %}
-                    <li class=\"list-group-item text-danger\"><b>Error:</b> {{ result.error }}</li>
-                {% else %}
-                    <li class=\"list-group-item\"><b>GPU Memory per Batch:</b> {{ result.inf_memory_gb }} GB</li>
-                    <li class=\"list-group-item\"><b>GPUs Required:</b> {{ result.gpus_inf }}</li>
-                    <li class=\"list-group-item\"><b>Compute per forward pass:</b> {{ result.flops_inf | scientific }} FLOPs</li>
-                {% endif %}
+                <li class=\"list-group-item\"><b>Training Throughput:</b> <span data-perf-field=\"train_tokens_per_sec\">{{ perf.train_tokens_per_sec if perf }}</span> tokens/s on <span data-perf-field=\"gpus_ft\">{{ perf.gpus_ft if perf }}</span> GPU(s)</li>
+                <li class=\"list-group-item\"><b>Training Time:</b> <span data-perf-field=\"train_hours\">{{ perf.train_hours if perf }}</span> h (<span data-perf-field=\"train_gpu_hours\">{{ perf.train_gpu_hours if perf }}</span> GPU-hours)</li>
+                <li class=\"list-group-item\"><b>Time to First Token:</b> <span data-perf-field=\"ttft_ms\">{{ perf.ttft_ms if perf }}</span> ms on <span data-perf-field=\"gpus_inf\">{{ perf.gpus_inf if perf }}</span> GPU(s)</li>
+                <li class=\"list-group-item\"><b>Decode Latency:</b> <span data-perf-field=\"decode_ms_per_token\">{{ perf.decode_ms_per_token if perf }}</span> ms/token, <span data-perf-field=\"decode_tokens_per_sec\">{{ perf.decode_tokens_per_sec if perf }}</span> tokens/s per batch</li>
+                <li class=\"list-group-item\"><b>KV Cache:</b> <span data-perf-field=\"kv_cache_gb\">{{ perf.kv_cache_gb if perf }}</span> GB</li>
             </ul>
         </div>
-        {% endif %}
+        </div>
     </div>
     <script>
         const form = document.getElementById('calc-form');
         const loader = document.getElementById('inline-loader');
-        if (form && loader) {
-            form.addEventListener('submit', function() {
-                loader.classList.add('show-inline-loader');
+        const results = document.getElementById('results');
+        // Results are updated in place through /api/estimate instead of reposting the page:
+        // local estimates refresh as inputs change (debounced); Gemini and parallel run on Calculate
+        // and poll their background job. With a provisional (local) result on the page, a missing
+        // or failed remote answer keeps it. Without JavaScript the form still posts normally.
+        // Gemini answers are streamed field by field from /api/estimate/stream when enabled.
+        const streaming = {{ gemini_stream|tojson }};
+        let latest = 0;
+        let timer = null;
+        function showResult(result) {
+            loader.classList.remove('show-inline-loader');
+            results.hidden = false;
+            document.querySelectorAll('[data-error]').forEach(function(el) {
+                el.hidden = !result.error;
+                el.querySelector('[data-error-text]').textContent = result.error || '';
+            });
+            document.querySelectorAll('[data-result]').forEach(function(el) { el.hidden = !!result.error; });
+            if (result.error) return;
+            document.querySelectorAll('[data-source]').forEach(function(el) { el.hidden = !result.source; });
+            document.querySelectorAll('[data-field]').forEach(function(el) {
+                const value = result[el.dataset.field];
+                if (value !== undefined) setField(el.dataset.field, value);
+            });
+        }
+        // Throughput / latency from the roofline model; it comes with every response, whatever the source
+        function showPerf(perf) {
+            document.querySelectorAll('[data-perf]').forEach(function(el) { el.hidden = !perf; });
+            if (!perf) return;
+            document.querySelectorAll('[data-perf-field]').forEach(function(el) {
+                const value = perf[el.dataset.perfField];
+                el.textContent = el.dataset.perfField === 'hardware' ? value.toUpperCase() : value;
             });
         }
+        function showPending() {
+            showResult({});
+            document.querySelectorAll('[data-source]').forEach(function(el) { el.hidden = true; });
+            document.querySelectorAll('[data-field]').forEach(function(el) { el.textContent = '\u2026'; });
+            loader.classList.add('show-inline-loader');
+        }
+        function pollJob(jobId, provisional, id) {
+            if (id !== latest) return;
+            fetch('/jobs/' + jobId)
+                .then(function(r) { return r.json(); })
+                .then(function(job) {
+                    if (id !== latest) return;
+                    if (job.status === 'pending') { setTimeout(function() { pollJob(jobId, provisional, id); }, 500); return; }
+                    if (job.status === 'done' && job.result) { showResult(job.result); return; }
+                    if (provisional) { loader.classList.remove('show-inline-loader'); return; }
+                    showResult({error: job.error || 'No answer'});
+                })
+                .catch(function() { setTimeout(function() { pollJob(jobId, provisional, id); }, 2000); });
+        }
+        function setField(name, value) {
+            document.querySelectorAll('[data-field="' + name + '"]').forEach(function(el) {
+                el.textContent = el.dataset.format === 'scientific' ? Number(value).toExponential(2) : value;
+            });
+        }
+        function streamEstimate(id) {
+            const source = new EventSource('/api/estimate/stream?' + new URLSearchParams(new FormData(form)));
+            let finished = false;
+            function on(name, handler) {
+                source.addEventListener(name, function(event) {
+                    if (id !== latest) { source.close(); return; }
+                    handler(JSON.parse(event.data));
+                });
+            }
+            showPending();
+            on('perf', showPerf);
+            // implausible numbers are shown as the local estimate
+            on('field', function(data) { setField(data.field, data.ok ? data.value : data.local); });
+            on('reset', function() { showPending(); });
+            on('result', function(result) { finished = true; source.close(); showResult(result); });
+            on('failure', function(result) { finished = true; source.close(); showResult(result); });
+            source.onerror = function() {
+                source.close();
+                if (!finished && id === latest) requestEstimate(id, true);
+            };
+        }
+        function update(submitted) {
+            if (!form.checkValidity()) return;
+            const id = ++latest;
+            if (submitted) loader.classList.add('show-inline-loader');
+            if (streaming && window.EventSource && form.elements['calculation_method'].value === 'gemini') {
+                streamEstimate(id);
+                return;
+            }
+            requestEstimate(id, submitted);
+        }
+        function requestEstimate(id, submitted) {
+            fetch('/api/estimate', {method: 'POST', body: new FormData(form)})
+                .then(function(r) { return r.json(); })
+                .then(function(data) {
+                    if (id !== latest) return;
+                    showPerf(data.perf);
+                    if (data.status === 'pending') { showPending(); pollJob(data.id, false, id); return; }
+                    showResult(data);
+                    if (data.upgrade) {
+                        loader.classList.add('show-inline-loader');
+                        pollJob(data.upgrade.id, true, id);
+                    }
+                })
+                .catch(function() { if (submitted) form.submit(); });
+        }
+        function schedule() {
+            clearTimeout(timer);
+            // Remote calculations cost an API call each, so they only run on Calculate
+            if (form.elements['calculation_method'].value !== 'local') return;
+            timer = setTimeout(function() { update(false); }, 250);
+        }
+        form.addEventListener('input', schedule);
+        form.addEventListener('change', schedule);
+        form.addEventListener('submit', function(event) {
+            event.preventDefault();
+            clearTimeout(timer);
+            update(true);
+        });
+        // A job started by a plain form post
+        const jobId = {{ job_id|tojson }};
+        const provisional = {{ (result is not none and job_id is not none)|tojson }};
+        if (jobId) {
+            loader.classList.add('show-inline-loader');
+            pollJob(jobId, provisional, latest);
+        }
     </script>
 </body>
 </html>
@@ -248,29 +526,372 @@ TEMPLATE = """
 def scientific_notation(value):
     return "{:.2e}".format(value)
 
+# Dropdown choices as (value, label); the option markup is rendered once per selected value
+FORM_CHOICES = {
+    'batch_size': [(v, v) for v in [1, 2, 4, 8, 16, 32, 64]],
+    'epochs': [(v, v) for v in [1, 2, 3, 5, 10, 20, 50]],
+    'method': [('full', 'Full Fine-tuning'), ('lora', 'LoRA'), ('qlora', 'QLoRA')],
+    'precision': [('fp16', 'FP16 / BF16'), ('fp32', 'FP32'), ('int8', '8-bit'), ('int4', '4-bit')],
+    'seq_len': [(v, v) for v in [512, 1024, 2048, 4096, 8192, 16384]],
+    'gpu_capacity': [(v, v) for v in [16, 24, 32, 40, 48, 80]],
+    'calculation_method': [('local', 'Local Estimate'), ('gemini', 'Gemini (LLM-powered)'),
+                           ('parallel', 'Local now, Gemini if in time')],
+    'hardware': [(name, name.upper()) for name in HARDWARE_PROFILES],
+}
+# Option selected when the form has not been submitted yet
+FORM_DEFAULTS = {'calculation_method': 'gemini', 'hardware': DEFAULT_HARDWARE}
+
+# Estimates for COMMON_MODEL_SIZES over every dropdown combination, built at startup
+# (or memory-mapped from LOOKUP_TABLE_PATH, which is created on first run)
+lookup_table = LookupTable.load_or_build(
+    os.environ.get('LOOKUP_TABLE_PATH') or None,
+    **{name: [value for value, _ in FORM_CHOICES[name]]
+       for name in ('method', 'precision', 'batch_size', 'seq_len', 'gpu_capacity')})
+app.logger.info('lookup table: %d cells, %d bytes, ready in %.1f ms (%s)', lookup_table.cells,
+                lookup_table.nbytes, lookup_table.build_seconds * 1e3, lookup_table.source)
+
+def _render_options(choices, selected):
+    return Markup(''.join(
+        f'<option value="{escape(value)}"{" selected" if str(value) == selected else ""}>{escape(label)}</option>'
+        for value, label in choices
+    ))
+
+OPTIONS_HTML = {
+    (name, selected): _render_options(choices, selected)
+    for name, choices in FORM_CHOICES.items()
+    for selected in [None] + [str(value) for value, _ in choices]
+}
+
+@app.template_global()
+def options(name, form_data):
+    selected = form_data.get(name) if form_data else FORM_DEFAULTS.get(name)
+    return OPTIONS_HTML.get((name, selected), OPTIONS_HTML[(name, None)])
+
+app.jinja_env.globals['bootstrap_css'] = BOOTSTRAP_CSS
+app.jinja_env.globals['gemini_stream'] = GEMINI_STREAM
+
+# Compiled once at startup instead of on every request
+PAGE = app.jinja_env.from_string(TEMPLATE)
+
+# The empty form is the same for everyone: render and gzip it once, serve it with an ETag
+with app.app_context():
+    SHELL = CachedPage(PAGE.render(result=None, job_id=None, perf=None, form_data=None))
+
+# Estimator arguments and calculation method from the submitted fields (a form, a JSON object or query args)
+def parse_estimate_args(form_data):
+    params = parse_params(str(form_data['params']))
+    dataset_size_gb = parse_finite(form_data['dataset_size_gb'], 'dataset_size_gb')
+    batch_size = int(form_data['batch_size'])
+    epochs = int(form_data['epochs'])
+    method = form_data['method']
+    precision = form_data['precision']
+    seq_len = int(form_data['seq_len'])
+    gpu_capacity = int(form_data['gpu_capacity'])
+    calculation_method = form_data.get('calculation_method', 'local')
+    return (params, dataset_size_gb, batch_size, epochs, method, precision, seq_len, gpu_capacity), calculation_method
+
+# Run the selected calculation for the submitted fields.
+# Returns (result, job_id, perf); job_id is set when a Gemini answer is still on its way.
+def run_estimate(form_data):
+    result = None
+    job_id = None
+    perf = None
+    try:
+        with stage('parse'):
+            args, calculation_method = parse_estimate_args(form_data)
+        if calculation_method == 'gemini':
+            cached = gemini_cache.get(gemini_cache_key(*args)) if GEMINI_ASYNC else None
+            if cached is not None:
+                result = cached
+            elif GEMINI_ASYNC:
+                job_id = gemini_jobs.submit(estimate_resources_gemini, *args)
+            else:
+                result = estimate_resources_gemini(*args)
+        elif calculation_method == 'parallel':
+            with stage('estimate'):
+                local = estimate_resources_local(*args)
+                result = dict(local, source='local')
+            remote = [get_provider(name) for name in PARALLEL_PROVIDERS]
+            try:
+                job_id = gemini_jobs.submit(fan_out, remote, args, PARALLEL_DEADLINE, PARALLEL_MODE,
+                                            lambda answer: plausible_answer(answer, local))
+            except QueueFull:
+                # no room for the remote call: the local answer stands, without an upgrade
+                if registry.enabled:
+                    gemini_fallbacks.inc('queue_full')
+        else:
+            with stage('estimate'):
+                result = estimate_resources_local(*args)
+        # Only for inputs the estimate accepted (a pending job has no result yet)
+        if result is None or 'error' not in result:
+            with stage('perf'):
+                perf = estimate_performance(*args, hardware=form_data.get('hardware') or DEFAULT_HARDWARE)
+    except QueueFull as e:
+        # the server is busy, the request itself is fine: 503 with Retry-After (see estimate_response)
+        count_error(request.endpoint or 'index', e)
+        result, job_id, perf = {'error': str(e), 'retry_after': GEMINI_QUEUE_RETRY_AFTER}, None, None
+    except Exception as e:
+        count_error(request.endpoint or 'index', e)
+        result, job_id, perf = {'error': str(e)}, None, None
+    return result, job_id, perf
+
+def estimate_response(result, job_id, perf=None):
+    extra = {'perf': perf} if perf else {}
+    if job_id is not None and result is not None:
+        return jsonify(dict(result, upgrade={'id': job_id, 'poll': f'/jobs/{job_id}'}, **extra))
+    if job_id is not None:
+        return jsonify({'id': job_id, 'status': 'pending', 'poll': f'/jobs/{job_id}', **extra}), 202
+    if result is None:
+        return jsonify({'error': 'POST the form fields to get an estimate'}), 400
+    if 'retry_after' in result:
+        return jsonify(result), 503, {'Retry-After': str(result['retry_after'])}
+    return jsonify(dict(result, **extra)), 400 if 'error' in result else 200
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     result = None
-    form_data = None
+    job_id = None
+    perf = None
     if request.method == 'POST':
-        try:
-            form_data = request.form
-            params = parse_params(form_data['params'])
-            dataset_size_gb = float(form_data['dataset_size_gb'])
-            batch_size = int(form_data['batch_size'])
-            epochs = int(form_data['epochs'])
-            method = form_data['method']
-            precision = form_data['precision']
-            seq_len = int(form_data['seq_len'])
-            gpu_capacity = int(form_data['gpu_capacity'])
-            calculation_method = form_data.get('calculation_method', 'local')
-            if calculation_method == 'gemini':
-                result = estimate_resources_gemini(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len, gpu_capacity)
-            else:
-                result = estimate_resources_local(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len, gpu_capacity)
-        except Exception as e:
-            result = {'error': str(e)}
-    return render_template_string(TEMPLATE, result=result, form_data=request.form if request.method == 'POST' else None)
+        result, job_id, perf = run_estimate(request.form)
+    elif not wants_json():
+        return SHELL.response(request)
+    if wants_json():
+        return estimate_response(result, job_id, perf)
+    with stage('render'):
+        page = render_template(PAGE, result=result, job_id=job_id, perf=perf,
+                               form_data=request.form if request.method == 'POST' else None)
+    if result is not None and 'retry_after' in result:
+        return page, 503, {'Retry-After': str(result['retry_after'])}
+    return page
+
+# Result fields only, for the page script: a few hundred bytes instead of the whole page
+@app.route('/api/estimate', methods=['GET', 'POST'])
+def api_estimate():
+    return estimate_response(*run_estimate(request.get_json(silent=True) or request.values))
+
+# Gemini estimate as server-sent events (see stream_gemini_estimate); the page uses it when
+# calculation_method is gemini, so each number appears as soon as Gemini has written it
+@app.route('/api/estimate/stream', methods=['GET', 'POST'])
+def api_estimate_stream():
+    form_data = request.get_json(silent=True) or request.values
+    try:
+        args, _ = parse_estimate_args(form_data)
+        perf = estimate_performance(*args, hardware=form_data.get('hardware') or DEFAULT_HARDWARE)
+    except KeyError as e:
+        return jsonify({'error': f"missing field '{e.args[0]}'"}), 400
+    except (ValueError, TypeError, ZeroDivisionError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    def events():
+        yield f'event: perf\ndata: {json.dumps(perf)}\n\n'
+        for name, data in stream_gemini_estimate(*args):
+            yield f'event: {name}\ndata: {json.dumps(data)}\n\n'
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = gemini_jobs.get(job_id)
+    if job is None:
+        return jsonify({'id': job_id, 'status': 'error', 'error': 'Unknown or expired job'}), 404
+    return jsonify(job)
+
+@app.after_request
+def count_request(response):
+    if registry.enabled:
+        requests_total.inc(request.endpoint or 'unknown', str(response.status_code))
+        registry.start_flusher()
+    return gzip_response(response, request)
+
+def gemini_guard_metrics():
+    stats = gemini_guard.stats()
+    breaker = stats['breaker']
+    return [
+        ('llmcalc_gemini_breaker_state', 'gauge', 'Gemini circuit breaker state (1 for the current one)',
+         [({'state': state}, int(state == breaker['state'])) for state in ('closed', 'open', 'half_open')]),
+        ('llmcalc_gemini_breaker_opened_total', 'counter', 'Times the Gemini circuit breaker opened',
+         [({}, breaker['opened'])]),
+        ('llmcalc_gemini_shed_total', 'counter', 'Gemini calls rejected before reaching the API',
+         [({'reason': k}, v) for k, v in stats['shed'].items()]),
+        ('llmcalc_gemini_retries_total', 'counter', 'Gemini calls retried', [({}, stats['retries'])]),
+        ('llmcalc_gemini_retries_denied_total', 'counter', 'Gemini retries refused by the retry budget',
+         [({}, stats['retries_denied'])]),
+        ('llmcalc_gemini_inflight', 'gauge', 'Gemini calls in flight', [({}, stats['inflight'])]),
+    ]
+
+@registry.collector
+def queue_and_cache_metrics():
+    stats = gemini_cache.stats()
+    return [
+        ('llmcalc_gemini_cache_events_total', 'counter', 'Gemini cache lookups by outcome',
+         [({'outcome': k}, stats[k]) for k in ('hits', 'disk_hits', 'misses', 'coalesced', 'evictions')]),
+        ('llmcalc_gemini_cache_entries', 'gauge', 'Entries in the in-memory Gemini cache', [({}, stats['size'])]),
+        ('llmcalc_gemini_cache_saved_seconds_total', 'counter', 'Upstream seconds saved by cache hits',
+         [({}, stats['saved_seconds'])]),
+        ('llmcalc_gemini_jobs_pending', 'gauge', 'Gemini jobs waiting or running', [({}, gemini_jobs.pending())]),
+        *gemini_guard_metrics(),
+        ('llmcalc_lookup_table_bytes', 'gauge', 'Size of the precomputed lookup table', [({}, lookup_table.nbytes)]),
+        ('llmcalc_lookup_table_build_seconds', 'gauge', 'Time to build or map the lookup table',
+         [({}, lookup_table.build_seconds)]),
+    ]
+
+@app.route('/metrics')
+def metrics():
+    return Response(registry.expose(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify(gemini_cache.stats())
+
+@app.route('/gemini/stats')
+def gemini_stats():
+    return jsonify(gemini_guard.stats())
+
+@app.route('/lookup/stats')
+def lookup_stats():
+    return jsonify(lookup_table.stats())
+
+# Inputs accepted by /api/batch, with the defaults used by estimate_resources_local
+BATCH_FIELDS = {
+    'params': None,
+    'dataset_size_gb': None,
+    'batch_size': None,
+    'epochs': None,
+    'method': None,
+    'precision': None,
+    'seq_len': 2048,
+    'gpu_capacity': 80,
+}
+# Extra input when the request asks for throughput / latency too ("perf": true)
+PERF_BATCH_FIELDS = dict(BATCH_FIELDS, hardware=DEFAULT_HARDWARE)
+
+# Whole numbers > 0: a cast would silently truncate 2.7, and a zero batch size or GPU capacity
+# divides by zero (Infinity is not valid JSON)
+INT_BATCH_FIELDS = ('batch_size', 'epochs', 'seq_len', 'gpu_capacity')
+
+def _batch_column(name, values):
+    if name in ('method', 'precision', 'hardware'):
+        return np.array(values, dtype=str)
+    if name == 'params':
+        column = np.array([parse_params(v) if isinstance(v, str) else float(v) for v in values], dtype=float)
+    else:
+        column = np.array(values, dtype=float)
+    if not np.isfinite(column).all():
+        raise ValueError(f"{name} must be finite numbers")
+    if name in INT_BATCH_FIELDS:
+        if not ((column > 0) & (column == np.floor(column))).all():
+            raise ValueError(f"{name} must be positive integers")
+        return column.astype(np.int64)
+    return column
+
+# Turn a list of config dicts into one column per input
+def _batch_inputs_from_configs(configs, fields=BATCH_FIELDS):
+    for i, cfg in enumerate(configs):
+        if not isinstance(cfg, dict):
+            raise ValueError(f"configs[{i}] must be an object, got {type(cfg).__name__}")
+    columns = {}
+    for name, default in fields.items():
+        values = [cfg.get(name, default) for cfg in configs]
+        if any(v is None for v in values):
+            raise ValueError(f"missing field '{name}'")
+        columns[name] = _batch_column(name, values)
+    return columns
+
+# Turn {field: [values...]} into broadcastable axes covering the cartesian product
+def _batch_inputs_from_grid(grid, fields=BATCH_FIELDS):
+    if not isinstance(grid, dict):
+        raise ValueError(f"'grid' must be an object mapping fields to values, got {type(grid).__name__}")
+    unknown = set(grid) - set(fields)
+    if unknown:
+        raise ValueError(f"unknown grid fields: {', '.join(sorted(unknown))}")
+    axes = {}
+    for name, default in fields.items():
+        values = grid.get(name, default)
+        if values is None:
+            raise ValueError(f"missing field '{name}'")
+        if not isinstance(values, list):
+            values = [values]
+        axes[name] = _batch_column(name, values)
+    ndim = len(axes)
+    for i, name in enumerate(axes):
+        shape = [1] * ndim
+        shape[i] = axes[name].size
+        axes[name] = axes[name].reshape(shape)
+    return axes
+
+# Flat list for the JSON body; inf / nan (e.g. a zero-parameter model) become null
+def _json_column(a):
+    a = a.ravel()
+    if a.dtype.kind == 'f' and not np.isfinite(a).all():
+        a = np.where(np.isfinite(a), a, None)
+    return a.tolist()
+
+# Rows encoded per chunk of a streamed /api/batch body
+BATCH_CHUNK_ROWS = 10_000
+
+# /api/batch body, written a column or a chunk of rows at a time so a large sweep never holds every
+# row (or the whole JSON text) in memory. Encoding the JSON, not the estimate, bounds the endpoint:
+# benchmarks/bench_batch.py measures a few hundred thousand configs/s with format=columns and
+# about a third of that as rows, against tens of millions/s for estimate_batch itself.
+def _batch_body(count, columns, fmt):
+    yield f'{{"count":{count},'
+    if fmt == 'columns':
+        yield '"columns":{'
+        for i, (name, a) in enumerate(columns.items()):
+            yield f'{"," if i else ""}{json.dumps(name)}:{json.dumps(_json_column(a), separators=(",", ":"))}'
+        yield '}}'
+        return
+    yield '"results":['
+    names = list(columns)
+    total = next(iter(columns.values())).size
+    for start in range(0, total, BATCH_CHUNK_ROWS):
+        chunk = [_json_column(a[start:start + BATCH_CHUNK_ROWS]) for a in columns.values()]
+        rows = json.dumps([dict(zip(names, row)) for row in zip(*chunk)], separators=(',', ':'))
+        yield (',' if start else '') + rows[1:-1]
+    yield ']}'
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({'error': "expected a JSON object with 'configs' or 'grid'"}), 400
+    fields = PERF_BATCH_FIELDS if payload.get('perf') else BATCH_FIELDS
+    try:
+        if 'grid' in payload:
+            inputs = _batch_inputs_from_grid(payload['grid'], fields)
+            count = math.prod(a.size for a in inputs.values())
+        else:
+            configs = payload.get('configs')
+            if not isinstance(configs, list):
+                raise ValueError("expected 'configs' (list) or 'grid' (object)")
+            count = len(configs)
+        if count > MAX_BATCH_CONFIGS:
+            raise ValueError(f"too many configs: {count} > {MAX_BATCH_CONFIGS}")
+        if 'grid' not in payload:
+            inputs = _batch_inputs_from_configs(configs, fields)
+        results = estimate_resources_local_batch(**{name: inputs[name] for name in BATCH_FIELDS})
+        if payload.get('perf'):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                perf = performance_arrays(inputs['params'], inputs['method'], inputs['precision'], inputs['seq_len'],
+                                          inputs['batch_size'], inputs['dataset_size_gb'], inputs['epochs'],
+                                          inputs['hardware'])
+                results.update({f'perf_{name}': a if a.dtype.kind in 'bi' else round2(a) for name, a in perf.items()})
+            # a hardware grid axis adds a dimension the memory estimate does not have
+            shape = np.broadcast_shapes(*(a.shape for a in results.values()))
+            results = {name: np.broadcast_to(a, shape) for name, a in results.items()}
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    shape = next(iter(results.values())).shape
+    columns = {name: np.broadcast_to(a, shape).ravel() for name, a in inputs.items()}
+    columns.update({name: a.ravel() for name, a in results.items()})
+    return Response(_batch_body(count, columns, payload.get('format')), mimetype='application/json')
+
+# Largest batch size / sequence length that fits a memory budget (see llm_estimator.web.solve_response)
+@app.route('/api/solve', methods=['GET', 'POST'])
+def solve_config():
+    with stage('solve'):
+        return solve_response(request.get_json(silent=True) or request.values)
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# Stable content hash for a dict of (already normalized) inputs
+def make_key(inputs: dict) -> str:
+    blob = json.dumps(inputs, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+# Optional on-disk tier so cached answers survive restarts
+class DiskTier:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        with self._lock:
+            self._connection()
+
+    # Opened lazily and per process: a SQLite connection must not be used across fork(), and
+    # with preload_app the cache is created in the gunicorn master. Call with self._lock held.
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            with conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS responses '
+                    '(key TEXT PRIMARY KEY, value TEXT, stored_at REAL, latency REAL)'
+                )
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key, ttl):
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT value, stored_at, latency FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, stored_at, latency = row
+        if ttl is not None and time.time() - stored_at > ttl:
+            self.delete(key)
+            return None
+        return json.loads(value), stored_at, latency
+
+    def set(self, key, value, stored_at, latency):
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), stored_at, latency),
+            )
+
+    def delete(self, key):
+        with self._lock, self._connection() as conn:
+            conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock, self._connection() as conn:
+            conn.execute('DELETE FROM responses')
+
+
+# In-flight upstream call shared by identical concurrent requests
+class _Pending:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+# LRU + TTL response cache with request coalescing and an optional disk tier
+class ResponseCache:
+    def __init__(self, maxsize=1024, ttl=3600, disk_path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk = DiskTier(disk_path) if disk_path else None
+        self._entries = OrderedDict()  # key -> (value, stored_at, latency)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    # Must be called with self._lock held
+    def _lookup_memory(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry[1]):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    # Must be called with self._lock held
+    def _store_memory(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._lookup_memory(key)
+            if entry is not None:
+                self.hits += 1
+                self.saved_seconds += entry[2]
+                return entry[0]
+        if self.disk is not None:
+            entry = self.disk.get(key, self.ttl)
+            if entry is not None:
+                with self._lock:
+                    self._store_memory(key, entry)
+                    self.disk_hits += 1
+                    self.saved_seconds += entry[2]
+                return entry[0]
+        return None
+
+    def set(self, key, value, latency=0.0):
+        entry = (value, time.time(), latency)
+        with self._lock:
+            self._store_memory(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, *entry)
+
+    # get_or_compute for callers that produce the value themselves (e.g. while streaming it).
+    # Returns (value, None) when key is cached or a concurrent caller computed it meanwhile (waiting
+    # for that caller, and raising its error). Otherwise returns (None, finish): the caller must
+    # call finish(value) or finish(error=exc) exactly once, and identical claims wait until then.
+    def claim(self, key, cacheable=lambda value: True):
+        value = self.get(key)
+        if value is not None:
+            return value, None
+        with self._lock:
+            pending = self._pending.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._pending[key] = _Pending()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value, None
+        start = time.perf_counter()
+
+        def finish(value=None, error=None):
+            if pending.done.is_set():
+                return
+            try:
+                if error is None and cacheable(value):
+                    self.set(key, value, time.perf_counter() - start)
+            finally:
+                pending.value, pending.error = value, error
+                with self._lock:
+                    del self._pending[key]
+                pending.done.set()
+        return None, finish
+
+    # Return the cached value for key, or run compute() once for all concurrent callers.
+    # Values for which cacheable(value) is False are handed to waiters but not stored.
+    def get_or_compute(self, key, compute, cacheable=lambda value: True):
+        value, finish = self.claim(key, cacheable)
+        if finish is None:
+            return value
+        try:
+            value = compute()
+        except Exception as e:
+            finish(error=e)
+            raise
+        finish(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'disk': self.disk.path if self.disk is not None else None,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.disk_hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                'saved_seconds': round(self.saved_seconds, 3),
+            }
+
+
+# Build the cache from environment settings
+def cache_from_env(prefix='GEMINI_CACHE'):
+    ttl = float(os.environ.get(f'{prefix}_TTL', 3600))
+    return ResponseCache(
+        maxsize=int(os.environ.get(f'{prefix}_SIZE', 1024)),
+        ttl=ttl if ttl > 0 else None,
+        disk_path=os.environ.get(f'{prefix}_PATH') or None,
+    )
@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Gemini endpoint settings; GEMINI_API_URL can point at a local stub (see gemini_stub.py)
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', 'YOUR_GEMINI_API_KEY')
+GEMINI_API_URL = os.environ.get(
+    'GEMINI_API_URL',
+    'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent',
+)
+# streamGenerateContent endpoint; derived from GEMINI_API_URL unless set
+GEMINI_STREAM_URL = os.environ.get('GEMINI_STREAM_URL')
+GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 20))
+# Upper bound on simultaneous calls to the API (also the size of the keep-alive pool)
+GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', 8))
+
+_limit = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+_session = None
+_session_pid = None
+
+
+# Shared keep-alive session (urllib3's pool is thread-safe); recreated after a fork
+def get_session():
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=GEMINI_MAX_CONCURRENCY)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Content-Type': 'application/json',
+            'X-goog-api-key': GEMINI_API_KEY,
+        })
+        _session, _session_pid = session, os.getpid()
+    return _session
+
+
+# POST a prompt to generateContent and return the text of the first candidate
+def generate_content(prompt, url=None, timeout=None):
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
+    with _limit:
+        response = get_session().post(url or GEMINI_API_URL, json=data, timeout=timeout or GEMINI_TIMEOUT)
+    response.raise_for_status()
+    return response.json()['candidates'][0]['content']['parts'][0]['text']
+
+
+# Worth retrying: timeouts, dropped connections, 429 and 5xx (not bad requests or auth failures)
+def is_retryable(exc):
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and (exc.response.status_code == 429 or exc.response.status_code >= 500)
+    return isinstance(exc, (requests.Timeout, requests.ConnectionError))
+
+
+def stream_url():
+    return GEMINI_STREAM_URL or GEMINI_API_URL.replace(':generateContent', ':streamGenerateContent')
+
+
+# POST a prompt to streamGenerateContent (server-sent events) and yield the text of the first
+# candidate chunk by chunk as it arrives. Close the generator to drop the connection early.
+def stream_generate_content(prompt, url=None, timeout=None):
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
+    with _limit:
+        response = get_session().post(url or stream_url(), params={'alt': 'sse'}, json=data,
+                                      timeout=timeout or GEMINI_TIMEOUT, stream=True)
+        with response:
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            for line in response.iter_lines(chunk_size=1024, decode_unicode=True):
+                if not line.startswith('data:'):
+                    continue
+                candidates = json.loads(line[5:]).get('candidates') or [{}]
+                for part in candidates[0].get('content', {}).get('parts', []):
+                    if part.get('text'):
+                        yield part['text']
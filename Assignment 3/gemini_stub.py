@@ -0,0 +1,101 @@
+# Local stand-in for the Gemini generateContent endpoint, for development and load tests.
+#   python gemini_stub.py --port 8081 --delay 2
+#   GEMINI_API_URL=http://127.0.0.1:8081/v1beta/models/stub:generateContent python app.py
+# streamGenerateContent is replayed as server-sent events over a chunked response, chunk_size
+# characters of the text per event with chunk_delay seconds between events; generateContent then
+# answers after the same total generation time.
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Canned answer; wrapped in prose to exercise the JSON extraction
+STUB_ESTIMATE = {
+    "memory_gb": 56.0, "gpu_hours": 1.25, "inf_memory_gb": 28.0, "inf_gpu_hours": 0.25,
+    "gpus_ft": 1, "flops_ft": 4.2e10, "gpus_inf": 1, "flops_inf": 1.4e10,
+}
+# Prose with stray braces around a fenced answer, which slicing from the first '{' to the last '}' gets wrong
+PROSE_TEXT = ("Sure! Assuming {batch_size} is per device (see {notes}), here is my estimate:\n```json\n"
+              + json.dumps(STUB_ESTIMATE, indent=2) + "\n```\nActual usage may differ by {10-20%}.")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    delay = 0.0
+    status = 200
+    text = "Here is the estimate:\n" + json.dumps(STUB_ESTIMATE)
+    chunk_size = 16
+    chunk_delay = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self.server.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if ':streamGenerateContent' in self.path and self.status == 200:
+            self._stream()
+            return
+        if self.chunk_delay:
+            time.sleep(self.chunk_delay * ((len(self.text) - 1) // self.chunk_size))
+        body = json.dumps({"candidates": [{"content": {"parts": [{"text": self.text}]}}]}).encode('utf-8')
+        self.send_response(self.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for i in range(0, len(self.text), self.chunk_size):
+                if i and self.chunk_delay:
+                    time.sleep(self.chunk_delay)
+                event = {"candidates": [{"content": {"parts": [{"text": self.text[i:i + self.chunk_size]}]}}]}
+                self._write_chunk(f'data: {json.dumps(event)}\r\n\r\n'.encode('utf-8'))
+            self._write_chunk(b'')
+        except (BrokenPipeError, ConnectionResetError):
+            # the client stops reading once it has the JSON object
+            self.close_connection = True
+
+    def _write_chunk(self, data):
+        self.wfile.write(b'%X\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Start a stub server in a background thread; returns (server, url)
+def serve(port=0, delay=0.0, status=200, text=None, chunk_size=16, chunk_delay=0.0):
+    handler = type('Handler', (StubHandler,), {'delay': delay, 'status': status, 'text': text or StubHandler.text,
+                                               'chunk_size': chunk_size, 'chunk_delay': chunk_delay})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    server.calls = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f'http://{host}:{port}/v1beta/models/stub:generateContent'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local Gemini stub server')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds to wait before answering')
+    parser.add_argument('--status', type=int, default=200, help='HTTP status to return')
+    parser.add_argument('--chunk-size', type=int, default=16, help='characters per streamed event')
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help='seconds between streamed events')
+    parser.add_argument('--prose', action='store_true', help='wrap the answer in prose with stray braces')
+    args = parser.parse_args()
+    server, url = serve(args.port, args.delay, args.status, PROSE_TEXT if args.prose else None,
+                        args.chunk_size, args.chunk_delay)
+    print(f'Gemini stub listening on {url}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
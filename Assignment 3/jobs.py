@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    pass
+
+
+# Job states in a SQLite file shared by all worker processes, so a poll can land on any worker.
+# Results must be JSON-serialisable.
+class SharedJobStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    # Opened lazily and per process (never used across fork). Call with self._lock held.
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            with conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS jobs '
+                    '(id TEXT PRIMARY KEY, status TEXT, result TEXT, error TEXT, created REAL, finished REAL)'
+                )
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def put(self, job_id, job):
+        with self._lock, self._connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)',
+                         (job_id, job['status'], json.dumps(job['result']), job['error'],
+                          job['created'], job['finished']))
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT status, result, error, created, finished FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, result, error, created, finished = row
+        return {'status': status, 'result': json.loads(result), 'error': error,
+                'created': created, 'finished': finished}
+
+    # Also drops jobs a recycled or crashed worker never finished
+    def purge(self, ttl):
+        with self._lock, self._connection() as conn:
+            conn.execute('DELETE FROM jobs WHERE COALESCE(finished, created) < ?', (time.time() - ttl,))
+
+
+# Background job runner for slow calls: submit() returns an id right away, get() polls it.
+# With store_path set, job states are also written to a SharedJobStore so that every worker of a
+# pre-fork server can answer get(); the queue limit still applies per process.
+class JobRunner:
+    def __init__(self, max_workers=8, max_pending=256, ttl=600, name='job', store_path=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.name = name
+        self.store = SharedJobStore(store_path) if store_path else None
+        self._jobs = {}  # id -> dict(status, result, error, created, finished)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    # Created lazily and per process, so a forked worker never inherits dead threads
+    def _get_executor(self):
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            self._pid = os.getpid()
+            self._jobs = {}
+        return self._executor
+
+    # Must be called with self._lock held
+    def _purge(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished'] is not None and now - job['finished'] > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def pending(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job['status'] == 'pending')
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            executor = self._get_executor()
+            self._purge()
+            if sum(1 for job in self._jobs.values() if job['status'] == 'pending') >= self.max_pending:
+                raise QueueFull(f'{self.name} queue is full ({self.max_pending} pending)')
+            job_id = uuid.uuid4().hex
+            job = self._jobs[job_id] = {'status': 'pending', 'result': None, 'error': None,
+                                        'created': time.time(), 'finished': None}
+        if self.store is not None:
+            self.store.purge(self.ttl)
+            self.store.put(job_id, job)
+        executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        try:
+            result, error = fn(*args, **kwargs), None
+        except Exception as e:
+            result, error = None, str(e)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status='error' if error else 'done', result=result, error=error, finished=time.time())
+                job = dict(job)
+        if job is not None and self.store is not None:
+            self.store.put(job_id, job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job = dict(job)
+        if job is None and self.store is not None:
+            job = self.store.get(job_id)
+            if job is not None and job['finished'] is not None and time.time() - job['finished'] > self.ttl:
+                job = None
+        if job is None:
+            return None
+        return {'id': job_id, 'status': job['status'], 'result': job['result'], 'error': job['error']}
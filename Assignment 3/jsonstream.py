@@ -0,0 +1,158 @@
+# Incremental extraction of one JSON object from model output that may wrap it in prose,
+# markdown fences or stray braces ("assuming {batch} is per GPU ..."). Text is fed in arbitrary
+# chunks and every top-level member is reported as soon as its value is complete, so a client
+# can show the first number long before the model finishes. Each feed only rescans the member
+# currently being received.
+import json
+
+_WS = ' \t\r\n'
+_NUMBER_CHARS = set('-+0123456789.eE')
+_LITERALS = ('true', 'false', 'null')
+
+
+class _Incomplete(Exception):
+    pass
+
+
+class _Invalid(Exception):
+    pass
+
+
+def _string_end(buf, i):
+    j = i + 1
+    while j < len(buf):
+        c = buf[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '"':
+            return j + 1
+        if c == '\n':  # raw newlines never appear inside JSON strings, but do in prose
+            raise _Invalid
+        j += 1
+    raise _Incomplete
+
+
+def _value_end(buf, i):
+    c = buf[i]
+    if c == '"':
+        return _string_end(buf, i)
+    if c in '{[':
+        depth = 0
+        j = i
+        while j < len(buf):
+            c = buf[j]
+            if c == '"':
+                j = _string_end(buf, j)
+                continue
+            if c in '{[':
+                depth += 1
+            elif c in '}]':
+                depth -= 1
+                if depth == 0:
+                    return j + 1
+            j += 1
+        raise _Incomplete
+    if c in _NUMBER_CHARS:
+        j = i
+        while j < len(buf) and buf[j] in _NUMBER_CHARS:
+            j += 1
+        if j == len(buf):  # more digits may follow in the next chunk
+            raise _Incomplete
+        return j
+    for word in _LITERALS:
+        if buf.startswith(word, i):
+            return i + len(word)
+        if word.startswith(buf[i:]):
+            raise _Incomplete
+    raise _Invalid
+
+
+class JSONObjectStream:
+    # wanted: keys that make an object the answer; other complete objects are skipped
+    def __init__(self, wanted=None):
+        self.wanted = set(wanted) if wanted else None
+        self.buf = ''
+        self.start = None  # the '{' of the object being read is buf[0] while set
+        self.pos = 0       # where to resume: the scan position, or the start of the next member
+        self.members = {}
+        self.result = None
+        self.resets = 0
+
+    # Returns a list of events: ('field', key, value), ('reset',) when fields already reported
+    # turn out not to belong to a JSON object, and ('done', members) once the object closes
+    def feed(self, text):
+        events = []
+        if self.result is not None:
+            return events
+        self.buf += text
+        while self.result is None:
+            if self.start is None:
+                i = self.buf.find('{', self.pos)
+                if i == -1:
+                    self.buf, self.pos = '', 0
+                    break
+                self.buf, self.start, self.pos, self.members = self.buf[i:], 0, 1, {}
+            try:
+                self._read_members(events)
+            except _Incomplete:
+                break
+            except _Invalid:
+                self._abandon(events)
+                continue
+            if self.wanted is None or self.wanted & self.members.keys():
+                self.result = self.members
+                events.append(('done', self.members))
+            else:
+                self._abandon(events)
+        return events
+
+    def _abandon(self, events):
+        if self.members and (self.wanted is None or self.wanted & self.members.keys()):
+            events.append(('reset',))
+            self.resets += 1
+        self.start, self.pos, self.members = None, 1, {}
+
+    def _skip_ws(self, i):
+        buf = self.buf
+        while i < len(buf) and buf[i] in _WS:
+            i += 1
+        if i == len(buf):
+            raise _Incomplete
+        return i
+
+    def _read_members(self, events):
+        buf = self.buf
+        while True:
+            i = self._skip_ws(self.pos)
+            if buf[i] == '}':
+                return
+            if buf[i] != '"':
+                raise _Invalid
+            end = _string_end(buf, i)
+            key = buf[i:end]
+            i = self._skip_ws(end)
+            if buf[i] != ':':
+                raise _Invalid
+            i = self._skip_ws(i + 1)
+            end = _value_end(buf, i)
+            try:
+                key, value = json.loads(key), json.loads(buf[i:end])
+            except ValueError:
+                raise _Invalid from None
+            i = self._skip_ws(end)
+            if buf[i] not in ',}':
+                raise _Invalid
+            self.members[key] = value
+            if self.wanted is None or key in self.wanted:
+                events.append(('field', key, value))
+            self.pos = i + 1
+            if buf[i] == '}':
+                return
+
+
+# The first JSON object in text (having one of the wanted keys), or None
+def extract_json_object(text, wanted=None):
+    parser = JSONObjectStream(wanted)
+    parser.feed(text)
+    return parser.result
@@ -0,0 +1,372 @@
+# Lightweight in-process metrics with Prometheus text exposition.
+# Each observation is one perf_counter() pair, a bisect and a locked increment; set
+# METRICS_ENABLED=0 to turn the timers into no-ops.
+# Under a pre-fork server, METRICS_MULTIPROC_DIR (set by gunicorn.conf.py) names a directory the
+# workers share: each process writes its samples to <dir>/<pid>.json about once a second and
+# /metrics merges all files. Counters and histograms are summed; when a worker exits, the master
+# folds its file into exited.json (collect_exited, from gunicorn's child_exit) so totals never go
+# backwards and a new worker that reuses the pid starts from zero. Collector gauges get a pid label,
+# for live workers only.
+import contextlib
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR') or None
+FLUSH_INTERVAL = 1.0
+# Samples of exited workers in METRICS_MULTIPROC_DIR, next to the <pid>.json files
+EXITED_FILE = 'exited.json'
+
+# Seconds; covers sub-millisecond estimator calls up to the 20 s Gemini timeout
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def items(self):
+        with self._lock:
+            return sorted(self._values.items())
+
+    def merge(self, items):
+        with self._lock:
+            for labels, value in items:
+                labels = tuple(labels)
+                self._values[labels] = self._values.get(labels, 0) + value
+
+    def reset(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def empty(self):
+        return Counter(self.name, self.help, self.labelnames)
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        lines += [f'{self.name}{_labels(self.labelnames, k)} {_number(v)}' for k, v in self.items()]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [count per bucket..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def items(self):
+        with self._lock:
+            return sorted((k, list(v)) for k, v in self._series.items())
+
+    def merge(self, items):
+        with self._lock:
+            for labels, series in items:
+                labels = tuple(labels)
+                current = self._series.get(labels)
+                self._series[labels] = series if current is None else [a + b for a, b in zip(current, series)]
+
+    def reset(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def empty(self):
+        return Histogram(self.name, self.help, self.labelnames, self.buckets)
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, series in self.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram, self.labels = histogram, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# Exclusive while the master folds a file into exited.json, shared while a scrape reads the
+# directory, so no scrape sees an exited worker twice or not at all
+@contextlib.contextmanager
+def _dir_lock(directory, exclusive):
+    import fcntl  # multi-process mode is for gunicorn, which is POSIX only
+    with open(os.path.join(directory, '.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# Add snapshot's counters and histograms (and collector counters) to archive, in place
+def _fold(archive, snapshot):
+    for name, items in snapshot['metrics'].items():
+        merged = {tuple(labels): value for labels, value in archive['metrics'].get(name, ())}
+        for labels, value in items:
+            current = merged.get(tuple(labels))
+            if current is None:
+                merged[tuple(labels)] = value
+            elif isinstance(value, list):
+                merged[tuple(labels)] = [a + b for a, b in zip(current, value)]
+            else:
+                merged[tuple(labels)] = current + value
+        archive['metrics'][name] = [[list(labels), value] for labels, value in merged.items()]
+    families = {name: (kind, help, {tuple(labels.items()): value for labels, value in samples})
+                for name, kind, help, samples in archive['collectors']}
+    for name, kind, help, samples in snapshot['collectors']:
+        if kind != 'counter':
+            continue  # gauges of a process that is gone
+        family = families.setdefault(name, (kind, help, {}))[2]
+        for labels, value in samples:
+            key = tuple(labels.items())
+            family[key] = family.get(key, 0) + value
+    archive['collectors'] = [[name, kind, help, [[dict(k), v] for k, v in family.items()]]
+                             for name, (kind, help, family) in families.items()]
+    return archive
+
+
+def _lines(name, kind, help, samples):
+    lines = [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        lines.append(f'{name}{_labels(labels.keys(), labels.values())} {_number(value)}')
+    return lines
+
+
+class Registry:
+    def __init__(self, enabled=METRICS_ENABLED, multiproc_dir=METRICS_MULTIPROC_DIR):
+        self.enabled = enabled
+        self.multiproc_dir = multiproc_dir
+        self._metrics = []
+        self._collectors = []  # callables returning [(name, type, help, [(labels dict, value)])]
+        self._flusher_pid = None
+        self._flush_lock = threading.Lock()
+        # A forked worker starts from zero; what the parent counted is not the worker's
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        for metric in self._metrics:
+            metric.reset()
+        self._flush_lock = threading.Lock()
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    # Register a callback sampled at scrape time (e.g. cache or queue sizes)
+    def collector(self, fn):
+        self._collectors.append(fn)
+        return fn
+
+    def _samples(self):
+        return [sample for fn in self._collectors for sample in fn()]
+
+    # Write this process's samples for the other workers to merge (multi-process mode only)
+    def flush(self):
+        if self.multiproc_dir is None:
+            return
+        snapshot = {
+            'metrics': {m.name: m.items() for m in self._metrics},
+            'collectors': self._samples(),
+        }
+        path = os.path.join(self.multiproc_dir, f'{os.getpid()}.json')
+        with self._flush_lock:
+            with open(path + '.tmp', 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(path + '.tmp', path)
+
+    # Start this process's background flusher on first use (per process, so it survives fork)
+    def start_flusher(self):
+        if self.multiproc_dir is None or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(FLUSH_INTERVAL)
+                self.flush()
+        threading.Thread(target=run, name='metrics-flush', daemon=True).start()
+
+    # Fold the file of an exited worker into exited.json and remove it. Called in the gunicorn
+    # master (child_exit) once the worker is gone, so nothing writes the file any more.
+    def collect_exited(self, pid):
+        if self.multiproc_dir is None:
+            return
+        path = os.path.join(self.multiproc_dir, f'{pid}.json')
+        exited_path = os.path.join(self.multiproc_dir, EXITED_FILE)
+        with _dir_lock(self.multiproc_dir, exclusive=True):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except FileNotFoundError:
+                return  # exited before its first flush
+            except (OSError, ValueError):
+                snapshot = None
+            if snapshot is not None:
+                try:
+                    with open(exited_path) as f:
+                        archive = json.load(f)
+                except (OSError, ValueError):
+                    archive = {'metrics': {}, 'collectors': []}
+                with open(exited_path + '.tmp', 'w') as f:
+                    json.dump(_fold(archive, snapshot), f)
+                os.replace(exited_path + '.tmp', exited_path)
+            os.remove(path)
+
+    def _expose_multiproc(self):
+        self.flush()
+        merged = [metric.empty() for metric in self._metrics]
+        families = {}  # name -> (kind, help, {label items: value}) for collector samples
+        with _dir_lock(self.multiproc_dir, exclusive=False):
+            snapshots = []
+            for path in sorted(glob.glob(os.path.join(self.multiproc_dir, '*.json'))):
+                try:
+                    with open(path) as f:
+                        snapshots.append((os.path.basename(path)[:-len('.json')], json.load(f)))
+                except (OSError, ValueError):
+                    continue
+        for stem, snapshot in snapshots:
+            for metric in merged:
+                metric.merge(snapshot['metrics'].get(metric.name, ()))
+            pid = int(stem) if stem.isdigit() else None
+            live = pid is not None and (pid == os.getpid() or _alive(pid))
+            for name, kind, help, samples in snapshot['collectors']:
+                family = families.setdefault(name, (kind, help, {}))[2]
+                for labels, value in samples:
+                    if kind == 'counter':
+                        key = tuple(labels.items())
+                        family[key] = family.get(key, 0) + value
+                    elif live:
+                        family[tuple(labels.items()) + (('pid', str(pid)),)] = value
+        lines = []
+        for metric in merged:
+            lines += metric.expose()
+        for name, (kind, help, family) in families.items():
+            lines += _lines(name, kind, help, [(dict(k), v) for k, v in family.items()])
+        return '\n'.join(lines) + '\n'
+
+    def expose(self):
+        if self.multiproc_dir is not None:
+            return self._expose_multiproc()
+        lines = []
+        for metric in self._metrics:
+            lines += metric.expose()
+        for name, kind, help, samples in self._samples():
+            lines += _lines(name, kind, help, samples)
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+stage_seconds = registry.histogram(
+    'llmcalc_stage_seconds', 'Time spent in each request stage', ['stage'])
+errors_total = registry.counter(
+    'llmcalc_errors_total', 'Errors by stage and exception type', ['stage', 'type'])
+requests_total = registry.counter(
+    'llmcalc_requests_total', 'HTTP requests by endpoint and status', ['endpoint', 'status'])
+
+
+# Time a block of code: `with stage('render'): ...`
+def stage(name):
+    if not registry.enabled:
+        return _NOOP
+    return stage_seconds.time(name)
+
+
+# Record a duration measured across yields or callbacks, where a `with stage()` block does not fit
+def observe_stage(name, seconds):
+    if registry.enabled:
+        stage_seconds.observe(seconds, name)
+
+
+# Count an exception (or an error kind given as a string) against a stage
+def count_error(stage_name, exc):
+    if registry.enabled:
+        errors_total.inc(stage_name, exc if isinstance(exc, str) else type(exc).__name__)
@@ -0,0 +1,106 @@
+# Pluggable estimate providers and deadline-bound fan-out across them.
+# A provider is anything with a `name` and an `estimate(*args)` returning the estimate dict
+# (or a dict with an 'error' key); args are the estimate_resources_local arguments.
+import math
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from metrics import count_error
+
+
+class FunctionProvider:
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+
+    def estimate(self, *args):
+        return self.fn(*args)
+
+
+_providers = {}
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def register_provider(provider):
+    _providers[provider.name] = provider
+    return provider
+
+
+def get_provider(name):
+    return _providers[name]
+
+
+def provider_names():
+    return list(_providers)
+
+
+# Created lazily and per process, so a forked worker never inherits dead threads
+def _get_executor():
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=int(os.environ.get('PROVIDER_WORKERS', 16)),
+                                           thread_name_prefix='provider')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _ok(result):
+    return isinstance(result, dict) and 'error' not in result
+
+
+def _call(provider, args):
+    try:
+        return provider.estimate(*args)
+    except Exception as e:
+        count_error(f'provider:{provider.name}', e)
+        return {'error': str(e)}
+
+
+# Median per numeric field over several answers; GPU counts are rounded up
+def combine(results):
+    combined = {}
+    for key in results[0]:
+        values = [r[key] for r in results if isinstance(r.get(key), (int, float))]
+        if not values:
+            continue
+        value = statistics.median(values)
+        combined[key] = math.ceil(value) if all(isinstance(v, int) for v in values) else round(value, 2)
+    return combined
+
+
+# Ask every provider at once and wait at most `deadline` seconds.
+#   mode='first'    -> the first valid answer, tagged with its provider
+#   mode='ensemble' -> the median of all valid answers received before the deadline
+# accept(result) decides which answers are valid (by default any dict without an 'error').
+# Returns None when no provider answered in time. Late calls keep running in the background
+# (a late Gemini answer still lands in the response cache for the next request).
+def fan_out(providers, args, deadline=5.0, mode='first', accept=_ok):
+    if not providers:
+        return None
+    executor = _get_executor()
+    pending = {executor.submit(_call, p, args): p.name for p in providers}
+    answers = []
+    remaining = deadline
+    start = time.monotonic()
+    while pending and remaining > 0:
+        done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            result = future.result()
+            if _ok(result) and accept(result):
+                answers.append((name, result))
+        if answers and mode == 'first':
+            break
+        remaining = deadline - (time.monotonic() - start)
+    if not answers:
+        return None
+    if mode == 'first':
+        name, result = answers[0]
+        return dict(result, source=name)
+    return dict(combine([r for _, r in answers]), source='+'.join(name for name, _ in answers))
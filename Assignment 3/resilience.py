@@ -0,0 +1,309 @@
+# Admission control and failure handling for outbound calls (the Gemini API):
+#   TokenBucket      - rate limit, sheds calls above `rate`/s once the burst is spent
+#   ConcurrencyLimit - sheds calls while `limit` are already in flight
+#   CircuitBreaker   - opens when the failure or slow-call rate over the last `window` calls is
+#                      too high, rejects everything for `open_seconds`, then lets a few trial
+#                      calls through (half-open) to decide whether to close again
+#   RetryBudget      - retries may add at most `ratio` extra calls on top of the first attempts
+# Guard ties them together; a rejected call raises Rejected so the caller can fall back.
+# The time-based classes take a `clock` (time.monotonic by default), so tests can drive time by hand.
+import os
+import random
+import threading
+import time
+from collections import deque
+
+
+class Rejected(Exception):
+    def __init__(self, reason):
+        super().__init__(f'Gemini call shed ({reason})')
+        self.reason = reason
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def tokens(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class ConcurrencyLimit:
+    def __init__(self, limit):
+        self.limit = limit
+        self.inflight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.inflight >= self.limit:
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.inflight -= 1
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_rate=0.5, slow_seconds=5.0, slow_rate=0.5, window=20, min_calls=5,
+                 open_seconds=30.0, half_open_calls=2, clock=time.monotonic):
+        self.failure_rate = failure_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.state = self.CLOSED
+        self.opened = 0  # times the breaker has opened
+        self._outcomes = deque(maxlen=window)  # (failed, slow) per finished call
+        self._opened_at = 0.0
+        self._trials = 0      # half-open calls in flight
+        self._trials_ok = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self._opened_at < self.open_seconds:
+                    return False
+                self.state, self._trials, self._trials_ok = self.HALF_OPEN, 0, 0
+            if self.state == self.HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    return False
+                self._trials += 1
+            return True
+
+    # An allowed call that was not made after all (shed by another limit, or abandoned)
+    def cancel(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._trials:
+                self._trials -= 1
+
+    def record(self, ok, seconds):
+        slow = seconds >= self.slow_seconds
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trials = max(0, self._trials - 1)
+                if not ok or slow:
+                    self._open()
+                    return
+                self._trials_ok += 1
+                if self._trials_ok >= self.half_open_calls:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state == self.OPEN:
+                return  # a call that started before the breaker opened
+            self._outcomes.append((not ok, slow))
+            calls = len(self._outcomes)
+            if calls >= self.min_calls:
+                failures = sum(failed for failed, _ in self._outcomes)
+                slow_calls = sum(s for _, s in self._outcomes)
+                if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_rate:
+                    self._open()
+
+    # Must be called with self._lock held
+    def _open(self):
+        self.state = self.OPEN
+        self.opened += 1
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+
+    def stats(self):
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                'state': self.state,
+                'opened': self.opened,
+                'window_calls': calls,
+                'failure_rate': round(sum(f for f, _ in self._outcomes) / calls, 4) if calls else 0.0,
+                'slow_rate': round(sum(s for _, s in self._outcomes) / calls, 4) if calls else 0.0,
+            }
+
+
+class RetryBudget:
+    # Every first attempt deposits `ratio` of a retry; `min_per_second` keeps a trickle of
+    # retries available when traffic is low
+    def __init__(self, ratio=0.2, min_per_second=1.0, max_tokens=10.0, clock=time.monotonic):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.clock = clock
+        self._tokens = max_tokens
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self):
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.max_tokens, self._tokens + (now - self._updated) * self.min_per_second)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+# "Full jitter" exponential backoff: uniform in [0, min(cap, base * 2**attempt))
+def backoff(attempt, base=0.2, cap=2.0):
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class _Attempt:
+    def __init__(self, guard):
+        self.guard = guard
+
+    def __enter__(self):
+        self.guard._admit()
+        self.guard.budget.deposit()
+        self.start = self.guard.clock()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        guard = self.guard
+        if exc_type is GeneratorExit:
+            guard.breaker.cancel()  # the consumer went away; says nothing about the upstream
+        else:
+            guard.breaker.record(exc_type is None or not guard.retryable(exc), guard.clock() - self.start)
+        guard.limit.release()
+        return False
+
+
+# retryable(exc) tells transient upstream failures (retried, and counted by the breaker) from errors
+# such as a bad request or an auth failure, which are raised at once and say nothing about the
+# upstream's health
+class Guard:
+    def __init__(self, bucket, limit, breaker, budget, max_attempts=3, base_delay=0.2, max_delay=2.0,
+                 retryable=lambda exc: True, clock=time.monotonic, sleep=time.sleep):
+        self.bucket = bucket
+        self.limit = limit
+        self.breaker = breaker
+        self.budget = budget
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+        self.clock = clock
+        self.sleep = sleep
+        self.shed = {'breaker_open': 0, 'rate_limited': 0, 'concurrency': 0}
+        self.retries = 0
+        self.retries_denied = 0
+        self._lock = threading.Lock()
+
+    def _count_shed(self, reason):
+        with self._lock:
+            self.shed[reason] += 1
+        raise Rejected(reason)
+
+    def _admit(self):
+        if not self.breaker.allow():
+            self._count_shed('breaker_open')
+        if not self.bucket.try_acquire():
+            self.breaker.cancel()
+            self._count_shed('rate_limited')
+        if not self.limit.try_acquire():
+            self.breaker.cancel()
+            self._count_shed('concurrency')
+
+    def _may_retry(self):
+        if not self.budget.try_withdraw():
+            with self._lock:
+                self.retries_denied += 1
+            return False
+        if not self.breaker.allow():
+            return False
+        if not self.bucket.try_acquire():
+            self.breaker.cancel()
+            return False
+        with self._lock:
+            self.retries += 1
+        return True
+
+    # Call fn with admission control, the breaker and jittered retries; raises Rejected when shed
+    # and the last exception when every allowed attempt failed
+    def call(self, fn, *args, **kwargs):
+        self._admit()
+        self.budget.deposit()
+        try:
+            attempt = 0
+            while True:
+                start = self.clock()
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    transient = self.retryable(e)
+                    self.breaker.record(not transient, self.clock() - start)
+                    attempt += 1
+                    if attempt >= self.max_attempts or not transient or not self._may_retry():
+                        raise
+                    self.sleep(backoff(attempt, self.base_delay, self.max_delay))
+                    continue
+                self.breaker.record(True, self.clock() - start)
+                return result
+        finally:
+            self.limit.release()
+
+    # Single attempt without retries, for streamed calls: `with guard.attempt(): ...`
+    def attempt(self):
+        return _Attempt(self)
+
+    def stats(self):
+        with self._lock:
+            shed = dict(self.shed)
+            retries, denied = self.retries, self.retries_denied
+        return {
+            'breaker': self.breaker.stats(),
+            'shed': shed,
+            'retries': retries,
+            'retries_denied': denied,
+            'inflight': self.limit.inflight,
+            'rate_tokens': round(self.bucket.tokens(), 3),
+        }
+
+
+# Guard configured from <PREFIX>_RATE / _BURST / _MAX_INFLIGHT / _MAX_ATTEMPTS (first call plus
+# retries) / _RETRY_BASE / _RETRY_MAX / _RETRY_BUDGET and <PREFIX>_BREAKER_FAILURE_RATE / _SLOW_SECONDS / _SLOW_RATE / _WINDOW / _MIN_CALLS / _OPEN_SECONDS
+def guard_from_env(prefix='GEMINI', max_inflight=8, retryable=lambda exc: True):
+    def env(name, default):
+        return float(os.environ.get(f'{prefix}_{name}', default))
+    return Guard(
+        TokenBucket(rate=env('RATE', 10), burst=env('BURST', 20)),
+        ConcurrencyLimit(int(env('MAX_INFLIGHT', max_inflight))),
+        CircuitBreaker(failure_rate=env('BREAKER_FAILURE_RATE', 0.5), slow_seconds=env('BREAKER_SLOW_SECONDS', 5),
+                       slow_rate=env('BREAKER_SLOW_RATE', 0.5), window=int(env('BREAKER_WINDOW', 20)),
+                       min_calls=int(env('BREAKER_MIN_CALLS', 5)), open_seconds=env('BREAKER_OPEN_SECONDS', 30)),
+        RetryBudget(ratio=env('RETRY_BUDGET', 0.2)),
+        max_attempts=int(env('MAX_ATTEMPTS', 3)),
+        base_delay=env('RETRY_BASE', 0.2),
+        max_delay=env('RETRY_MAX', 2.0),
+        retryable=retryable,
+    )
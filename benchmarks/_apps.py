@@ -0,0 +1,37 @@
+# Load the assignment apps by path (their folder names contain spaces, so they are not importable)
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIRS = {
+    'assignment2': os.path.join(ROOT, 'Assignment 2'),
+    'assignment3': os.path.join(ROOT, 'Assignment 3'),
+}
+
+# Form posted by the benchmarks to each app's index()
+FORMS = {
+    'assignment2': {
+        'params': '7B', 'method': 'full', 'precision': 'fp16',
+        'seq_len': '2048', 'batch_size': '4', 'gpu_capacity': '80',
+    },
+    'assignment3': {
+        'params': '7B', 'dataset_size_gb': '10', 'batch_size': '4', 'epochs': '1',
+        'method': 'full', 'precision': 'fp16', 'seq_len': '2048', 'gpu_capacity': '80',
+        'calculation_method': 'local',
+    },
+}
+
+
+def load_app(name):
+    module_name = f'{name}_app'
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    app_dir = APP_DIRS[name]
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(app_dir, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
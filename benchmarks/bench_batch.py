@@ -0,0 +1,66 @@
+# /api/batch throughput end to end (request parsing, estimate, JSON body) against estimate_batch alone
+#   python benchmarks/bench_batch.py --batch-sizes 1,2,4,8,16,32,64 --epochs 1,2,3,5
+import argparse
+import math
+import resource
+import time
+
+from _apps import load_app
+
+GRID = {
+    'params': ['125M', '350M', '1B', '1.3B', '2B', '3B', '7B', '8B', '13B', '14B', '30B', '34B', '40B', '65B',
+               '70B', '175B', '405B'],
+    'dataset_size_gb': [1, 10, 100],
+    'method': ['full', 'lora', 'qlora'],
+    'precision': ['fp16', 'fp32', 'int8', 'int4'],
+    'seq_len': [512, 1024, 2048, 4096, 8192, 16384],
+    'gpu_capacity': [40, 80],
+}
+
+
+def _ints(text):
+    return [int(v) for v in text.split(',')]
+
+
+def _read(response):
+    response.get_data()
+    return response
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='/api/batch throughput benchmark')
+    parser.add_argument('--batch-sizes', type=_ints, default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument('--epochs', type=_ints, default=[1, 2, 3])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = load_app('assignment3')
+    grid = dict(GRID, batch_size=args.batch_sizes, epochs=args.epochs)
+    count = math.prod(len(values) for values in grid.values())
+    client = app.app.test_client()
+
+    inputs = app._batch_inputs_from_grid(grid)
+    seconds, _ = best_of(lambda: app.estimate_resources_local_batch(**inputs), args.repeat)
+    print(f'{count} configs')
+    print(f'  {"estimate_batch (in process)":30s} {seconds:8.3f} s  {count / seconds:12,.0f} configs/s')
+    for fmt in ('columns', 'rows'):
+        # the body is streamed, so the time includes reading all of it
+        seconds, response = best_of(lambda: _read(client.post('/api/batch', json={'grid': grid, 'format': fmt})),
+                                    args.repeat)
+        assert response.status_code == 200, response.data[:200]
+        print(f'  {"POST /api/batch (" + fmt + ")":30s} {seconds:8.3f} s  {count / seconds:12,.0f} configs/s'
+              f'  {len(response.data) / 1e6:8.1f} MB')
+    print(f'peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
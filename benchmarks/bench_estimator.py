@@ -0,0 +1,72 @@
+# Micro-benchmarks of the estimator functions and of one index() call
+#   python benchmarks/bench_estimator.py
+import argparse
+
+import numpy as np
+
+from _apps import FORMS, load_app
+from harness import bench
+
+SOLVE_QUERY = {'params': '70B', 'method': 'full', 'precision': 'fp16', 'gpu_capacity': '80', 'num_gpus': '8'}
+
+
+def cases():
+    app3 = load_app('assignment3')
+    app2 = load_app('assignment2')
+    from llm_estimator import EstimateConfig, estimate, estimate_batch, parse_params, performance_arrays, solve
+
+    config = EstimateConfig(params=7e9, method='full', precision='fp16')
+    n = 10_000
+    rng = np.random.default_rng(0)
+    columns = {
+        'params': rng.uniform(1e8, 7e10, n),
+        'dataset_size_gb': rng.uniform(0, 100, n),
+        'batch_size': rng.choice([1, 2, 4, 8, 16, 32, 64], n),
+        'epochs': rng.choice([1, 2, 3, 5, 10], n),
+        'method': rng.choice(['full', 'lora', 'qlora'], n),
+        'precision': rng.choice(['fp16', 'fp32', 'int8', 'int4'], n),
+        'seq_len': rng.choice([512, 2048, 8192], n),
+        'gpu_capacity': rng.choice([24, 40, 80], n),
+    }
+    perf_columns = {name: columns[name] for name in ('params', 'method', 'precision', 'seq_len', 'batch_size',
+                                                     'dataset_size_gb', 'epochs')}
+    perf_columns['hardware'] = rng.choice(['a100-80gb', 'h100-sxm', 'l4', 'mi300x'], n)
+    client3 = app3.app.test_client()
+    client2 = app2.app.test_client()
+    return {
+        'parse_params': lambda: parse_params('7B'),
+        'estimate': lambda: estimate(config),
+        'estimate_resources_local': lambda: app3.estimate_resources_local(7e9, 10.0, 4, 1, 'full', 'fp16', 2048, 80),
+        # per call over 10k configs; divide by n for per-config cost
+        'estimate_batch_10k': lambda: estimate_batch(**columns),
+        # Pareto frontier over 9 seq_lens x batch sizes up to 1024, both phases
+        'solve': lambda: solve(7e10, 'full', 'fp16', 80, 8),
+        # roofline model over the same 10k configs on four GPU models
+        'performance_10k': lambda: performance_arrays(**perf_columns),
+        'assignment2_index': lambda: client2.post('/', data=FORMS['assignment2']),
+        'assignment3_index': lambda: client3.post('/', data=FORMS['assignment3']),
+        'assignment3_solve': lambda: client3.get('/api/solve', query_string=SOLVE_QUERY),
+    }
+
+
+def run(rounds=20, only=None):
+    results = {}
+    for name, fn in cases().items():
+        if only and name not in only:
+            continue
+        results[name] = bench(fn, rounds=rounds)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estimator micro-benchmarks')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('names', nargs='*', help='run only these cases')
+    args = parser.parse_args()
+    results = run(args.rounds, args.names)
+    for name, stats in results.items():
+        print(f"{name:28s} median {stats['median'] * 1e6:10.2f} us   {stats['ops']:12.0f} ops/s")
+
+
+if __name__ == '__main__':
+    main()
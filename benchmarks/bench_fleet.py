@@ -0,0 +1,54 @@
+# Fleet packing at scale: size a random job queue with the estimator and pack it
+#   python benchmarks/bench_fleet.py --jobs 100000 --gpus 24=4000,40=3000,80=3000
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from _apps import ROOT
+
+sys.path.insert(0, ROOT)
+from llm_estimator import parse_params, plan_jobs
+from llm_estimator.cli import _inventory
+
+SIZES = ['125M', '350M', '1B', '1.3B', '3B', '7B', '8B', '13B', '34B', '70B']
+
+
+def random_jobs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # Mostly small models, as in a real queue; a few 70B jobs need several cards
+    weights = np.array([8, 8, 6, 6, 5, 4, 3, 2, 1, 0.5])
+    sizes = np.array([parse_params(s) for s in SIZES])
+    return {
+        'params': rng.choice(sizes, n, p=weights / weights.sum()),
+        'method': rng.choice(np.array(['full', 'lora', 'qlora']), n, p=[0.1, 0.4, 0.5]),
+        'precision': rng.choice(np.array(['fp16', 'int8', 'int4']), n),
+        'seq_len': rng.choice(np.array([512, 1024, 2048, 4096]), n),
+        'batch_size': rng.choice(np.array([1, 2, 4, 8]), n),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fleet packing benchmark')
+    parser.add_argument('--jobs', type=int, default=100_000)
+    parser.add_argument('--gpus', type=_inventory, default=_inventory('24=4000,40=3000,80=3000'))
+    parser.add_argument('--phase', choices=['ft', 'inf'], default='ft')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    jobs = random_jobs(args.jobs)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        result = plan_jobs(args.gpus, phase=args.phase, **jobs)
+        timings.append(time.perf_counter() - start)
+    summary = result.summary()
+    print(json.dumps(summary, indent=2))
+    print(f'{args.jobs} jobs x {summary["gpus"]} GPUs: best {min(timings):.3f} s, '
+          f'median {sorted(timings)[len(timings) // 2]:.3f} s over {args.repeat} runs')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+# Bytes on the wire and server time per Calculate click: full-page POST (before) versus the
+# /api/estimate JSON used by the page script (after), plus the cost of loading the page shell.
+#   python benchmarks/bench_payload.py
+import argparse
+
+from _apps import FORMS, load_app
+from harness import bench
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+def measure(client, rounds, method, path, **kwargs):
+    response = getattr(client, method)(path, **kwargs)
+    stats = bench(lambda: getattr(client, method)(path, **kwargs), rounds=rounds)
+    return response.status_code, len(response.data), stats['median']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Payload size and time-to-result benchmark')
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    for name in ('assignment2', 'assignment3'):
+        client = load_app(name).app.test_client()
+        form = dict(FORMS[name], calculation_method='local') if name == 'assignment3' else FORMS[name]
+        etag = client.get('/', headers=GZIP).headers['ETag']
+        cases = {
+            'before: POST / (full page)': ('post', '/', {'data': form}),
+            'POST / (full page, gzip)': ('post', '/', {'data': form, 'headers': GZIP}),
+            'after: POST /api/estimate': ('post', '/api/estimate', {'data': form}),
+            'GET / shell (gzip)': ('get', '/', {'headers': GZIP}),
+            'GET / shell revalidated (304)': ('get', '/', {'headers': dict(GZIP, **{'If-None-Match': etag})}),
+        }
+        print(name)
+        for label, (method, path, kwargs) in cases.items():
+            status, size, seconds = measure(client, args.rounds, method, path, **kwargs)
+            print(f'  {label:32s} {status}  {size:7d} bytes  {seconds * 1e6:9.1f} us')
+
+
+if __name__ == '__main__':
+    main()
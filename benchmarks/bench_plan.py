@@ -0,0 +1,48 @@
+# Throughput and peak memory of the bulk planner on a synthetic CSV
+#   python benchmarks/bench_plan.py --rows 10000000 --workers 8
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from _apps import ROOT
+
+SIZES = ['350M', '1.3B', '7B', '8B', '13B', '70B', '6e9']
+
+
+def write_jobs(path, rows, seed=0):
+    rng = random.Random(seed)
+    with open(path, 'w') as f:
+        f.write('job_id,params,dataset_size_gb,batch_size,epochs,method,precision,seq_len,gpu_capacity\n')
+        batch = []
+        for i in range(rows):
+            batch.append(f'{i},{rng.choice(SIZES)},{rng.randint(1, 100)},{rng.choice((1, 2, 4, 8, 16))},'
+                         f'{rng.choice((1, 2, 3))},{rng.choice(("full", "lora", "qlora"))},'
+                         f'{rng.choice(("fp16", "fp32", "int8", "int4"))},{rng.choice((512, 2048, 8192))},'
+                         f'{rng.choice((24, 40, 80))}\n')
+            if len(batch) == 100_000:
+                f.writelines(batch)
+                batch.clear()
+        f.writelines(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk planner benchmark')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], default='jsonl')
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'jobs.csv')
+        write_jobs(src, args.rows)
+        # The planner prints rows/s and peak RSS to stderr
+        subprocess.run([sys.executable, '-m', 'llm_estimator', 'plan', src, '-o', os.devnull,
+                        '--output-format', args.output_format, '--workers', str(args.workers),
+                        '--chunk-size', str(args.chunk_size)], cwd=ROOT, check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# Requests/sec of index() with the legacy per-request render_template_string versus the
+# precompiled template and the JSON-only response mode.
+#   python benchmarks/bench_render.py --requests 2000
+import argparse
+import time
+from unittest import mock
+
+from flask import render_template_string
+
+from _apps import FORMS, load_app
+
+
+def requests_per_second(client, n, **kwargs):
+    client.post('/', **kwargs)  # warm up
+    start = time.perf_counter()
+    for _ in range(n):
+        client.post('/', **kwargs)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    for name in ('assignment2', 'assignment3'):
+        module = load_app(name)
+        client = module.app.test_client()
+        form = FORMS[name]
+        # Before: compile the TEMPLATE string on every request
+        legacy = lambda page, **context: render_template_string(module.TEMPLATE, **context)
+        with mock.patch.object(module, 'render_template', legacy):
+            before = requests_per_second(client, args.requests, data=form)
+        after = requests_per_second(client, args.requests, data=form)
+        as_json = requests_per_second(client, args.requests, data=form, headers={'Accept': 'application/json'})
+        print(f'{name}: render_template_string {before:8.0f} req/s | '
+              f'precompiled {after:8.0f} req/s ({after / before:.2f}x) | '
+              f'json {as_json:8.0f} req/s ({as_json / before:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# Gemini brownout: the stub answers slowly (or with errors) and requests go through
+# estimate_resources_gemini with the guard as configured (breaker on) and with the breaker and
+# retries disabled (before). Prints latency per request phase, where answers came from, and the
+# guard counters that /metrics exposes.
+#   python benchmarks/bench_resilience.py --delay 1.0 --slow 0.5
+#   python benchmarks/bench_resilience.py --status 503
+import argparse
+import statistics
+import time
+
+from _apps import load_app
+
+
+def run(module, inputs, requests):
+    latencies, sources = [], {}
+    for _ in range(requests):
+        start = time.perf_counter()
+        result = module.estimate_resources_gemini(*inputs)
+        latencies.append(time.perf_counter() - start)
+        source = result.get('source', 'error' if 'error' in result else 'gemini')
+        sources[source] = sources.get(source, 0) + 1
+    return latencies, sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Circuit breaker / fallback benchmark')
+    parser.add_argument('--delay', type=float, default=1.0, help='stub seconds per answer')
+    parser.add_argument('--status', type=int, default=200, help='HTTP status the stub returns')
+    parser.add_argument('--slow', type=float, default=0.5, help='breaker slow-call threshold in seconds')
+    parser.add_argument('--requests', type=int, default=30)
+    args = parser.parse_args()
+
+    module = load_app('assignment3')
+    import gemini
+    import gemini_stub
+    from cache import ResponseCache
+    from resilience import CircuitBreaker
+
+    server, url = gemini_stub.serve(delay=args.delay, status=args.status)
+    gemini.GEMINI_API_URL = url
+    module.gemini_cache = ResponseCache(maxsize=0)
+    guard = module.gemini_guard
+    guard.base_delay, guard.max_delay = 0.05, 0.2
+    inputs = (7e9, 10.0, 4, 1, 'full', 'fp16', 2048, 80)
+    try:
+        guard.breaker = CircuitBreaker(failure_rate=2, slow_rate=2)  # never opens
+        guard.max_attempts = 1
+        before, before_sources = run(module, inputs, args.requests)
+
+        guard.breaker = CircuitBreaker(slow_seconds=args.slow, min_calls=5)
+        guard.max_attempts = 3
+        after, after_sources = run(module, inputs, args.requests)
+    finally:
+        server.shutdown()
+
+    median = statistics.median
+    print(f'stub: {args.delay * 1e3:.0f} ms per answer, status {args.status}; {args.requests} sequential requests')
+    print(f'no breaker       total {sum(before):6.2f} s  median {median(before) * 1e3:8.1f} ms  {before_sources}')
+    print(f'breaker+retries  total {sum(after):6.2f} s  median {median(after) * 1e3:8.1f} ms  {after_sources}')
+    print('guard:', guard.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# Throughput versus worker count under gunicorn (gunicorn.conf.py), for both apps' local path.
+# Load comes from separate client processes over keep-alive HTTP, so the clients' GIL does not
+# cap the numbers; on a machine with N cores expect roughly linear scaling up to about N/2
+# workers, with the clients using the rest.
+#   python benchmarks/bench_scaling.py --workers 1,2,4 --clients 4 --duration 5
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+from _apps import APP_DIRS, FORMS, ROOT
+from loadtest import http_sender, run_load
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(app_name, workers, threads):
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), WEB_THREADS=str(threads), BIND=f'127.0.0.1:{port}')
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+                             '--chdir', APP_DIRS[app_name], 'wsgi:app'], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}/'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return proc, url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f'gunicorn did not start for {app_name}')
+
+
+# Graceful stop: SIGTERM lets in-flight requests finish within graceful_timeout
+def stop_server(proc):
+    proc.send_signal(signal.SIGTERM)
+    proc.wait(timeout=60)
+
+
+def client(job):
+    url, form, concurrency, duration = job
+    return run_load(http_sender(url, form), concurrency, duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='gunicorn worker scaling benchmark')
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4, 8) if n <= os.cpu_count())
+                        or '1', help='comma-separated worker counts')
+    parser.add_argument('--threads', type=int, default=4, help='threads per worker')
+    parser.add_argument('--clients', type=int, default=max(1, os.cpu_count() // 2), help='client processes')
+    parser.add_argument('--concurrency', type=int, default=8, help='connections per client process')
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} cores, {args.clients} client processes x {args.concurrency} connections')
+    with multiprocessing.Pool(args.clients) as pool:
+        for app_name in APP_DIRS:
+            base = None
+            for workers in [int(n) for n in args.workers.split(',')]:
+                proc, url = start_server(app_name, workers, args.threads)
+                try:
+                    runs = pool.map(client, [(url, FORMS[app_name], args.concurrency, args.duration)] * args.clients)
+                finally:
+                    stop_server(proc)
+                rps = sum(r['rps'] for r in runs)
+                base = base or rps
+                print(f'{app_name}  workers {workers:2d}  {rps:9.1f} req/s  x{rps / base:4.2f}  '
+                      f'p50 {max(r["p50"] for r in runs) * 1e3:7.2f} ms  p99 {max(r["p99"] for r in runs) * 1e3:7.2f} ms  '
+                      f'errors {sum(r["errors"] for r in runs)}')
+
+
+if __name__ == '__main__':
+    main()
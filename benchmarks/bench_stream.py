@@ -0,0 +1,101 @@
+# Time to the first Gemini number: generateContent (whole answer, then extract) versus
+# streamGenerateContent with incremental parsing, both against the local stub replaying a chunked
+# answer wrapped in prose with stray braces. Also checks that every path yields the stub's values.
+#   python benchmarks/bench_stream.py --delay 0.3 --chunk-delay 0.02
+import argparse
+import json
+import random
+import statistics
+import time
+
+from _apps import load_app
+
+
+def legacy_extract(text):
+    # The original find('{') / rfind('}') slicing
+    return json.loads(text[text.find('{'):text.rfind('}') + 1])
+
+
+def check_parser(text, expected, fields, trials=500):
+    from jsonstream import JSONObjectStream
+
+    rng = random.Random(0)
+    for _ in range(trials):
+        parser = JSONObjectStream(fields)
+        i = 0
+        while i < len(text):
+            n = rng.randint(1, 32)
+            parser.feed(text[i:i + n])
+            i += n
+        assert parser.result == expected, parser.result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming Gemini benchmark')
+    parser.add_argument('--delay', type=float, default=0.3, help='stub seconds before the first byte')
+    parser.add_argument('--chunk-size', type=int, default=24, help='characters per streamed event')
+    parser.add_argument('--chunk-delay', type=float, default=0.02, help='stub seconds between events')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    module = load_app('assignment3')  # puts the Assignment 3 modules on sys.path
+    import gemini
+    import gemini_stub
+    from cache import ResponseCache
+
+    text = gemini_stub.PROSE_TEXT
+    expected = gemini_stub.STUB_ESTIMATE
+    try:
+        legacy_extract(text)
+        print('legacy extraction: ok')
+    except ValueError as e:
+        print(f'legacy extraction: fails ({e})')
+    check_parser(text, expected, module.GEMINI_FIELDS)
+    print('incremental parser: ok over 500 random chunkings')
+
+    server, url = gemini_stub.serve(delay=args.delay, text=text, chunk_size=args.chunk_size,
+                                    chunk_delay=args.chunk_delay)
+    gemini.GEMINI_API_URL = url
+    module.gemini_cache = ResponseCache(maxsize=0)
+    inputs = (7e9, 10.0, 4, 1, 'full', 'fp16', 2048, 80)
+    blocking, first_field, streamed = [], [], []
+    try:
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = module.fetch_gemini_estimate(*inputs)
+            blocking.append(time.perf_counter() - start)
+            assert result == expected, result
+
+            start = time.perf_counter()
+            first = None
+            for name, data in module.stream_gemini_estimate(*inputs):
+                if name == 'field' and first is None:
+                    first = time.perf_counter() - start
+                if name == 'result':
+                    result = data
+            streamed.append(time.perf_counter() - start)
+            first_field.append(first)
+            assert result == expected, result
+
+        # Same through the HTTP endpoint
+        client = module.app.test_client()
+        query = dict(params='7B', dataset_size_gb='10', batch_size='4', epochs='1', method='full',
+                     precision='fp16', seq_len='2048', gpu_capacity='80')
+        body = client.get('/api/estimate/stream', query_string=query).get_data(as_text=True)
+        events = [block.split('\n') for block in body.strip().split('\n\n')]
+        names = [lines[0].removeprefix('event: ') for lines in events]
+        assert names[:2] == ['perf', 'local'] and names[-1] == 'result', names
+        assert json.loads(events[-1][1].removeprefix('data: ')) == expected
+        print(f'/api/estimate/stream: {names.count("field")} field events, then result')
+    finally:
+        server.shutdown()
+
+    median = statistics.median
+    print(f'generateContent (blocking)    first number {median(blocking) * 1e3:7.1f} ms')
+    print(f'streamGenerateContent         first number {median(first_field) * 1e3:7.1f} ms, '
+          f'all {median(streamed) * 1e3:7.1f} ms  (stub: {args.delay * 1e3:.0f} ms to first byte, '
+          f'{args.chunk_delay * 1e3:.0f} ms per {args.chunk_size}-char chunk)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# Timing helpers shared by the benchmark scripts
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# Calibrated micro-benchmark in the style of pytest-benchmark: each round runs fn
+# `iterations` times, and stats are reported per call in seconds
+def bench(fn, rounds=20, min_round_time=0.02, warmup=True):
+    if warmup:
+        fn()
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        if time.perf_counter() - start >= min_round_time or iterations >= 1 << 24:
+            break
+        iterations *= 2
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        samples.append((time.perf_counter() - start) / iterations)
+    return {
+        'min': min(samples),
+        'max': max(samples),
+        'mean': statistics.fmean(samples),
+        'median': statistics.median(samples),
+        'stddev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'rounds': rounds,
+        'iterations': iterations,
+        'ops': 1 / statistics.median(samples),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def save_results(results, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{results['revision']}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return path
+
+
+# Flatten {'group': {'name': {'metric': value}}} into {'group.name.metric': value}
+def _flatten(tree, prefix=''):
+    flat = {}
+    for key, value in tree.items():
+        name = f'{prefix}.{key}' if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+# Metrics where a larger value is better; everything else compared here is a latency
+HIGHER_IS_BETTER = ('ops', 'rps')
+COMPARED = ('median', 'p50', 'p99') + HIGHER_IS_BETTER
+
+
+# List metrics that got worse than baseline by more than threshold (a fraction)
+def compare(current, baseline, threshold=0.15):
+    now = _flatten({'micro': current.get('micro', {}), 'load': current.get('load', {})})
+    before = _flatten({'micro': baseline.get('micro', {}), 'load': baseline.get('load', {})})
+    regressions = []
+    for name, value in sorted(now.items()):
+        metric = name.rsplit('.', 1)[-1]
+        if metric not in COMPARED or name not in before or not before[name]:
+            continue
+        change = (value - before[name]) / before[name]
+        if metric in HIGHER_IS_BETTER:
+            change = -change
+        if change > threshold:
+            regressions.append({'metric': name, 'baseline': before[name], 'current': value,
+                                'change': round(change, 4)})
+    return regressions
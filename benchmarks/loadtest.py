@@ -0,0 +1,157 @@
+# In-process load generator for index(): concurrent POSTs through Flask's test client or a
+# local threaded WSGI server, for the local path and for a stubbed Gemini path.
+#   python benchmarks/loadtest.py --concurrency 8 --duration 5
+import argparse
+import contextlib
+import itertools
+import sys
+import threading
+import time
+
+import requests
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from _apps import FORMS, load_app
+from harness import percentile
+
+
+# Run send() from `concurrency` threads for `duration` seconds; returns latency/throughput stats
+def run_load(make_sender, concurrency=8, duration=5.0):
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    stop = time.perf_counter() + duration
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(i):
+        send = make_sender()
+        barrier.wait()
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                ok = send()
+            except Exception:
+                ok = False
+            latencies[i].append(time.perf_counter() - start)
+            errors[i] += not ok
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    samples = [s for per_thread in latencies for s in per_thread]
+    return {
+        'requests': len(samples),
+        'errors': sum(errors),
+        'rps': len(samples) / elapsed if elapsed else 0.0,
+        'p50': percentile(samples, 50),
+        'p99': percentile(samples, 99),
+        'mean': sum(samples) / len(samples) if samples else 0.0,
+        'concurrency': concurrency,
+    }
+
+
+# Point Assignment 3 at a local Gemini stub, inline (no background jobs) and uncached
+@contextlib.contextmanager
+def stub_gemini(app_module, delay=0.05):
+    import gemini
+    import gemini_stub
+    from cache import ResponseCache
+    from resilience import ConcurrencyLimit, TokenBucket
+
+    server, url = gemini_stub.serve(delay=delay)
+    guard = app_module.gemini_guard
+    saved = (gemini.GEMINI_API_URL, app_module.GEMINI_ASYNC, app_module.gemini_cache, guard.bucket, guard.limit)
+    gemini.GEMINI_API_URL = url
+    app_module.GEMINI_ASYNC = False
+    app_module.gemini_cache = ResponseCache(maxsize=0)
+    # measure the upstream path, not the rate limiter's shedding
+    guard.bucket, guard.limit = TokenBucket(rate=1e9, burst=1e9), ConcurrencyLimit(1 << 30)
+    try:
+        yield server
+    finally:
+        gemini.GEMINI_API_URL, app_module.GEMINI_ASYNC, app_module.gemini_cache, guard.bucket, guard.limit = saved
+        server.shutdown()
+
+
+class QuietHandler(WSGIRequestHandler):
+    disable_nagle_algorithm = True
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+@contextlib.contextmanager
+def wsgi_server(app):
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}/'
+    finally:
+        server.shutdown()
+
+
+# Each request gets a distinct dataset size so the Gemini cache and coalescing never kick in
+def _forms(base):
+    for i in itertools.count():
+        yield dict(base, dataset_size_gb=str(10 + i * 1e-3)) if 'dataset_size_gb' in base else base
+
+
+def client_sender(app, form):
+    def make_sender():
+        client = app.test_client()
+        forms = _forms(form)
+        return lambda: client.post('/', data=next(forms)).status_code < 400
+    return make_sender
+
+
+def http_sender(url, form):
+    def make_sender():
+        session = requests.Session()
+        forms = _forms(form)
+        return lambda: session.post(url, data=next(forms), timeout=30).status_code < 400
+    return make_sender
+
+
+def run(concurrency=8, duration=5.0, gemini_delay=0.05, transports=('client', 'server')):
+    results = {}
+    for name in ('assignment2', 'assignment3'):
+        module = load_app(name)
+        paths = {'local': FORMS[name]}
+        if name == 'assignment3':
+            paths['gemini'] = dict(FORMS[name], calculation_method='gemini')
+        for path, form in paths.items():
+            with contextlib.ExitStack() as stack:
+                if path == 'gemini':
+                    stack.enter_context(stub_gemini(module, gemini_delay))
+                if 'client' in transports:
+                    results[f'{name}.{path}.client'] = run_load(client_sender(module.app, form), concurrency, duration)
+                if 'server' in transports:
+                    url = stack.enter_context(wsgi_server(module.app))
+                    results[f'{name}.{path}.server'] = run_load(http_sender(url, form), concurrency, duration)
+    return results
+
+
+def print_results(results, out=sys.stdout):
+    for name, stats in results.items():
+        print(f"{name:32s} {stats['rps']:9.1f} req/s  p50 {stats['p50'] * 1e3:8.2f} ms  "
+              f"p99 {stats['p99'] * 1e3:8.2f} ms  errors {stats['errors']}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test for the calculator endpoints')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per scenario')
+    parser.add_argument('--gemini-delay', type=float, default=0.05, help='stub response delay in seconds')
+    parser.add_argument('--transport', choices=['client', 'server', 'both'], default='both')
+    args = parser.parse_args()
+    transports = ('client', 'server') if args.transport == 'both' else (args.transport,)
+    print_results(run(args.concurrency, args.duration, args.gemini_delay, transports))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# Run the micro-benchmarks and the load test, store the results as JSON and flag regressions.
+#   python benchmarks/run.py                       # writes benchmarks/results/<git sha>.json
+#   python benchmarks/run.py --compare benchmarks/results/abc1234.json
+import argparse
+import json
+import sys
+import time
+
+import bench_estimator
+import loadtest
+from harness import compare, git_revision, machine_info, save_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite for the calculator apps')
+    parser.add_argument('--rounds', type=int, default=20, help='rounds per micro-benchmark')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds per load scenario')
+    parser.add_argument('--gemini-delay', type=float, default=0.05)
+    parser.add_argument('--skip-load', action='store_true')
+    parser.add_argument('--out', help='result file (default: benchmarks/results/<revision>.json)')
+    parser.add_argument('--compare', help='baseline result file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.15, help='allowed slowdown as a fraction')
+    args = parser.parse_args()
+
+    results = {
+        'revision': git_revision(),
+        'timestamp': time.time(),
+        'machine': machine_info(),
+        'micro': bench_estimator.run(args.rounds),
+        'load': {} if args.skip_load else loadtest.run(args.concurrency, args.duration, args.gemini_delay),
+    }
+    for name, stats in results['micro'].items():
+        print(f"{name:28s} median {stats['median'] * 1e6:10.2f} us   {stats['ops']:12.0f} ops/s")
+    loadtest.print_results(results['load'])
+    print(f'saved {save_results(results, args.out)}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['metric']}: {r['baseline']:.6g} -> {r['current']:.6g} ({r['change']:+.1%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
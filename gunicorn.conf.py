@@ -0,0 +1,70 @@
+# Production server settings shared by both apps (pre-fork workers, each with a thread pool):
+#   gunicorn -c gunicorn.conf.py --chdir "Assignment 2" wsgi:app
+#   gunicorn -c gunicorn.conf.py --chdir "Assignment 3" wsgi:app
+# Tunables: BIND, WEB_CONCURRENCY (workers), WEB_THREADS, WEB_KEEPALIVE, WEB_TIMEOUT,
+# WEB_GRACEFUL_TIMEOUT, WEB_MAX_REQUESTS, ACCESS_LOG. Caches and job queues are per worker;
+# job states are shared through a SQLite file (JOBS_DB_PATH) so /jobs/<id> works on any worker,
+# and /metrics merges the samples every worker writes to METRICS_MULTIPROC_DIR.
+import gc
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+# One worker per core; threads cover requests that wait on Gemini or stream events
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread'
+# Import the app (lookup table, compiled templates, rendered page shell) once in the master;
+# workers share those pages copy-on-write instead of building their own
+preload_app = True
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+timeout = int(os.environ.get('WEB_TIMEOUT', 60))
+# Seconds in-flight requests get to finish on SIGTERM / HUP before workers are killed
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+# Recycle workers after this many requests (0 = never); jitter keeps them from restarting together
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+accesslog = os.environ.get('ACCESS_LOG')
+# Heartbeat files on tmpfs, so a slow disk cannot get workers killed
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# Files shared by the workers of this server. Exported before the app is preloaded so it picks them
+# up, and kept across config reloads (HUP). A temporary directory created here is removed on exit;
+# one passed in LLMCALC_RUNTIME_DIR belongs to the operator and is left alone.
+if 'LLMCALC_RUNTIME_DIR' not in os.environ:
+    os.environ['LLMCALC_RUNTIME_DIR'] = tempfile.mkdtemp(prefix='llmcalc-')
+    os.environ['LLMCALC_RUNTIME_DIR_CREATED'] = os.environ['LLMCALC_RUNTIME_DIR']
+runtime_dir = os.environ['LLMCALC_RUNTIME_DIR']
+os.environ.setdefault('JOBS_DB_PATH', os.path.join(runtime_dir, 'jobs.sqlite3'))
+os.makedirs(os.path.join(runtime_dir, 'metrics'), exist_ok=True)
+os.environ.setdefault('METRICS_MULTIPROC_DIR', os.path.join(runtime_dir, 'metrics'))
+
+
+# Move everything the master has allocated so far out of the collector's reach: the cyclic GC
+# would otherwise touch those objects in each worker and un-share their pages
+def pre_fork(server, worker):
+    gc.freeze()
+
+
+# Last metrics write, so requests served since the previous flush still count after the worker is gone
+def worker_exit(server, worker):
+    metrics = sys.modules.get('metrics')
+    if metrics is not None:
+        metrics.registry.flush()
+
+
+# Runs in the master once a worker is gone (also when it was killed): fold its metrics file into
+# the exited workers' totals, so files do not pile up and a reused pid starts a fresh one
+def child_exit(server, worker):
+    metrics = sys.modules.get('metrics')
+    if metrics is not None:
+        metrics.registry.collect_exited(worker.pid)
+
+
+def on_exit(server):
+    if os.environ.get('LLMCALC_RUNTIME_DIR_CREATED') == runtime_dir:
+        shutil.rmtree(runtime_dir, ignore_errors=True)
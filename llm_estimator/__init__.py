@@ -0,0 +1,23 @@
+# Shared LLM resource estimator used by the Assignment 2 and Assignment 3 apps
+from .core import (
+    DEFAULT_BYTES_PER_PARAM,
+    DEFAULT_METHOD,
+    METHOD_COEFFS,
+    PRECISION_BYTES,
+    Estimate,
+    EstimateConfig,
+    MethodCoeffs,
+    bytes_per_param,
+    estimate,
+    gpu_hours,
+    inf_gpu_hours,
+    method_coeffs,
+    params_to_gb,
+    parse_finite,
+    parse_params,
+)
+from .fleet import FleetPlan, pack, plan_jobs
+from .perf import DEFAULT_HARDWARE, HARDWARE_PROFILES, HardwareProfile, performance, performance_arrays
+from .lookup import COMMON_MODEL_SIZES, LookupTable, grid_axes
+from .solver import max_batch_sizes, pareto_frontier, solve
+from .vectorized import estimate_arrays, estimate_batch, round2
@@ -0,0 +1,351 @@
+# Bulk planner: stream CSV/JSONL job specs through the estimator in chunks.
+#   python -m llm_estimator plan jobs.csv -o estimates.jsonl --workers 8
+# Input columns: params (e.g. 7B), dataset_size_gb, batch_size, epochs, method, precision and
+# optionally seq_len / gpu_capacity; any other columns are passed through to the output.
+# Results are element-for-element identical to Assignment 3's estimate_resources_local.
+#
+# Fleet packing: size every job and place the queue on a mixed GPU inventory.
+#   python -m llm_estimator fleet jobs.csv --gpus 24=4000,40=3000,80=3000 -o placements.csv
+# Needs params, method, precision, batch_size (and optionally seq_len); writes the input rows with
+# memory_gb, gpu_capacity, first_gpu, n_gpus, shared and error columns appended.
+import argparse
+import csv
+import io
+import itertools
+import json
+import math
+import os
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import parse_finite, parse_params
+from .fleet import plan_jobs
+from .vectorized import estimate_batch
+
+INPUT_FIELDS = ('params', 'dataset_size_gb', 'batch_size', 'epochs', 'method', 'precision', 'seq_len', 'gpu_capacity')
+DEFAULTS = {'seq_len': 2048, 'gpu_capacity': 80}
+RESULT_FIELDS = ('memory_gb', 'gpu_hours', 'inf_memory_gb', 'inf_gpu_hours', 'gpus_ft', 'flops_ft', 'gpus_inf', 'flops_inf')
+PLACEMENT_FIELDS = ('memory_gb', 'gpu_capacity', 'first_gpu', 'n_gpus', 'shared')
+
+
+def _format(path, explicit):
+    if explicit:
+        return explicit
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+# Convert one record to estimator inputs; raises like the form handler does on bad values
+def _convert(record):
+    params = record['params']
+    values = [parse_params(params) if isinstance(params, str) else parse_finite(params, 'params'),
+              parse_finite(record['dataset_size_gb'], 'dataset_size_gb'),
+              int(record['batch_size']), int(record['epochs']), str(record['method']), str(record['precision']),
+              int(record.get('seq_len') or DEFAULTS['seq_len']),
+              int(record.get('gpu_capacity') or DEFAULTS['gpu_capacity'])]
+    # The scalar function divides by both; keep its error instead of numpy's inf
+    if values[2] == 0 or values[7] == 0:
+        raise ZeroDivisionError('float division by zero')
+    return values
+
+
+# One JSONL record; a line that is not a JSON object becomes a ValueError, reported on its own row
+def _parse_line(line):
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return ValueError(f'invalid JSON: {e}')
+    if not isinstance(record, dict):
+        return ValueError(f'expected a JSON object, got {type(record).__name__}')
+    return record
+
+
+def _parse_jsonl(lines):
+    return [_parse_line(line) for line in lines if line.strip()]
+
+
+# Conversion error message for the error column
+def _error(e):
+    return str(e) if not isinstance(e, KeyError) else f'missing field {e}'
+
+
+# JSON has no inf / nan: write them as null
+def _json_value(value):
+    return None if isinstance(value, float) and not math.isfinite(value) else value
+
+
+def _estimate_rows(rows):
+    # huge finite inputs overflow to inf like the scalar function's floats do (written as null)
+    with np.errstate(over='ignore', invalid='ignore'):
+        estimates = estimate_batch(*[np.array(c) for c in zip(*rows)])
+    return {name: estimates[name].tolist() for name in RESULT_FIELDS}
+
+
+# Row-by-row path: handles JSONL, ragged rows and per-row errors
+def _process_records(records, out_format, out_header):
+    valid, rows, errors = [], [], {}
+    for i, record in enumerate(records):
+        if isinstance(record, ValueError):
+            errors[i] = str(record)
+            continue
+        try:
+            rows.append(_convert(record))
+            valid.append(i)
+        except (KeyError, ValueError, TypeError, ZeroDivisionError) as e:
+            errors[i] = _error(e)
+    results = _estimate_rows(rows) if rows else {}
+    position = dict(zip(valid, range(len(valid))))
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n') if out_format == 'csv' else None
+    for i, record in enumerate(records):
+        row = dict(record) if isinstance(record, dict) else {}
+        if i in errors:
+            row['error'] = errors[i]
+        else:
+            j = position[i]
+            row.update((name, results[name][j]) for name in RESULT_FIELDS)
+        if writer is not None:
+            writer.writerow([row.get(name, '') for name in out_header])
+        else:
+            out.write(json.dumps({name: _json_value(value) for name, value in row.items()}))
+            out.write('\n')
+    return out.getvalue(), len(records), len(errors)
+
+
+# Column-at-a-time path for clean CSV chunks: converts each column with numpy and formats
+# output lines from a template. Returns None whenever the row path is needed for exact output.
+def _process_csv_columns(rows, header, out_format, out_header):
+    if not rows or set(header) & set(RESULT_FIELDS) or any(len(row) != len(header) for row in rows):
+        return None
+    columns = dict(zip(header, zip(*rows)))
+    memo = {}
+    try:
+        names = columns['params']
+        for value in set(names):
+            memo[value] = parse_params(value)
+        inputs = [np.array([memo[v] for v in names]),
+                  np.array(columns['dataset_size_gb'], dtype=float),
+                  np.array(columns['batch_size'], dtype=np.int64),
+                  np.array(columns['epochs'], dtype=np.int64),
+                  np.array(columns['method']), np.array(columns['precision'])]
+        for name in ('seq_len', 'gpu_capacity'):
+            inputs.append(np.array(columns[name], dtype=np.int64) if name in columns else DEFAULTS[name])
+    except (KeyError, ValueError, TypeError, OverflowError):
+        return None
+    if not np.all(inputs[2]) or not np.all(inputs[7]):
+        return None
+    estimates = estimate_batch(*inputs)
+    if not all(np.isfinite(estimates[name]).all() for name in RESULT_FIELDS):
+        return None
+    results = [estimates[name].tolist() for name in RESULT_FIELDS]
+    out = io.StringIO()
+    if out_format == 'csv':
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerows(row + tuple(values) + ('',) for row, values in zip(rows, zip(*results)))
+    else:
+        # json.dumps(dict) equivalent: ", "-separated "key": value pairs, ASCII-escaped strings, repr floats
+        template = '{' + ', '.join([f'{json.dumps(name)}: %s' for name in header] +
+                                   [f'"{name}": %r' for name in RESULT_FIELDS]) + '}\n'
+        quote = json.encoder.encode_basestring_ascii
+        out.writelines(template % (tuple(map(quote, row)) + values) for row, values in zip(rows, zip(*results)))
+    return out.getvalue(), len(rows), 0
+
+
+# Worker entry point: raw input lines in, serialized output lines out
+def process_chunk(lines, in_format, out_format, header, out_header):
+    if in_format == 'csv':
+        rows = [tuple(row) for row in csv.reader(lines)]
+        done = _process_csv_columns(rows, header, out_format, out_header)
+        if done is not None:
+            return done
+        records = [dict(zip(header, row)) for row in rows]
+    else:
+        records = _parse_jsonl(lines)
+    return _process_records(records, out_format, out_header)
+
+
+def _chunks(lines, size):
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _peak_rss_mb():
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1 / 1024 if sys.platform != 'darwin' else 1 / (1024 * 1024)  # KiB on Linux, bytes on macOS
+    return own * scale, children * scale
+
+
+# Stream input to output; at most workers * 2 chunks are held in memory at once
+def plan(src, dst, in_format='csv', out_format='jsonl', chunk_size=50_000, workers=1):
+    header = None
+    if in_format == 'csv':
+        header = next(csv.reader([src.readline()]))
+        out_header = header + [f for f in RESULT_FIELDS if f not in header] + ['error']
+    else:
+        out_header = list(INPUT_FIELDS) + list(RESULT_FIELDS) + ['error']
+    if out_format == 'csv':
+        csv.writer(dst, lineterminator='\n').writerow(out_header)
+    total = failed = 0
+    chunks = _chunks(src, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            text, n, bad = process_chunk(chunk, in_format, out_format, header, out_header)
+            dst.write(text)
+            total, failed = total + n, failed + bad
+        return total, failed
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(process_chunk, chunk, in_format, out_format, header, out_header))
+            if len(in_flight) >= workers * 2:
+                text, n, bad = in_flight.popleft().result()
+                dst.write(text)
+                total, failed = total + n, failed + bad
+        while in_flight:
+            text, n, bad = in_flight.popleft().result()
+            dst.write(text)
+            total, failed = total + n, failed + bad
+    return total, failed
+
+
+# '24=4000,40=3000,80=3000' -> {24.0: 4000, 40.0: 3000, 80.0: 3000}; argparse type of --gpus
+def _inventory(text):
+    inventory = {}
+    for item in text.split(','):
+        capacity, _, count = item.partition('=')
+        try:
+            capacity, count = float(capacity), int(count)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected capacity=count, got '{item}'") from None
+        if not (math.isfinite(capacity) and capacity > 0) or count <= 0:
+            raise argparse.ArgumentTypeError(f"'{item}': capacity must be a positive number of GB "
+                                             f"and count a positive integer")
+        inventory[capacity] = inventory.get(capacity, 0) + count
+    return inventory
+
+
+# (header, records); the JSONL header lists every key in order of first appearance
+def _read_records(src, in_format):
+    if in_format == 'csv':
+        reader = csv.DictReader(src)
+        records = list(reader)
+        return list(reader.fieldnames or []), records
+    records = _parse_jsonl(src)
+    return list(dict.fromkeys(key for record in records if isinstance(record, dict) for key in record)), records
+
+
+# Convert one record to plan_jobs inputs; raises like _convert on bad values
+def _convert_job(record, memo):
+    params = record['params']
+    if isinstance(params, str):
+        if params not in memo:
+            memo[params] = parse_params(params)
+        params = memo[params]
+    return (parse_finite(params, 'params'), str(record['method']), str(record['precision']),
+            int(record.get('seq_len') or DEFAULTS['seq_len']), int(record['batch_size']))
+
+
+# Pack every job in src onto the inventory; writes the input rows in order with their placement
+# appended (blank when unplaced). Rows that cannot be sized get an error and stay unplaced.
+# Returns the plan of the valid rows and the number of rows with errors.
+def fleet(src, dst, inventory, in_format='csv', phase='ft'):
+    header, records = _read_records(src, in_format)
+    memo = {}
+    valid, rows, errors = [], [], {}
+    for i, record in enumerate(records):
+        if isinstance(record, ValueError):
+            errors[i] = str(record)
+            continue
+        try:
+            rows.append(_convert_job(record, memo))
+            valid.append(i)
+        except (KeyError, ValueError, TypeError) as e:
+            errors[i] = _error(e)
+    columns = list(zip(*rows)) or [()] * 5
+    result = plan_jobs(inventory, *[np.array(column) for column in columns], phase=phase)
+    placements = zip(result.memory_gb.tolist(), result.gpu_class.tolist(), result.first_gpu.tolist(),
+                     result.n_gpus.tolist(), result.shared.tolist())
+    placed = {i: (round(mem, 2), result.capacities[c] if c >= 0 else '', gpu if gpu >= 0 else '', n, int(shared))
+              for i, (mem, c, gpu, n, shared) in zip(valid, placements)}
+    out_header = header + [f for f in PLACEMENT_FIELDS if f not in header] + ['error']
+    writer = csv.writer(dst, lineterminator='\n')
+    writer.writerow(out_header)
+    for i, record in enumerate(records):
+        row = dict(record) if isinstance(record, dict) else {}
+        if i in errors:
+            row['error'] = errors[i]
+        else:
+            row.update(zip(PLACEMENT_FIELDS, placed[i]))
+        writer.writerow([row.get(name, '') for name in out_header])
+    return result, len(errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m llm_estimator', description='LLM resource estimator tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('plan', help='estimate every job in a CSV/JSONL file')
+    p.add_argument('input', help="input file, or '-' for stdin")
+    p.add_argument('-o', '--output', default='-', help="output file, or '-' for stdout")
+    p.add_argument('--input-format', choices=['csv', 'jsonl'])
+    p.add_argument('--output-format', choices=['csv', 'jsonl'])
+    p.add_argument('--chunk-size', type=int, default=50_000, help='rows per chunk')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='processes (1 = in-process)')
+    p.add_argument('-q', '--quiet', action='store_true', help='do not print the summary to stderr')
+    f = sub.add_parser('fleet', help='pack a queue of jobs onto a mixed GPU inventory')
+    f.add_argument('input', help="input file, or '-' for stdin")
+    f.add_argument('--gpus', type=_inventory, required=True, help='inventory as capacity=count, e.g. 24=8,80=4')
+    f.add_argument('-o', '--output', default='-', help="placements CSV, or '-' for stdout")
+    f.add_argument('--input-format', choices=['csv', 'jsonl'])
+    f.add_argument('--phase', choices=['ft', 'inf'], default='ft', help='fine-tuning or inference memory')
+    f.add_argument('-q', '--quiet', action='store_true', help='do not print the summary to stderr')
+    args = parser.parse_args(argv)
+    if args.command == 'fleet':
+        return _main_fleet(args)
+
+    in_format = _format(args.input, args.input_format) if args.input != '-' else (args.input_format or 'csv')
+    out_format = _format(args.output, args.output_format) if args.output != '-' else (args.output_format or 'jsonl')
+    src = sys.stdin if args.input == '-' else open(args.input, newline='')
+    dst = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    start = time.perf_counter()
+    try:
+        total, failed = plan(src, dst, in_format, out_format, args.chunk_size, args.workers)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        own, children = _peak_rss_mb()
+        print(f'{total} rows ({failed} errors) in {elapsed:.2f} s, {total / elapsed if elapsed else 0:,.0f} rows/s, '
+              f'peak RSS {own:.0f} MB (parent) / {children:.0f} MB (largest worker)', file=sys.stderr)
+    return 0
+
+
+def _main_fleet(args):
+    in_format = _format(args.input, args.input_format) if args.input != '-' else (args.input_format or 'csv')
+    src = sys.stdin if args.input == '-' else open(args.input, newline='')
+    dst = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    start = time.perf_counter()
+    try:
+        result, failed = fleet(src, dst, args.gpus, in_format, args.phase)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        summary = result.summary()
+        summary['errors'] = failed
+        summary['seconds'] = round(elapsed, 3)
+        print(json.dumps(summary, indent=2), file=sys.stderr)
+    return 0
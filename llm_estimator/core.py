@@ -0,0 +1,114 @@
+import math
+from dataclasses import dataclass
+
+# Bytes per parameter for each precision; anything else is treated as fp16
+PRECISION_BYTES = {"fp32": 4, "fp16": 2, "int8": 1, "int4": 0.5}
+DEFAULT_BYTES_PER_PARAM = 2
+
+
+# Fine-tuning memory = param_mem * (param_scale + optimizer_scale) + activations * activation_scale + overhead_gb
+@dataclass(frozen=True, slots=True)
+class MethodCoeffs:
+    param_scale: float
+    optimizer_scale: float
+    activation_scale: float
+    overhead_gb: float
+
+
+METHOD_COEFFS = {
+    "full": MethodCoeffs(param_scale=1, optimizer_scale=2, activation_scale=1, overhead_gb=0),
+    "lora": MethodCoeffs(param_scale=0.25, optimizer_scale=0, activation_scale=0, overhead_gb=2),
+    "qlora": MethodCoeffs(param_scale=0.15, optimizer_scale=0, activation_scale=0, overhead_gb=1.5),
+}
+# Unknown methods fall back to QLoRA, like the original if/elif/else chain
+DEFAULT_METHOD = "qlora"
+
+# Activations scale linearly from this reference sequence length and batch size
+REFERENCE_SEQ_LEN = 2048
+REFERENCE_BATCH_SIZE = 4
+
+
+# float(val) for form input; inf and nan (also '1e400') would overflow math.ceil or spread through every output
+def parse_finite(val, name: str = "value") -> float:
+    number = float(val)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number, got {val!r}")
+    return number
+
+
+# Helper to parse parameter input like '7B', '750M', etc.
+def parse_params(val: str) -> float:
+    text = val.strip().upper()
+    if text.endswith("B"):
+        number = float(text[:-1]) * 1e9
+    elif text.endswith("M"):
+        number = float(text[:-1]) * 1e6
+    else:
+        number = float(text)
+    if not math.isfinite(number):
+        raise ValueError(f"params must be a finite number, got {val!r}")
+    return number
+
+
+def bytes_per_param(precision: str) -> float:
+    return PRECISION_BYTES.get(precision, DEFAULT_BYTES_PER_PARAM)
+
+
+def method_coeffs(method: str) -> MethodCoeffs:
+    return METHOD_COEFFS.get(method, METHOD_COEFFS[DEFAULT_METHOD])
+
+
+# Convert number of parameters to model size in GB for the given precision
+def params_to_gb(params: float, precision: str) -> float:
+    return params * bytes_per_param(precision) / 1e9
+
+
+@dataclass(frozen=True, slots=True)
+class EstimateConfig:
+    params: float
+    method: str = "full"
+    precision: str = "fp16"
+    seq_len: int = 2048
+    batch_size: int = 4
+    gpu_capacity: int = 80
+    dataset_size_gb: float = 0.0
+    epochs: int = 1
+
+
+# Unrounded estimator outputs; the apps round and shape them for display
+@dataclass(frozen=True, slots=True)
+class Estimate:
+    total_mem_ft: float
+    gpus_ft: int
+    flops_ft: float
+    total_mem_inf: float
+    gpus_inf: int
+    flops_inf: float
+
+
+def estimate(config: EstimateConfig) -> Estimate:
+    coeffs = method_coeffs(config.method)
+    # === Fine-tuning ===
+    param_mem = params_to_gb(config.params, config.precision)
+    act_mem = param_mem * (config.seq_len / REFERENCE_SEQ_LEN) * (config.batch_size / REFERENCE_BATCH_SIZE)
+    total_mem_ft = (param_mem * coeffs.param_scale + param_mem * coeffs.optimizer_scale
+                    + act_mem * coeffs.activation_scale + coeffs.overhead_gb)
+    # === Inference ===
+    total_mem_inf = param_mem + act_mem
+    return Estimate(
+        total_mem_ft=total_mem_ft,
+        gpus_ft=math.ceil(total_mem_ft / config.gpu_capacity),
+        flops_ft=6 * config.params,  # FLOPs per token
+        total_mem_inf=total_mem_inf,
+        gpus_inf=math.ceil(total_mem_inf / config.gpu_capacity),
+        flops_inf=2 * config.params,  # forward pass FLOPs
+    )
+
+
+# Rough compute budget from dataset size (Assignment 3's gpu_hours / inf_gpu_hours)
+def gpu_hours(config: EstimateConfig) -> float:
+    return config.dataset_size_gb * config.epochs * 0.5 / config.batch_size
+
+
+def inf_gpu_hours(config: EstimateConfig) -> float:
+    return config.dataset_size_gb * 0.1 / config.batch_size
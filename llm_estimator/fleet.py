@@ -0,0 +1,157 @@
+# Pack a queue of jobs onto a shared, mixed-capacity GPU fleet.
+#
+# Jobs are sized with the estimator (fine-tuning or inference memory) and placed largest first:
+#   * a job that fits on one card goes to the open card with the least room left that still fits
+#     it (best-fit decreasing, kept in a sorted residual list), else to a fresh card of the
+#     smallest class that can hold it;
+#   * a job larger than every card is sharded over ceil(memory / capacity) fresh cards of the
+#     class that wastes the least memory, as the estimator's gpus_ft / gpus_inf assume.
+# Each job costs O(log G) for the search plus a memmove on insert, so 100k jobs on 10k GPUs take
+# well under a second in pure Python.
+import math
+from bisect import bisect_left
+from dataclasses import dataclass
+
+import numpy as np
+
+from .vectorized import estimate_arrays
+
+# Residual memory below this (GB) is treated as a full card
+EPSILON_GB = 1e-9
+
+
+@dataclass(slots=True)
+class FleetPlan:
+    capacities: list      # GB per card, one entry per class (ascending)
+    counts: list          # cards per class
+    memory_gb: np.ndarray  # memory required by each job
+    gpu_class: np.ndarray  # class index per job, -1 if unplaced
+    first_gpu: np.ndarray  # global id of the job's first card, -1 if unplaced
+    n_gpus: np.ndarray     # cards used by the job (1 when sharing a card)
+    shared: np.ndarray     # True when the job shares its card with other jobs
+    cards_used: list      # cards opened per class
+    memory_used: list     # GB placed per class
+
+    @property
+    def unplaced(self):
+        return np.flatnonzero(self.gpu_class < 0)
+
+    def summary(self):
+        total_capacity = sum(c * n for c, n in zip(self.capacities, self.counts))
+        opened_capacity = sum(c * n for c, n in zip(self.capacities, self.cards_used))
+        placed = self.gpu_class >= 0
+        return {
+            'jobs': int(self.memory_gb.size),
+            'placed': int(placed.sum()),
+            'unplaced': int((~placed).sum()),
+            'unplaced_memory_gb': round(float(self.memory_gb[~placed].sum()), 2),
+            'gpus': int(sum(self.counts)),
+            'gpus_used': int(sum(self.cards_used)),
+            # share of the whole fleet's memory holding jobs, and of the cards actually opened
+            'fleet_utilization': round(sum(self.memory_used) / total_capacity, 4) if total_capacity else 0.0,
+            'packing_efficiency': round(sum(self.memory_used) / opened_capacity, 4) if opened_capacity else 0.0,
+            'classes': [
+                {'capacity_gb': c, 'gpus': n, 'gpus_used': used, 'memory_used_gb': round(mem, 2),
+                 'utilization': round(mem / (c * n), 4) if n else 0.0}
+                for c, n, used, mem in zip(self.capacities, self.counts, self.cards_used, self.memory_used)
+            ],
+        }
+
+
+def _parse_inventory(inventory):
+    classes = sorted((float(c), int(n)) for c, n in inventory.items() if int(n) > 0)
+    if not classes:
+        raise ValueError('inventory has no GPUs')
+    return [c for c, _ in classes], [n for _, n in classes]
+
+
+# Place jobs of the given sizes (GB) on an inventory {capacity_gb: count}
+def pack(inventory, memory_gb):
+    capacities, counts = _parse_inventory(inventory)
+    memory_gb = np.asarray(memory_gb, dtype=float).reshape(-1)
+    n_jobs = memory_gb.size
+    gpu_class = np.full(n_jobs, -1, dtype=np.int64)
+    first_gpu = np.full(n_jobs, -1, dtype=np.int64)
+    n_gpus = np.zeros(n_jobs, dtype=np.int64)
+    shared = np.zeros(n_jobs, dtype=bool)
+
+    offsets = [0]
+    for n in counts[:-1]:
+        offsets.append(offsets[-1] + n)
+    free = list(counts)          # untouched cards left per class
+    next_card = list(offsets)    # next untouched card id per class
+    cards_used = [0] * len(capacities)
+    memory_used = [0.0] * len(capacities)
+    largest = capacities[-1]
+    # Open cards with room left, sorted by residual; the parallel lists hold (card id, class)
+    residuals, residual_cards = [], []
+
+    order = np.argsort(-memory_gb, kind='stable')
+    sizes = memory_gb[order].tolist()
+    out_class, out_first, out_n, out_shared = [], [], [], []
+    for size in sizes:
+        placed_class, placed_card, placed_n, placed_shared = -1, -1, 0, False
+        if not size > 0 or math.isinf(size):
+            pass
+        elif size <= largest:
+            i = bisect_left(residuals, size)
+            if i < len(residuals):
+                left = residuals.pop(i) - size
+                placed_card, placed_class = residual_cards.pop(i)
+                placed_n, placed_shared = 1, True
+            else:
+                for c, cap in enumerate(capacities):
+                    if cap >= size and free[c]:
+                        placed_class, placed_card, placed_n = c, next_card[c], 1
+                        free[c] -= 1
+                        next_card[c] += 1
+                        cards_used[c] += 1
+                        left = cap - size
+                        break
+            if placed_n and left > EPSILON_GB:
+                j = bisect_left(residuals, left)
+                residuals.insert(j, left)
+                residual_cards.insert(j, (placed_card, placed_class))
+        else:
+            best = None
+            for c, cap in enumerate(capacities):
+                need = math.ceil(size / cap)
+                if need <= free[c]:
+                    key = (need * cap - size, need)
+                    if best is None or key < best[0]:
+                        best = (key, c, need)
+            if best is not None:
+                _, c, need = best
+                placed_class, placed_card, placed_n = c, next_card[c], need
+                free[c] -= need
+                next_card[c] += need
+                cards_used[c] += need
+        if placed_n:
+            memory_used[placed_class] += size
+        out_class.append(placed_class)
+        out_first.append(placed_card)
+        out_n.append(placed_n)
+        out_shared.append(placed_shared)
+
+    gpu_class[order] = out_class
+    first_gpu[order] = out_first
+    n_gpus[order] = out_n
+    shared[order] = out_shared
+    # A card first opened by a job that later got company is shared too
+    if n_jobs:
+        placed = gpu_class >= 0
+        ids, per_card = np.unique(first_gpu[placed & (n_gpus == 1)], return_counts=True)
+        crowded = np.isin(first_gpu, ids[per_card > 1]) & (n_gpus == 1)
+        shared |= crowded
+    return FleetPlan(capacities, counts, memory_gb, gpu_class, first_gpu, n_gpus, shared,
+                     cards_used, memory_used)
+
+
+# Size jobs with the estimator and pack them; phase 'ft' uses fine-tuning memory, 'inf' inference
+def plan_jobs(inventory, params, method, precision, seq_len=2048, batch_size=4, phase='ft'):
+    if phase not in ('ft', 'inf'):
+        raise ValueError("phase must be 'ft' or 'inf'")
+    est = estimate_arrays(params, method, precision, seq_len, batch_size, gpu_capacity=1)
+    memory_gb = est['total_mem_ft'] if phase == 'ft' else est['total_mem_inf']
+    shape = np.broadcast_shapes(*(np.shape(a) for a in (params, method, precision, seq_len, batch_size)))
+    return pack(inventory, np.broadcast_to(memory_gb, shape))
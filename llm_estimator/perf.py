@@ -0,0 +1,175 @@
+# Roofline performance model: turns the estimator's FLOPs and memory numbers into throughput and
+# latency on a given GPU. Every phase takes max(compute time, memory time) on the profile's peak
+# FLOPs and HBM bandwidth (derated by the efficiency constants below), plus collective traffic
+# over the interconnect when the job spans several GPUs:
+#   training    6 * params FLOPs per token (+ attention), gradient all-reduce per step
+#   prefill     2 * params FLOPs per prompt token (+ attention) -> time to first token
+#   decode      one pass over the weights and the KV cache per generated token
+# Layer count and width are not inputs, so the transformer shape is inferred from params.
+# All arguments broadcast like estimate_arrays, so whole sweeps run in one call.
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .core import DEFAULT_BYTES_PER_PARAM, DEFAULT_METHOD, PRECISION_BYTES
+from .vectorized import _lookup, _lookup_many, estimate_arrays, round2
+
+
+# Dense (no sparsity) tensor-core peaks; fp32 uses the TF32 rate
+@dataclass(frozen=True, slots=True)
+class HardwareProfile:
+    fp16_tflops: float
+    fp32_tflops: float
+    int8_tops: float
+    memory_gb: int
+    hbm_gb_s: float           # memory bandwidth
+    interconnect_gb_s: float  # per-GPU NVLink / Infinity Fabric / PCIe bandwidth
+
+
+HARDWARE_PROFILES = {
+    'a100-40gb': HardwareProfile(312, 156, 624, 40, 1555, 600),
+    'a100-80gb': HardwareProfile(312, 156, 624, 80, 2039, 600),
+    'h100-sxm': HardwareProfile(989, 495, 1979, 80, 3350, 900),
+    'h100-pcie': HardwareProfile(756, 378, 1513, 80, 2000, 128),
+    'l4': HardwareProfile(121, 60, 242, 24, 300, 64),
+    'a10g': HardwareProfile(125, 62.5, 250, 24, 600, 32),
+    'rtx-4090': HardwareProfile(165, 82.6, 330, 24, 1008, 32),
+    'mi300x': HardwareProfile(1307, 654, 2615, 192, 5300, 448),
+}
+DEFAULT_HARDWARE = 'a100-80gb'
+
+# Fraction of peak reached in practice (model FLOPs utilization / achievable bandwidth)
+TRAIN_MFU = 0.4
+PREFILL_MFU = 0.6
+DECODE_MFU = 0.6
+HBM_EFFICIENCY = 0.8
+# Fixed cost of one collective (launch + synchronisation), seconds
+COLLECTIVE_LATENCY = 10e-6
+# Bytes of training text per token, to turn dataset_size_gb into tokens
+BYTES_PER_TOKEN = 4
+# d_model / n_layers of common decoder-only models (Llama 7B: 4096 / 32, 13B: 5120 / 40)
+ASPECT_RATIO = 128
+# Share of the weights that get gradients (and are all-reduced) for each method
+TRAINABLE_FRACTION = {'full': 1.0, 'lora': 0.01, 'qlora': 0.01}
+# Activations, gradients and the KV cache are kept in 16-bit unless the model runs in fp32
+ACTIVATION_BYTES = 2
+
+
+# (d_model, n_layers) of a decoder-only transformer with this many parameters,
+# from params ~= 12 * n_layers * d_model**2
+def model_shape(params):
+    d_model = np.cbrt(ASPECT_RATIO * np.asarray(params, dtype=float) / 12)
+    return d_model, d_model / ASPECT_RATIO
+
+
+# Per-element profile fields as {field: array}; raises ValueError for unknown hardware names
+def hardware_arrays(hardware):
+    hardware = np.asarray(hardware)
+    fields = HardwareProfile.__slots__
+    *values, known = _lookup_many(hardware, [{name: getattr(p, field) for name, p in HARDWARE_PROFILES.items()}
+                                             for field in fields] + [dict.fromkeys(HARDWARE_PROFILES, 1)],
+                                  [0.0] * (len(fields) + 1))
+    if not known.all():
+        unknown = np.unique(hardware[known == 0]).tolist()
+        raise ValueError(f"unknown hardware {', '.join(unknown)}; choose from {', '.join(HARDWARE_PROFILES)}")
+    return dict(zip(fields, values))
+
+
+# Ring all-reduce of message_bytes across gpus: 2 * (g - 1) / g of the message over each link
+def allreduce_seconds(message_bytes, gpus, interconnect_gb_s):
+    gpus = np.asarray(gpus, dtype=float)
+    return np.where(gpus > 1, 2 * (gpus - 1) / gpus * message_bytes / (interconnect_gb_s * 1e9)
+                    + COLLECTIVE_LATENCY, 0.0)
+
+
+# Unrounded throughput / latency arrays. gpus_ft / gpus_inf default to the estimator's GPU counts
+# on cards of the profile's memory size; batch_size is sequences per training step / decode batch.
+def performance_arrays(params, method='full', precision='fp16', seq_len=2048, batch_size=4, dataset_size_gb=0.0,
+                       epochs=1, hardware=DEFAULT_HARDWARE, gpus_ft=None, gpus_inf=None):
+    params = np.asarray(params, dtype=float)
+    seq_len = np.asarray(seq_len, dtype=float)
+    batch_size = np.asarray(batch_size, dtype=float)
+    precision = np.asarray(precision)
+    hw = hardware_arrays(hardware)
+    if gpus_ft is None or gpus_inf is None:
+        est = estimate_arrays(params, method, precision, seq_len.astype(np.int64), batch_size.astype(np.int64),
+                              hw['memory_gb'].astype(np.int64))
+        gpus_ft = est['gpus_ft'] if gpus_ft is None else gpus_ft
+        gpus_inf = est['gpus_inf'] if gpus_inf is None else gpus_inf
+    gpus_ft = np.maximum(np.asarray(gpus_ft, dtype=float), 1)
+    gpus_inf = np.maximum(np.asarray(gpus_inf, dtype=float), 1)
+
+    fp32 = precision == 'fp32'
+    weight_bytes = params * _lookup(precision, PRECISION_BYTES, DEFAULT_BYTES_PER_PARAM)
+    act_bytes = np.where(fp32, 4, ACTIVATION_BYTES)
+    hbm = hw['hbm_gb_s'] * 1e9 * HBM_EFFICIENCY
+    link = hw['interconnect_gb_s']
+    # Training runs 4/8-bit weights in 16-bit compute (QLoRA); int8 inference uses the int8 units
+    train_peak = np.where(fp32, hw['fp32_tflops'], hw['fp16_tflops']) * 1e12
+    infer_peak = np.where(fp32, hw['fp32_tflops'], np.where(precision == 'int8', hw['int8_tops'], hw['fp16_tflops'])) * 1e12
+    d_model, n_layers = model_shape(params)
+    kv_bytes_per_token = 2 * n_layers * d_model * act_bytes
+
+    # === Training ===
+    # Causal attention averages 2 * n_layers * d_model * seq_len forward FLOPs per token; x3 with the backward pass
+    train_flops_per_token = 6 * params + 6 * n_layers * d_model * seq_len
+    step_tokens = batch_size * seq_len
+    step_compute = train_flops_per_token * step_tokens / (gpus_ft * train_peak * TRAIN_MFU)
+    # weights are read in the forward and backward pass and by the optimizer
+    step_memory = 3 * weight_bytes / (gpus_ft * hbm)
+    grad_bytes = params * _lookup(method, TRAINABLE_FRACTION, TRAINABLE_FRACTION[DEFAULT_METHOD]) * act_bytes
+    # gradient all-reduce overlaps with the backward pass, so the slower of the two sets the pace
+    step_seconds = np.maximum(np.maximum(step_compute, step_memory), allreduce_seconds(grad_bytes, gpus_ft, link))
+    train_tokens = np.asarray(dataset_size_gb, dtype=float) * 1e9 / BYTES_PER_TOKEN * np.asarray(epochs, dtype=float)
+    train_seconds = train_tokens / step_tokens * step_seconds
+
+    # === Inference (tensor parallel over gpus_inf: two all-reduces of the activations per layer) ===
+    prefill_flops = batch_size * (2 * params * seq_len + 2 * n_layers * d_model * seq_len ** 2)
+    prefill_seconds = (np.maximum(prefill_flops / (gpus_inf * infer_peak * PREFILL_MFU),
+                                  (weight_bytes + batch_size * seq_len * kv_bytes_per_token) / (gpus_inf * hbm))
+                       + 2 * n_layers * allreduce_seconds(batch_size * seq_len * d_model * act_bytes, gpus_inf, link))
+    # Each decode step reads all weights once and the whole KV cache (seq_len tokens) for every sequence
+    decode_flops = batch_size * (2 * params + 4 * n_layers * d_model * seq_len)
+    decode_bytes = weight_bytes + batch_size * seq_len * kv_bytes_per_token
+    decode_compute = decode_flops / (gpus_inf * infer_peak * DECODE_MFU)
+    decode_memory = decode_bytes / (gpus_inf * hbm)
+    decode_seconds = (np.maximum(decode_compute, decode_memory)
+                      + 2 * n_layers * allreduce_seconds(batch_size * d_model * act_bytes, gpus_inf, link))
+
+    return {
+        'train_tokens_per_sec': step_tokens / step_seconds,
+        'train_hours': train_seconds / 3600,
+        'train_gpu_hours': train_seconds * gpus_ft / 3600,
+        'ttft_ms': prefill_seconds * 1e3,
+        'decode_ms_per_token': decode_seconds * 1e3,
+        'decode_tokens_per_sec': batch_size / decode_seconds,
+        'kv_cache_gb': batch_size * seq_len * kv_bytes_per_token / 1e9,
+        'decode_memory_bound': decode_memory >= decode_compute,
+        'gpus_ft': gpus_ft.astype(np.int64),
+        'gpus_inf': gpus_inf.astype(np.int64),
+    }
+
+
+# performance_arrays for one configuration, as plain numbers rounded for display
+def performance(params, method='full', precision='fp16', seq_len=2048, batch_size=4, dataset_size_gb=0.0,
+                epochs=1, hardware=DEFAULT_HARDWARE, gpus_ft=None, gpus_inf=None):
+    return dict(_performance(params, method, precision, seq_len, batch_size, dataset_size_gb, epochs,
+                             hardware, gpus_ft, gpus_inf))
+
+
+# ~300 us of numpy overhead per scalar call, and form submits repeat the same few configurations.
+# Non-finite values (e.g. a zero-parameter model) become None, since Infinity / NaN are not JSON.
+@lru_cache(maxsize=4096)
+def _performance(*args):
+    result = {'hardware': args[7]}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        arrays = performance_arrays(*args)
+    for name, value in arrays.items():
+        if value.dtype == bool:
+            result[name] = bool(value)
+        elif value.dtype.kind == 'i':
+            result[name] = int(value)
+        else:
+            result[name] = float(round2(value)) if np.isfinite(value) else None
+    return result
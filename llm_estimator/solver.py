@@ -0,0 +1,76 @@
+# Inverse estimator: the largest batch size / sequence length that fits a memory budget.
+# Memory grows monotonically with batch_size and seq_len, so for every candidate seq_len the
+# largest fitting batch size is found by one binary search run over all seq_lens at once
+# (about log2(max_batch_size) calls to estimate_arrays), instead of trying configs one by one.
+import numpy as np
+
+from .vectorized import estimate_arrays, round2
+
+DEFAULT_SEQ_LENS = (512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072)
+DEFAULT_MAX_BATCH_SIZE = 1024
+MAX_SEQ_LENS = 64
+PHASES = {'fine_tune': 'total_mem_ft', 'inference': 'total_mem_inf'}
+
+
+# Largest batch size in [1, max_batch_size] per seq_len whose memory fits budget_gb (0 = none fits),
+# as {phase: array}; both phases are searched together, one estimate_arrays call per step
+def max_batch_sizes(params, method, precision, seq_lens, budget_gb, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+    seq_lens = np.asarray(seq_lens, dtype=np.int64)
+    shape = (len(PHASES),) + seq_lens.shape
+    lo = np.zeros(shape, dtype=np.int64)
+    hi = np.full(shape, max_batch_size, dtype=np.int64)
+    while np.any(lo < hi):
+        mid = (lo + hi + 1) // 2
+        est = estimate_arrays(params, method, precision, seq_lens, mid, gpu_capacity=1)
+        mem = np.stack([np.broadcast_to(est[field][i], seq_lens.shape) for i, field in enumerate(PHASES.values())])
+        fits = mem <= budget_gb
+        lo = np.where(fits, mid, lo)
+        hi = np.where(fits, hi, mid - 1)
+    return dict(zip(PHASES, lo))
+
+
+# Indices of the (seq_len, batch_size) points not dominated by another feasible point
+def pareto_frontier(seq_lens, batch_sizes):
+    order = np.argsort(seq_lens)[::-1]
+    frontier, best = [], 0
+    for i in order.tolist():
+        if batch_sizes[i] > best:
+            frontier.append(i)
+            best = batch_sizes[i]
+    return frontier[::-1]
+
+
+# Pareto frontiers of (seq_len, batch_size) for fine-tuning and inference on num_gpus cards
+def solve(params, method, precision, gpu_capacity=80, num_gpus=1, seq_lens=DEFAULT_SEQ_LENS,
+          max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+    seq_lens = sorted({int(s) for s in seq_lens})
+    if not seq_lens or seq_lens[0] <= 0 or len(seq_lens) > MAX_SEQ_LENS:
+        raise ValueError(f'seq_lens must be 1 to {MAX_SEQ_LENS} positive integers')
+    # whole GB like the estimate form: the GPU counts come from estimate_arrays, which takes ints
+    if not (float(gpu_capacity).is_integer() and gpu_capacity > 0 and float(num_gpus).is_integer() and num_gpus >= 1):
+        raise ValueError('gpu_capacity (GB) and num_gpus must be positive integers')
+    gpu_capacity, num_gpus = int(gpu_capacity), int(num_gpus)
+    if not 1 <= max_batch_size <= 1 << 20:
+        raise ValueError('max_batch_size must be between 1 and 1048576')
+    budget_gb = gpu_capacity * num_gpus
+    seq_lens = np.array(seq_lens, dtype=np.int64)
+    result = {'budget_gb': budget_gb, 'gpu_capacity': gpu_capacity, 'num_gpus': num_gpus,
+              'max_batch_size': max_batch_size}
+    searched = max_batch_sizes(params, method, precision, seq_lens, budget_gb, max_batch_size)
+    for phase, field in PHASES.items():
+        batches = searched[phase]
+        points = pareto_frontier(seq_lens, batches)
+        chosen_seq, chosen_batch = seq_lens[points], batches[points]
+        est = estimate_arrays(params, method, precision, chosen_seq, chosen_batch, gpu_capacity)
+        gpus_key = 'gpus_ft' if phase == 'fine_tune' else 'gpus_inf'
+        result[phase] = {
+            'frontier': [
+                {'seq_len': s, 'batch_size': b, 'total_mem': m, 'gpus': g}
+                for s, b, m, g in zip(chosen_seq.tolist(), chosen_batch.tolist(),
+                                      np.broadcast_to(round2(est[field]), chosen_seq.shape).tolist(),
+                                      np.broadcast_to(est[gpus_key], chosen_seq.shape).tolist())
+            ],
+            # largest fitting batch size per requested seq_len, 0 where even batch_size=1 does not fit
+            'max_batch_size': dict(zip(map(str, seq_lens.tolist()), batches.tolist())),
+        }
+    return result
@@ -0,0 +1,104 @@
+import numpy as np
+
+from .core import (DEFAULT_BYTES_PER_PARAM, DEFAULT_METHOD, METHOD_COEFFS, PRECISION_BYTES,
+                   REFERENCE_BATCH_SIZE, REFERENCE_SEQ_LEN)
+
+
+# Index of each value among keys (len(keys) where it is none of them). One comparison per key
+# beats sorting the values (np.unique) by far for tables this small.
+def _codes(values, keys):
+    if values.dtype.kind != 'U':
+        values = values.astype(str)
+    codes = np.full(values.shape, len(keys), dtype=np.intp)
+    for i, key in enumerate(keys):
+        codes[values == key] = i
+    return codes
+
+
+# Map an array of category strings to numbers via a small table
+def _lookup(values, table, default):
+    values = np.asarray(values)
+    if values.ndim == 0:
+        return np.array(table.get(str(values), default), dtype=float)
+    return _lookup_many(values, [table], [default])[0]
+
+
+# _lookup for several tables keyed by the same values, comparing the values only once
+def _lookup_many(values, tables, defaults):
+    values = np.asarray(values)
+    if values.ndim == 0:
+        return [_lookup(values, table, default) for table, default in zip(tables, defaults)]
+    keys = list(dict.fromkeys(key for table in tables for key in table))
+    codes = _codes(values, keys)
+    return [np.array([table.get(key, default) for key in keys] + [default], dtype=float)[codes]
+            for table, default in zip(tables, defaults)]
+
+
+# From here on x * 100 is no longer exact in a float64 and rint can pick the wrong hundredth
+# (differences start around 2**53 / 100, about 9e13)
+EXACT_ROUND_LIMIT = 2 ** 52 / 100
+
+
+# Same result as round(x, 2) for every element; np.round alone can differ on halfway values,
+# so those and very large values go through Python's round()
+def round2(x):
+    x = np.asarray(x, dtype=float)
+    scaled = x * 100
+    rounded = np.asarray(np.rint(scaled) / 100)
+    with np.errstate(invalid='ignore'):
+        exact = (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6) | (np.abs(x) >= EXACT_ROUND_LIMIT)
+    if np.any(exact):
+        rounded[exact] = [round(float(v), 2) for v in x[exact]]
+    return rounded
+
+
+# Per-element method coefficients as four arrays shaped like method
+def method_coeff_arrays(method):
+    default = METHOD_COEFFS[DEFAULT_METHOD]
+    fields = ('param_scale', 'optimizer_scale', 'activation_scale', 'overhead_gb')
+    return tuple(_lookup_many(method, [{name: getattr(c, field) for name, c in METHOD_COEFFS.items()} for field in fields],
+                              [getattr(default, field) for field in fields]))
+
+
+# Unrounded memory/GPU/FLOPs arrays, the vectorized counterpart of core.estimate
+def estimate_arrays(params, method, precision, seq_len=2048, batch_size=4, gpu_capacity=80):
+    params = np.asarray(params, dtype=float)
+    seq_len = np.asarray(seq_len, dtype=np.int64)
+    batch_size = np.asarray(batch_size, dtype=np.int64)
+    gpu_capacity = np.asarray(gpu_capacity, dtype=np.int64)
+    param_scale, optimizer_scale, activation_scale, overhead_gb = method_coeff_arrays(method)
+    # === Fine-tuning ===
+    param_mem = params * _lookup(precision, PRECISION_BYTES, DEFAULT_BYTES_PER_PARAM) / 1e9
+    act_mem = param_mem * (seq_len / REFERENCE_SEQ_LEN) * (batch_size / REFERENCE_BATCH_SIZE)
+    total_mem_ft = (param_mem * param_scale + param_mem * optimizer_scale
+                    + act_mem * activation_scale + overhead_gb)
+    # === Inference ===
+    total_mem_inf = param_mem + act_mem
+    return {
+        'total_mem_ft': total_mem_ft,
+        'gpus_ft': np.ceil(total_mem_ft / gpu_capacity).astype(np.int64),
+        'flops_ft': 6 * params,
+        'total_mem_inf': total_mem_inf,
+        'gpus_inf': np.ceil(total_mem_inf / gpu_capacity).astype(np.int64),
+        'flops_inf': 2 * params,
+    }
+
+
+# Vectorized Assignment 3 estimate_resources_local: every argument may be a scalar or an array,
+# arrays are broadcast together and each output element matches the scalar function
+def estimate_batch(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80):
+    dataset_size_gb = np.asarray(dataset_size_gb, dtype=float)
+    epochs = np.asarray(epochs, dtype=np.int64)
+    batch_size = np.asarray(batch_size, dtype=np.int64)
+    est = estimate_arrays(params, method, precision, seq_len, batch_size, gpu_capacity)
+    shape = np.broadcast_shapes(est['total_mem_ft'].shape, est['gpus_ft'].shape, dataset_size_gb.shape, epochs.shape)
+    return {
+        'memory_gb': np.broadcast_to(round2(est['total_mem_ft']), shape),
+        'gpu_hours': np.broadcast_to(round2(dataset_size_gb * epochs * 0.5 / batch_size), shape),
+        'inf_memory_gb': np.broadcast_to(round2(est['total_mem_inf']), shape),
+        'inf_gpu_hours': np.broadcast_to(round2(dataset_size_gb * 0.1 / batch_size), shape),
+        'gpus_ft': np.broadcast_to(est['gpus_ft'], shape),
+        'flops_ft': np.broadcast_to(est['flops_ft'], shape),
+        'gpus_inf': np.broadcast_to(est['gpus_inf'], shape),
+        'flops_inf': np.broadcast_to(est['flops_inf'], shape)
+    }
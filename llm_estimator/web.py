@@ -0,0 +1,97 @@
+# HTTP helpers shared by the Flask apps (imports Flask, so it is not re-exported from the package):
+# a pre-rendered page shell served with ETag / Cache-Control, gzip for large HTML/JSON responses,
+# content negotiation and the /api/solve handler.
+import gzip
+import hashlib
+import os
+
+from flask import Response, jsonify, request
+
+from .core import parse_params
+from .solver import DEFAULT_MAX_BATCH_SIZE, DEFAULT_SEQ_LENS, solve
+
+# Stylesheet used by both pages. Set BOOTSTRAP_CSS=/static/bootstrap.min.css (after copying the file
+# into the app's static/ folder) to serve it from the app instead of the CDN.
+BOOTSTRAP_CSS = os.environ.get('BOOTSTRAP_CSS') or 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css'
+# Seconds browsers may reuse the page shell / static files before revalidating with the ETag
+SHELL_MAX_AGE = int(os.environ.get('SHELL_MAX_AGE', 300))
+STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 86400))
+GZIP_ENABLED = os.environ.get('GZIP_RESPONSES', '1') != '0'
+# Per-request compression level; 1 costs about half the CPU of 6 for ~10% more bytes on these pages
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 1))
+# Smaller bodies are not worth the gzip header and CPU
+GZIP_MIN_BYTES = 1024
+GZIP_MIMETYPES = ('text/html', 'application/json')
+
+
+def accepts_gzip(request):
+    return GZIP_ENABLED and request.accept_encodings['gzip'] > 0
+
+
+# A page that is identical for every visitor, rendered and compressed once at startup
+class CachedPage:
+    def __init__(self, html, max_age=SHELL_MAX_AGE):
+        self.body = html.encode()
+        self.gzipped = gzip.compress(self.body, 9, mtime=0)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:20]
+        self.max_age = max_age
+
+    # 304 when the client already holds this version
+    def response(self, request):
+        compressed = accepts_gzip(request)
+        response = Response(self.gzipped if compressed else self.body, mimetype='text/html')
+        if compressed:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        # The same URL answers JSON clients differently (content negotiation), so shared caches must
+        # not hand this page to them
+        response.vary.add('Accept')
+        # Each encoding is a separate representation, so it gets its own strong ETag
+        response.set_etag(self.etag + ('-gz' if compressed else ''))
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response.make_conditional(request)
+
+
+# after_request hook body: gzip buffered HTML/JSON responses when the client accepts it
+def gzip_response(response, request):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in GZIP_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    if not accepts_gzip(request):
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+# Clients asking for application/json (or ?format=json) skip HTML rendering entirely
+def wants_json():
+    if request.args.get('format') == 'json':
+        return True
+    return request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
+
+
+# Largest batch size / sequence length that fits, in one call instead of resubmitting the form:
+#   GET /api/solve?params=7B&method=full&precision=fp16&gpu_capacity=80&num_gpus=2&seq_lens=2048,8192
+# Also accepts the same fields as a JSON body. Returns the Pareto frontier for fine-tuning and inference.
+def solve_response(data):
+    try:
+        params = data['params']
+        seq_lens = data.get('seq_lens', DEFAULT_SEQ_LENS)
+        if isinstance(seq_lens, str):
+            seq_lens = [s for s in seq_lens.split(',') if s.strip()]
+        result = solve(parse_params(params) if isinstance(params, str) else float(params),
+                       data.get('method', 'full'), data.get('precision', 'fp16'),
+                       gpu_capacity=float(data.get('gpu_capacity', 80)), num_gpus=float(data.get('num_gpus', 1)),
+                       seq_lens=[int(s) for s in seq_lens],
+                       max_batch_size=int(data.get('max_batch_size', DEFAULT_MAX_BATCH_SIZE)))
+    except KeyError as e:
+        return jsonify({'error': f"missing field '{e.args[0]}'"}), 400
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
@@ -0,0 +1,34 @@
+# The assignment folders contain spaces, so the apps are loaded by path (like benchmarks/_apps.py)
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def load_app(folder):
+    module_name = folder.lower().replace(' ', '') + '_app'
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    app_dir = os.path.join(ROOT, folder)
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(app_dir, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def assignment2():
+    return load_app('Assignment 2')
+
+
+@pytest.fixture(scope='session')
+def assignment3():
+    return load_app('Assignment 3')
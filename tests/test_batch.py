@@ -0,0 +1,33 @@
+import pytest
+
+CONFIG = {'params': '7B', 'dataset_size_gb': 10, 'batch_size': 4, 'epochs': 1, 'method': 'full', 'precision': 'fp16'}
+
+
+@pytest.mark.parametrize('payload, message', [
+    ({'configs': ['x']}, 'configs[0] must be an object'),
+    ({'configs': [CONFIG, 7]}, 'configs[1] must be an object'),
+    ({'grid': [1]}, "'grid' must be an object"),
+    ([CONFIG], "expected a JSON object"),
+])
+def test_batch_rejects_malformed_payloads(assignment3, payload, message):
+    response = assignment3.app.test_client().post('/api/batch', json=payload)
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
+
+
+def test_batch_streams_valid_json_in_both_formats(assignment3, monkeypatch):
+    monkeypatch.setattr(assignment3, 'BATCH_CHUNK_ROWS', 7)
+    grid = dict(CONFIG, params=['7B', '0', '13B'], batch_size=[1, 2, 4, 8], seq_len=[512, 2048])
+    client = assignment3.app.test_client()
+    rows = client.post('/api/batch', json={'grid': grid}).get_json()
+    columns = client.post('/api/batch', json={'grid': grid, 'format': 'columns'}).get_json()
+    assert rows['count'] == columns['count'] == len(rows['results']) == 24
+    assert [row['memory_gb'] for row in rows['results']] == columns['columns']['memory_gb']
+    assert rows['results'][8]['params'] == 0 and rows['results'][8]['flops_ft'] == 0
+
+
+def test_batch_writes_non_finite_values_as_null(assignment3):
+    grid = dict(CONFIG, params=['7B', '0'])
+    response = assignment3.app.test_client().post('/api/batch', json={'grid': grid, 'perf': True})
+    assert b'NaN' not in response.data and b'Infinity' not in response.data
+    assert None in response.get_json()['results'][1].values()
@@ -0,0 +1,82 @@
+import argparse
+import csv
+import io
+import json
+
+import pytest
+
+from llm_estimator.cli import _inventory, fleet, plan
+
+
+def test_fleet_keeps_input_columns_and_reports_bad_rows():
+    src = io.StringIO('id,params,method,precision,batch_size\n'
+                      'a,7B,full,fp16,4\n'
+                      'b,abc,full,fp16,4\n'
+                      'c,13B,qlora,fp16,2.5\n'
+                      'd,70B,full,fp16,4\n')
+    dst = io.StringIO()
+    result, failed = fleet(src, dst, {80: 8})
+    rows = list(csv.DictReader(io.StringIO(dst.getvalue())))
+    assert failed == 2
+    assert [row['id'] for row in rows] == ['a', 'b', 'c', 'd']
+    assert rows[0]['memory_gb'] == '56.0' and rows[0]['gpu_capacity'] == '80.0' and rows[0]['error'] == ''
+    assert rows[1]['error'] and rows[1]['first_gpu'] == '' and rows[1]['n_gpus'] == ''
+    assert rows[2]['error'] and rows[2]['first_gpu'] == ''
+    assert int(rows[3]['n_gpus']) > 1
+    assert result.memory_gb.size == 2
+
+
+def test_fleet_without_valid_rows():
+    dst = io.StringIO()
+    result, failed = fleet(io.StringIO('params,method,precision,batch_size\nx,full,fp16,4\n'), dst, {80: 1})
+    assert failed == 1 and result.memory_gb.size == 0
+    assert dst.getvalue().splitlines()[1].endswith("could not convert string to float: 'X'")
+
+
+@pytest.mark.parametrize('text', ['24=0', '24', 'a=4', '0=4', '24=4,80=-1'])
+def test_inventory_rejects_invalid_entries(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        _inventory(text)
+
+
+def test_inventory_merges_classes():
+    assert _inventory('24=4,80=2,24=1') == {24.0: 5, 80.0: 2}
+
+
+def test_plan_reports_bad_jsonl_lines_per_row():
+    good = {'params': '7B', 'dataset_size_gb': 10, 'batch_size': 4, 'epochs': 1, 'method': 'full',
+            'precision': 'fp16'}
+    src = io.StringIO('\n'.join([json.dumps(good), '{"params": "7B",', '[1, 2]', '"text"',
+                                 json.dumps(dict(good, dataset_size_gb=float('nan'), note=float('inf'))),
+                                 json.dumps(dict(good, params=1e400)), json.dumps(good)]) + '\n')
+    dst = io.StringIO()
+    total, failed = plan(src, dst, 'jsonl', 'jsonl')
+    assert (total, failed) == (7, 5)
+    lines = dst.getvalue().splitlines()
+    rows = [json.loads(line, parse_constant=lambda name: pytest.fail(f'{name} in output')) for line in lines]
+    assert rows[0]['memory_gb'] == rows[6]['memory_gb'] == 56.0 and 'error' not in rows[0]
+    assert rows[1]['error'].startswith('invalid JSON')
+    assert rows[2]['error'] == 'expected a JSON object, got list'
+    assert rows[3]['error'] == 'expected a JSON object, got str'
+    assert rows[4]['dataset_size_gb'] is None and rows[4]['note'] is None
+    assert rows[4]['error'] == "dataset_size_gb must be a finite number, got nan"
+    assert rows[5]['params'] is None and 'finite' in rows[5]['error']
+
+
+def test_plan_writes_overflowing_results_as_null():
+    src = io.StringIO(json.dumps({'params': '7B', 'dataset_size_gb': 1e308, 'batch_size': 4, 'epochs': 10,
+                                  'method': 'full', 'precision': 'fp16'}) + '\n')
+    dst = io.StringIO()
+    assert plan(src, dst, 'jsonl', 'jsonl') == (1, 0)
+    row = json.loads(dst.getvalue(), parse_constant=lambda name: pytest.fail(f'{name} in output'))
+    assert row['gpu_hours'] is None and row['memory_gb'] == 56.0
+
+
+def test_fleet_reports_bad_jsonl_lines():
+    src = io.StringIO('{"params": "7B", "method": "full", "precision": "fp16", "batch_size": 4}\nnot json\n[1]\n')
+    dst = io.StringIO()
+    result, failed = fleet(src, dst, {80: 1}, in_format='jsonl')
+    rows = list(csv.DictReader(io.StringIO(dst.getvalue())))
+    assert failed == 2 and result.memory_gb.size == 1
+    assert rows[0]['n_gpus'] == '1'
+    assert rows[1]['error'].startswith('invalid JSON') and rows[2]['error'].startswith('expected a JSON object')
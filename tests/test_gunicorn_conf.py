@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+# gunicorn.conf.py exports its settings through os.environ, so each run gets a fresh interpreter:
+# load the config, call on_exit and print the runtime directory
+SCRIPT = """
+import runpy
+config = runpy.run_path('gunicorn.conf.py')
+config['on_exit'](None)
+print(config['runtime_dir'])
+"""
+
+
+def run_config(**overrides):
+    env = {name: value for name, value in os.environ.items()
+           if not name.startswith(('LLMCALC_', 'JOBS_DB_', 'METRICS_MULTIPROC_'))}
+    env.update(overrides)
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, env=env, capture_output=True, text=True,
+                            check=True)
+    return result.stdout.strip()
+
+
+def test_on_exit_removes_the_directory_it_created():
+    runtime_dir = run_config()
+    assert os.path.basename(runtime_dir).startswith('llmcalc-')
+    assert not os.path.exists(runtime_dir)
+
+
+def test_on_exit_keeps_an_operator_directory(tmp_path):
+    (tmp_path / 'keep.txt').write_text('x')
+    assert run_config(LLMCALC_RUNTIME_DIR=str(tmp_path)) == str(tmp_path)
+    assert (tmp_path / 'keep.txt').exists() and (tmp_path / 'metrics').is_dir()
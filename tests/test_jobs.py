@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+FORM = {'params': '7B', 'dataset_size_gb': 10, 'batch_size': 4, 'epochs': 1, 'method': 'full', 'precision': 'fp16',
+        'seq_len': 2048, 'gpu_capacity': 80, 'calculation_method': 'gemini'}
+
+
+@pytest.fixture
+def stub(assignment3, monkeypatch):
+    import gemini
+    import gemini_stub
+
+    server, url = gemini_stub.serve(delay=0.2)
+    monkeypatch.setattr(gemini, 'GEMINI_API_URL', url)
+    assignment3.gemini_cache.clear()
+    yield server
+    assignment3.gemini_cache.clear()
+    server.shutdown()
+
+
+def test_gemini_job_is_polled_then_served_from_cache(assignment3, stub):
+    client = assignment3.app.test_client()
+    accepted = client.post('/api/estimate', data=FORM)
+    assert accepted.status_code == 202
+    job = accepted.get_json()
+    assert job['status'] == 'pending' and job['poll'] == f"/jobs/{job['id']}"
+    assert client.get(job['poll']).get_json()['status'] == 'pending'
+
+    for _ in range(100):
+        polled = client.get(job['poll']).get_json()
+        if polled['status'] != 'pending':
+            break
+        time.sleep(0.02)
+    assert polled['status'] == 'done'
+    assert polled['result']['memory_gb'] == 56.0 and 'error' not in polled['result']
+
+    cached = client.post('/api/estimate', data=FORM)
+    assert cached.status_code == 200
+    assert {name: cached.get_json()[name] for name in polled['result']} == polled['result']
+    assert stub.calls == 1
+
+
+def test_full_gemini_queue_asks_the_client_to_retry(assignment3, stub, monkeypatch):
+    monkeypatch.setattr(assignment3.gemini_jobs, 'max_pending', 0)
+    monkeypatch.setattr(assignment3, 'GEMINI_QUEUE_RETRY_AFTER', 3)
+    response = assignment3.app.test_client().post('/api/estimate', data=FORM)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '3'
+    assert 'queue is full' in response.get_json()['error']
+    assert stub.calls == 0
@@ -0,0 +1,43 @@
+import json
+import os
+
+from llm_estimator import LookupTable, lookup
+
+SMALL = {'params': [7e9, 13e9], 'batch_size': [1, 4], 'seq_len': [2048], 'gpu_capacity': [80]}
+
+
+def test_load_or_build_reuses_saved_table(tmp_path):
+    built = LookupTable.load_or_build(str(tmp_path), **SMALL)
+    assert built.source == 'built'
+    loaded = LookupTable.load_or_build(str(tmp_path), **SMALL)
+    assert loaded.source.startswith('mmap:')
+    assert loaded.get(7e9, 'full', 'fp16', 4, 2048, 80) == built.get(7e9, 'full', 'fp16', 4, 2048, 80)
+
+
+def test_load_or_build_rebuilds_table_from_other_version(tmp_path):
+    LookupTable.load_or_build(str(tmp_path), **SMALL)
+    axes_path = os.path.join(tmp_path, 'axes.json')
+    with open(axes_path) as f:
+        saved = json.load(f)
+    # same axes, written by a package whose coefficients differed: zero in every cell
+    stale = LookupTable.build(**SMALL)
+    stale.arrays = {name: a * 0 for name, a in stale.arrays.items()}
+    stale.version = 'older'
+    stale.save(str(tmp_path))
+
+    table = LookupTable.load_or_build(str(tmp_path), **SMALL)
+    assert table.source == 'built'
+    assert table.version == lookup.TABLE_VERSION
+    assert table.get(7e9, 'full', 'fp16', 4, 2048, 80)[0] > 0
+    with open(axes_path) as f:
+        assert json.load(f) == saved
+
+
+def test_load_or_build_rebuilds_table_without_version(tmp_path):
+    LookupTable.load_or_build(str(tmp_path), **SMALL)
+    axes_path = os.path.join(tmp_path, 'axes.json')
+    with open(axes_path) as f:
+        saved = json.load(f)
+    with open(axes_path, 'w') as f:
+        json.dump({name: values for name, values in saved.items() if name != 'version'}, f)
+    assert LookupTable.load_or_build(str(tmp_path), **SMALL).source == 'built'
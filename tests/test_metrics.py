@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture
+def metrics(assignment3):
+    import metrics
+    return metrics
+
+
+def make_registry(metrics, directory=None):
+    registry = metrics.Registry(enabled=True, multiproc_dir=directory)
+    requests = registry.counter('test_requests_total', 'Requests', ['status'])
+    latency = registry.histogram('test_seconds', 'Latency', buckets=(0.1, 1))
+    return registry, requests, latency
+
+
+def sample(text, line):
+    for row in text.splitlines():
+        if row.startswith(line + ' '):
+            return float(row.rsplit(' ', 1)[1])
+    raise AssertionError(f'{line} not in output')
+
+
+def test_metrics_endpoint_exposes_prometheus_text(assignment3):
+    client = assignment3.app.test_client()
+    client.get('/lookup/stats')
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert '# TYPE llmcalc_requests_total counter' in text
+    assert sample(text, 'llmcalc_requests_total{endpoint="lookup_stats",status="200"}') >= 1
+    assert '# TYPE llmcalc_lookup_table_bytes gauge' in text
+
+
+def test_single_process_exposition(metrics):
+    registry, requests, latency = make_registry(metrics)
+    registry.collector(lambda: [('test_queue', 'gauge', 'Queue', [({}, 3)])])
+    requests.inc('200', amount=2)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    text = registry.expose()
+    assert sample(text, 'test_requests_total{status="200"}') == 2
+    assert sample(text, 'test_seconds_bucket{le="0.1"}') == 1
+    assert sample(text, 'test_seconds_bucket{le="+Inf"}') == 2
+    assert sample(text, 'test_seconds_count') == 2
+    assert sample(text, 'test_queue') == 3
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_workers_are_merged_and_exited_files_folded(metrics, tmp_path):
+    registry, requests, latency = make_registry(metrics, str(tmp_path))
+    registry.collector(lambda: [('test_cache_hits_total', 'counter', 'Hits', [({}, 5)]),
+                                ('test_queue', 'gauge', 'Queue', [({}, 1)])])
+
+    def worker(n):
+        pid = os.fork()
+        if pid == 0:  # after the fork the registry starts from zero
+            requests.inc('200', amount=n)
+            latency.observe(0.5)
+            registry.flush()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        return pid
+
+    first = worker(3)
+    requests.inc('200')
+    text = registry.expose()
+    assert sample(text, 'test_requests_total{status="200"}') == 4
+    assert sample(text, 'test_seconds_count') == 1
+    assert sample(text, 'test_cache_hits_total') == 10
+    # gauges only for live processes
+    assert f'test_queue{{pid="{os.getpid()}"}} 1' in text and f'pid="{first}"' not in text
+
+    registry.collect_exited(first)
+    assert not os.path.exists(tmp_path / f'{first}.json')
+    assert sample(registry.expose(), 'test_requests_total{status="200"}') == 4
+
+    # a new worker with the pid of the exited one adds to the totals instead of replacing them
+    with open(tmp_path / f'{first}.json', 'w') as f:
+        json.dump({'metrics': {'test_requests_total': [[['200'], 2]]}, 'collectors': []}, f)
+    assert sample(registry.expose(), 'test_requests_total{status="200"}') == 6
+    registry.collect_exited(first)
+    second = worker(1)
+    registry.collect_exited(second)
+    text = registry.expose()
+    assert sample(text, 'test_requests_total{status="200"}') == 7
+    assert sample(text, 'test_seconds_count') == 2
+    assert sample(text, 'test_cache_hits_total') == 15
+    assert sorted(os.listdir(tmp_path)) == ['.lock', f'{os.getpid()}.json', 'exited.json']
@@ -0,0 +1,182 @@
+# Every estimator path against the formulas the apps originally shipped with (copied below from
+# Assignment 2's index() and Assignment 3's estimate_resources_local), field for field and with
+# exact equality: scalar, form handler, vectorized batch, lookup table, /api/batch and the CLI.
+import io
+import json
+import math
+import random
+
+import numpy as np
+import pytest
+
+from llm_estimator import COMMON_MODEL_SIZES, LookupTable, estimate_batch, grid_axes, parse_params, round2
+from llm_estimator.cli import RESULT_FIELDS, plan
+
+INPUTS = ('params', 'dataset_size_gb', 'batch_size', 'epochs', 'method', 'precision', 'seq_len', 'gpu_capacity')
+
+
+def baseline_bytes_per_param(precision):
+    if precision == 'fp32':
+        return 4
+    elif precision == 'fp16':
+        return 2
+    elif precision == 'int8':
+        return 1
+    elif precision == 'int4':
+        return 0.5
+    return 2
+
+
+def baseline_memory(params, batch_size, method, precision, seq_len, gpu_capacity):
+    param_mem = params * baseline_bytes_per_param(precision) / 1e9
+    if method == 'full':
+        opt_mem = param_mem * 2
+        act_mem = param_mem * (seq_len / 2048) * (batch_size / 4)
+        total_mem_ft = param_mem + opt_mem + act_mem
+    elif method == 'lora':
+        total_mem_ft = (param_mem * 0.25) + 2
+    else:  # qlora
+        total_mem_ft = (param_mem * 0.15) + 1.5
+    act_mem_inf = param_mem * (seq_len / 2048) * (batch_size / 4)
+    total_mem_inf = param_mem + act_mem_inf
+    return total_mem_ft, math.ceil(total_mem_ft / gpu_capacity), total_mem_inf, math.ceil(total_mem_inf / gpu_capacity)
+
+
+def baseline_estimate(params, dataset_size_gb, batch_size, epochs, method, precision, seq_len=2048, gpu_capacity=80):
+    total_mem_ft, gpus_ft, total_mem_inf, gpus_inf = baseline_memory(params, batch_size, method, precision, seq_len,
+                                                                     gpu_capacity)
+    return {
+        'memory_gb': round(total_mem_ft, 2),
+        'gpu_hours': round(dataset_size_gb * epochs * 0.5 / batch_size, 2),
+        'inf_memory_gb': round(total_mem_inf, 2),
+        'inf_gpu_hours': round(dataset_size_gb * 0.1 / batch_size, 2),
+        'gpus_ft': gpus_ft,
+        'flops_ft': 6 * params,
+        'gpus_inf': gpus_inf,
+        'flops_inf': 2 * params,
+    }
+
+
+# Dropdown values (answered from the lookup table) mixed with off-grid and unknown ones
+def random_configs(n, seed=0):
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(n):
+        if rng.random() < 0.5:
+            params = rng.choice(COMMON_MODEL_SIZES)
+        else:
+            params = f'{rng.uniform(0.05, 500):.3g}B'
+        configs.append({
+            'params': params,
+            'dataset_size_gb': round(rng.uniform(0.1, 500), 3),
+            'batch_size': rng.choice([1, 2, 3, 4, 8, 16, 32, 64, 100]),
+            'epochs': rng.randint(1, 5),
+            'method': rng.choice(['full', 'lora', 'qlora', 'adapter']),
+            'precision': rng.choice(['fp16', 'fp32', 'int8', 'int4', 'bf16']),
+            'seq_len': rng.choice([512, 1024, 2048, 4096, 8192, 16384, 3000]),
+            'gpu_capacity': rng.choice([16, 24, 32, 40, 48, 80, 96]),
+        })
+    return configs
+
+
+CONFIGS = random_configs(2000)
+
+
+def args(config):
+    return (parse_params(config['params']),) + tuple(config[name] for name in INPUTS[1:])
+
+
+@pytest.fixture(scope='module')
+def expected():
+    return [baseline_estimate(*args(config)) for config in CONFIGS]
+
+
+def test_assignment3_local_matches_baseline(assignment3, expected):
+    for config, want in zip(CONFIGS, expected):
+        assert assignment3.estimate_resources_local(*args(config)) == want, config
+
+
+def test_assignment3_form_matches_baseline(assignment3, expected):
+    client = assignment3.app.test_client()
+    for config, want in list(zip(CONFIGS, expected))[:200]:
+        response = client.post('/api/estimate', data=dict(config, calculation_method='local'))
+        assert response.status_code == 200
+        body = response.get_json()
+        assert {name: body[name] for name in RESULT_FIELDS} == want, config
+
+
+def test_assignment2_form_matches_baseline(assignment2):
+    for config in CONFIGS:
+        form = {name: str(config[name]) for name in ('params', 'method', 'precision', 'seq_len', 'batch_size',
+                                                     'gpu_capacity')}
+        total_mem_ft, gpus_ft, total_mem_inf, gpus_inf = baseline_memory(
+            parse_params(config['params']), config['batch_size'], config['method'], config['precision'],
+            config['seq_len'], config['gpu_capacity'])
+        result = assignment2.estimate_form(form)
+        assert result['fine_tune'] == {'total_mem': round(total_mem_ft, 2), 'gpus': gpus_ft,
+                                       'flops': 6 * parse_params(config['params'])}, config
+        assert result['inference'] == {'total_mem': round(total_mem_inf, 2), 'gpus': gpus_inf,
+                                       'flops': 2 * parse_params(config['params'])}, config
+
+
+def test_estimate_batch_matches_baseline(expected):
+    columns = list(zip(*(args(config) for config in CONFIGS)))
+    results = estimate_batch(*[np.array(column) for column in columns])
+    for name in RESULT_FIELDS:
+        assert results[name].tolist() == [want[name] for want in expected], name
+
+
+def test_api_batch_matches_baseline(assignment3, expected):
+    response = assignment3.app.test_client().post('/api/batch', json={'configs': CONFIGS})
+    assert response.status_code == 200
+    for row, want in zip(response.get_json()['results'], expected):
+        assert {name: row[name] for name in RESULT_FIELDS} == want
+
+
+def test_lookup_table_matches_baseline():
+    axes = grid_axes()
+    table = LookupTable.build()
+    for params in axes['params']:
+        for method in axes['method']:
+            for precision in axes['precision']:
+                for batch_size in axes['batch_size']:
+                    for seq_len in axes['seq_len']:
+                        for gpu_capacity in axes['gpu_capacity']:
+                            total_mem_ft, gpus_ft, total_mem_inf, gpus_inf = baseline_memory(
+                                params, batch_size, method, precision, seq_len, gpu_capacity)
+                            want = (round(total_mem_ft, 2), round(total_mem_inf, 2), gpus_ft, gpus_inf)
+                            assert table.get(params, method, precision, batch_size, seq_len, gpu_capacity) == want
+
+
+@pytest.mark.parametrize('in_format', ['csv', 'jsonl'])
+def test_cli_plan_matches_baseline(expected, in_format):
+    src = io.StringIO()
+    if in_format == 'csv':
+        src.write(','.join(INPUTS) + '\n')
+        src.writelines(','.join(str(config[name]) for name in INPUTS) + '\n' for config in CONFIGS)
+    else:
+        src.writelines(json.dumps(config) + '\n' for config in CONFIGS)
+    src.seek(0)
+    dst = io.StringIO()
+    total, failed = plan(src, dst, in_format, 'jsonl', chunk_size=300)
+    assert (total, failed) == (len(CONFIGS), 0)
+    rows = [json.loads(line) for line in dst.getvalue().splitlines()]
+    for row, want in zip(rows, expected):
+        assert {name: row[name] for name in RESULT_FIELDS} == want
+
+
+# Where x * 100 stops being exact in a float64 (|x| around 1e14 and up)
+def test_round2_matches_round_for_large_values():
+    rng = np.random.default_rng(0)
+    x = np.exp(rng.uniform(np.log(1e10), np.log(1e20), 200_000)) * rng.choice([-1, 1], 200_000)
+    assert round2(x).tolist() == [round(v, 2) for v in x.tolist()]
+
+
+def test_estimate_batch_matches_baseline_at_large_scale():
+    rng = random.Random(1)
+    configs = [dict(config, params=f'{rng.uniform(1e3, 1e8):.6g}B', dataset_size_gb=rng.uniform(1e12, 1e17))
+               for config in CONFIGS[:500]]
+    columns = list(zip(*(args(config) for config in configs)))
+    results = estimate_batch(*[np.array(column) for column in columns])
+    for name in RESULT_FIELDS:
+        assert results[name].tolist() == [baseline_estimate(*args(config))[name] for config in configs], name
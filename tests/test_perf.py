@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from llm_estimator import EstimateConfig, HARDWARE_PROFILES, estimate, performance, performance_arrays
+
+# 56 GB to fine-tune, 28 GB for inference: one 80 GB card, three / two 24 GB ones
+JOB = {'params': 7e9, 'method': 'full', 'precision': 'fp16', 'seq_len': 2048, 'batch_size': 4}
+FORM = {'params': '7B', 'dataset_size_gb': 10, 'batch_size': 4, 'epochs': 1, 'method': 'full', 'precision': 'fp16',
+        'seq_len': 2048, 'gpu_capacity': 80, 'calculation_method': 'local', 'hardware': 'l4'}
+
+
+@pytest.mark.parametrize('hardware', list(HARDWARE_PROFILES))
+def test_gpu_counts_follow_the_profile_memory(hardware):
+    est = estimate(EstimateConfig(**JOB, gpu_capacity=HARDWARE_PROFILES[hardware].memory_gb))
+    perf = performance(**JOB, hardware=hardware)
+    assert (perf['gpus_ft'], perf['gpus_inf']) == (est.gpus_ft, est.gpus_inf)
+
+
+def test_scalar_matches_arrays():
+    hardware = np.array(list(HARDWARE_PROFILES))
+    arrays = performance_arrays(JOB['params'], JOB['method'], JOB['precision'], JOB['seq_len'], JOB['batch_size'],
+                                dataset_size_gb=10, hardware=hardware)
+    for i, name in enumerate(hardware):
+        perf = performance(**JOB, dataset_size_gb=10, hardware=str(name))
+        for field, values in arrays.items():
+            assert perf[field] == pytest.approx(np.broadcast_to(values, hardware.shape)[i], abs=0.01), (name, field)
+
+
+def test_more_gpus_speed_up_compute_bound_training():
+    one = performance(**JOB, dataset_size_gb=10, gpus_ft=1, gpus_inf=1)
+    four = performance(**JOB, dataset_size_gb=10, gpus_ft=4, gpus_inf=4)
+    assert four['train_tokens_per_sec'] > one['train_tokens_per_sec']
+    assert four['train_hours'] < one['train_hours']
+    assert four['decode_ms_per_token'] < one['decode_ms_per_token']
+
+
+def test_decode_reads_every_weight_once_per_token():
+    perf = performance_arrays(**JOB, hardware='a100-80gb', gpus_inf=1)
+    weights_seconds = JOB['params'] * 2 / (HARDWARE_PROFILES['a100-80gb'].hbm_gb_s * 1e9)
+    assert perf['decode_memory_bound']
+    assert perf['decode_ms_per_token'] > weights_seconds * 1e3
+
+
+def test_unknown_hardware_is_rejected():
+    with pytest.raises(ValueError, match='unknown hardware tpu'):
+        performance(**JOB, hardware='tpu')
+
+
+def test_assignment2_ignores_gpu_capacity_for_performance(assignment2):
+    result = assignment2.app.test_client().post('/api/estimate', data=FORM).get_json()
+    assert result['fine_tune']['gpus'] == 1
+    assert (result['performance']['gpus_ft'], result['performance']['gpus_inf']) == (3, 2)
+
+
+def test_assignment3_ignores_gpu_capacity_for_performance(assignment3):
+    client = assignment3.app.test_client()
+    perf = client.post('/api/estimate', data=FORM).get_json()['perf']
+    assert (perf['gpus_ft'], perf['gpus_inf']) == (3, 2)
+    grid = {name: FORM[name] for name in assignment3.BATCH_FIELDS}
+    response = client.post('/api/batch', json={'grid': dict(grid, hardware=['l4', 'a100-80gb']), 'perf': True})
+    rows = response.get_json()['results']
+    assert [(row['gpus_ft'], row['perf_gpus_ft']) for row in rows] == [(1, 3), (1, 1)]
@@ -0,0 +1,44 @@
+import time
+
+FORM = {'params': '7B', 'dataset_size_gb': 10, 'batch_size': 4, 'epochs': 1, 'method': 'full', 'precision': 'fp16',
+        'seq_len': 2048, 'gpu_capacity': 80, 'calculation_method': 'parallel'}
+
+
+def poll(client, job):
+    for _ in range(100):
+        body = client.get(job['poll']).get_json()
+        if body['status'] != 'pending':
+            return body
+        time.sleep(0.02)
+    raise AssertionError('job did not finish')
+
+
+def test_parallel_upgrade_ignores_partial_and_implausible_answers(assignment3, monkeypatch):
+    from providers import FunctionProvider, register_provider
+
+    local = assignment3.estimate_resources_local(7e9, 10, 4, 1, 'full', 'fp16', 2048, 80)
+    register_provider(FunctionProvider('test-partial', lambda *args: {'memory_gb': 1.0}))
+    register_provider(FunctionProvider('test-wild', lambda *args: dict(local, gpus_ft=10_000)))
+    register_provider(FunctionProvider('test-text', lambda *args: dict(local, memory_gb='56')))
+    register_provider(FunctionProvider('test-good', lambda *args: (time.sleep(0.05), dict(local, memory_gb=60.0))[1]))
+    client = assignment3.app.test_client()
+
+    monkeypatch.setattr(assignment3, 'PARALLEL_PROVIDERS', ['test-partial', 'test-wild', 'test-text'])
+    job = client.post('/api/estimate', data=FORM).get_json()['upgrade']
+    assert poll(client, job)['result'] is None
+
+    monkeypatch.setattr(assignment3, 'PARALLEL_PROVIDERS', ['test-partial', 'test-good'])
+    job = client.post('/api/estimate', data=FORM).get_json()['upgrade']
+    result = poll(client, job)['result']
+    assert result['source'] == 'test-good' and result['memory_gb'] == 60.0
+
+
+def test_parallel_answers_locally_when_the_queue_is_full(assignment3, monkeypatch):
+    monkeypatch.setattr(assignment3.gemini_jobs, 'max_pending', 0)
+    before = assignment3.gemini_fallbacks.value('queue_full')
+    response = assignment3.app.test_client().post('/api/estimate', data=FORM)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['source'] == 'local' and 'upgrade' not in body
+    assert body['memory_gb'] == assignment3.estimate_resources_local(7e9, 10, 4, 1, 'full', 'fp16', 2048, 80)['memory_gb']
+    assert assignment3.gemini_fallbacks.value('queue_full') == before + 1
@@ -0,0 +1,208 @@
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class Transient(Exception):
+    pass
+
+
+class Fatal(Exception):
+    pass
+
+
+@pytest.fixture
+def resilience(assignment3):
+    import resilience
+    return resilience
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_guard(resilience, clock, breaker=None, rate=100, burst=100, inflight=8, budget=None, max_attempts=3):
+    sleeps = []
+    guard = resilience.Guard(
+        resilience.TokenBucket(rate, burst, clock=clock),
+        resilience.ConcurrencyLimit(inflight),
+        breaker or resilience.CircuitBreaker(min_calls=4, window=10, open_seconds=30, clock=clock),
+        budget or resilience.RetryBudget(clock=clock),
+        max_attempts=max_attempts,
+        retryable=lambda exc: isinstance(exc, Transient),
+        clock=clock,
+        sleep=sleeps.append,
+    )
+    return guard, sleeps
+
+
+def test_token_bucket_refills_at_rate(resilience, clock):
+    bucket = resilience.TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock.advance(0.5)
+    assert bucket.try_acquire() and not bucket.try_acquire()
+    clock.advance(10)
+    assert bucket.tokens() == 3
+
+
+def test_breaker_opens_half_opens_and_closes(resilience, clock):
+    breaker = resilience.CircuitBreaker(failure_rate=0.5, min_calls=4, open_seconds=30, half_open_calls=2,
+                                        clock=clock)
+    for ok in (True, False, True):
+        assert breaker.allow()
+        breaker.record(ok, 0.1)
+    assert breaker.state == 'closed'
+    breaker.record(False, 0.1)  # 2 of 4 failed
+    assert breaker.state == 'open' and breaker.opened == 1
+    clock.advance(29.9)
+    assert not breaker.allow()
+    clock.advance(0.1)
+    assert breaker.allow() and breaker.allow() and not breaker.allow()
+    assert breaker.state == 'half_open'
+    breaker.record(True, 0.1)
+    breaker.record(True, 0.1)
+    assert breaker.state == 'closed' and breaker.stats()['window_calls'] == 0
+
+
+def test_breaker_reopens_on_failed_trial_and_counts_slow_calls(resilience, clock):
+    breaker = resilience.CircuitBreaker(slow_seconds=5, slow_rate=0.5, min_calls=2, open_seconds=10, clock=clock)
+    breaker.record(True, 5)
+    breaker.record(True, 6)
+    assert breaker.state == 'open'
+    clock.advance(10)
+    assert breaker.allow()
+    breaker.record(False, 0.1)
+    assert breaker.state == 'open' and breaker.opened == 2
+    clock.advance(9)
+    assert not breaker.allow()
+
+
+def test_retry_budget(resilience, clock):
+    budget = resilience.RetryBudget(ratio=0.5, min_per_second=1, max_tokens=2, clock=clock)
+    assert budget.try_withdraw() and budget.try_withdraw() and not budget.try_withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_withdraw() and not budget.try_withdraw()
+    clock.advance(1)
+    assert budget.try_withdraw()
+
+
+def test_guard_retries_transient_errors_with_backoff(resilience, clock):
+    guard, sleeps = make_guard(resilience, clock)
+    calls = []
+
+    def flaky():
+        calls.append(clock())
+        clock.advance(0.1)
+        if len(calls) < 3:
+            raise Transient('503')
+        return 'ok'
+    assert guard.call(flaky) == 'ok'
+    assert len(calls) == 3 and len(sleeps) == 2
+    assert all(0 <= s <= guard.max_delay for s in sleeps)
+    stats = guard.stats()
+    assert stats['retries'] == 2 and stats['inflight'] == 0
+    assert stats['breaker']['window_calls'] == 3 and stats['breaker']['failure_rate'] == round(2 / 3, 4)
+
+
+def test_guard_gives_up_after_max_attempts(resilience, clock):
+    guard, sleeps = make_guard(resilience, clock, max_attempts=2)
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise Transient('timeout')
+    with pytest.raises(Transient):
+        guard.call(down)
+    assert len(calls) == 2 and len(sleeps) == 1
+
+
+def test_non_retryable_errors_are_not_retried_or_counted_by_the_breaker(resilience, clock):
+    guard, sleeps = make_guard(resilience, clock)
+    calls = []
+
+    def unauthorized():
+        calls.append(1)
+        raise Fatal('401')
+    for _ in range(10):
+        with pytest.raises(Fatal):
+            guard.call(unauthorized)
+    assert len(calls) == 10 and not sleeps
+    assert guard.breaker.state == 'closed' and guard.breaker.stats()['failure_rate'] == 0
+    with pytest.raises(Fatal):
+        with guard.attempt():
+            raise Fatal('403')
+    assert guard.breaker.state == 'closed'
+
+
+def test_guard_opens_breaker_and_sheds(resilience, clock):
+    guard, _ = make_guard(resilience, clock, max_attempts=1)
+
+    def down():
+        raise Transient('503')
+    for _ in range(4):
+        with pytest.raises(Transient):
+            guard.call(down)
+    with pytest.raises(resilience.Rejected) as rejected:
+        guard.call(lambda: 'ok')
+    assert rejected.value.reason == 'breaker_open'
+    clock.advance(30)
+    assert guard.call(lambda: 'ok') == 'ok'
+    assert guard.stats()['shed']['breaker_open'] == 1
+
+
+def test_guard_sheds_when_rate_or_concurrency_is_exhausted(resilience, clock):
+    guard, _ = make_guard(resilience, clock, rate=1, burst=1, inflight=1)
+    assert guard.call(lambda: 'ok') == 'ok'
+    with pytest.raises(resilience.Rejected) as rejected:
+        guard.call(lambda: 'ok')
+    assert rejected.value.reason == 'rate_limited'
+    clock.advance(1)
+    with guard.attempt():
+        clock.advance(1)
+        with pytest.raises(resilience.Rejected) as rejected:
+            guard.call(lambda: 'ok')
+        assert rejected.value.reason == 'concurrency'
+    assert guard.stats()['shed'] == {'breaker_open': 0, 'rate_limited': 1, 'concurrency': 1}
+
+
+def test_retry_budget_limits_retries(resilience, clock):
+    budget = resilience.RetryBudget(ratio=0, min_per_second=0, max_tokens=1, clock=clock)
+    guard, sleeps = make_guard(resilience, clock, budget=budget, max_attempts=5)
+    with pytest.raises(Transient):
+        guard.call(lambda: (_ for _ in ()).throw(Transient('503')))
+    assert len(sleeps) == 1
+    assert guard.stats()['retries'] == 1 and guard.stats()['retries_denied'] == 1
+
+
+def test_abandoned_stream_does_not_count_against_the_breaker(resilience, clock):
+    breaker = resilience.CircuitBreaker(min_calls=1, open_seconds=1, half_open_calls=1, clock=clock)
+    guard, _ = make_guard(resilience, clock, breaker=breaker)
+    breaker.record(False, 0)
+    clock.advance(1)
+
+    def stream():
+        with guard.attempt():
+            yield 1
+            yield 2
+    consumer = stream()
+    next(consumer)
+    consumer.close()
+    assert breaker.state == 'half_open' and breaker.allow()
+
+
+def test_guard_from_env_reads_max_attempts(resilience, monkeypatch):
+    monkeypatch.setenv('TESTAPI_MAX_ATTEMPTS', '5')
+    monkeypatch.setenv('TESTAPI_RATE', '3')
+    guard = resilience.guard_from_env('TESTAPI')
+    assert guard.max_attempts == 5 and guard.bucket.rate == 3
@@ -0,0 +1,73 @@
+import pytest
+
+from llm_estimator import EstimateConfig, estimate, solve
+
+SEQ_LENS = (256, 512, 1024, 2048, 4096, 8192, 16384)
+PHASES = {'fine_tune': ('total_mem_ft', 'gpus_ft'), 'inference': ('total_mem_inf', 'gpus_inf')}
+
+
+# Try every (seq_len, batch_size) with the scalar estimator and keep the undominated fitting points
+def brute_force(params, method, precision, gpu_capacity, num_gpus, max_batch_size):
+    budget = gpu_capacity * num_gpus
+    expected = {}
+    for phase, (mem_field, gpus_field) in PHASES.items():
+        best = {}
+        for seq_len in SEQ_LENS:
+            best[seq_len] = (0, None)
+            for batch_size in range(1, max_batch_size + 1):
+                est = estimate(EstimateConfig(params=params, method=method, precision=precision, seq_len=seq_len,
+                                              batch_size=batch_size, gpu_capacity=gpu_capacity))
+                if getattr(est, mem_field) <= budget:
+                    best[seq_len] = (batch_size, est)
+        frontier = [
+            {'seq_len': s, 'batch_size': b, 'total_mem': round(getattr(est, mem_field), 2),
+             'gpus': getattr(est, gpus_field)}
+            for s, (b, est) in best.items()
+            if b and not any(other > s and best[other][0] >= b for other in best)
+        ]
+        expected[phase] = (frontier, {str(s): b for s, (b, _) in best.items()})
+    return expected
+
+
+@pytest.mark.parametrize('params, method, precision, gpu_capacity, num_gpus', [
+    (7e9, 'full', 'fp16', 80, 1),
+    (7e9, 'full', 'fp16', 40, 2),
+    (13e9, 'lora', 'int8', 24, 1),
+    (70e9, 'qlora', 'int4', 48, 3),
+    (1.3e9, 'full', 'fp32', 16, 4),
+    (175e9, 'full', 'fp16', 80, 1),
+])
+def test_solve_matches_brute_force(params, method, precision, gpu_capacity, num_gpus):
+    result = solve(params, method, precision, gpu_capacity, num_gpus, SEQ_LENS, max_batch_size=64)
+    for phase, (frontier, max_batch) in brute_force(params, method, precision, gpu_capacity, num_gpus, 64).items():
+        assert result[phase]['frontier'] == frontier, phase
+        assert result[phase]['max_batch_size'] == max_batch, phase
+        assert all(point['gpus'] <= num_gpus for point in frontier)
+
+
+@pytest.mark.parametrize('gpu_capacity, num_gpus', [(40.9, 2), (0.5, 1), (0, 1), (80, 0), (80, 1.5),
+                                                    (float('inf'), 1), (float('nan'), 1)])
+def test_solve_rejects_invalid_budget(gpu_capacity, num_gpus):
+    with pytest.raises(ValueError):
+        solve(7e9, 'full', 'fp16', gpu_capacity, num_gpus)
+
+
+@pytest.mark.parametrize('app_fixture', ['assignment2', 'assignment3'])
+@pytest.mark.parametrize('query', [{'gpu_capacity': '40.9', 'num_gpus': '2'}, {'gpu_capacity': '0.5'},
+                                   {'num_gpus': '2.5'}])
+def test_solve_endpoint_rejects_fractional_budget(app_fixture, query, request):
+    client = request.getfixturevalue(app_fixture).app.test_client()
+    response = client.get('/api/solve', query_string=dict(query, params='7B'))
+    assert response.status_code == 400
+    assert 'positive integers' in response.get_json()['error']
+    response = client.post('/api/solve', json={'params': '7B', 'gpu_capacity': 40.9, 'num_gpus': 2})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('app_fixture', ['assignment2', 'assignment3'])
+def test_solve_endpoint(app_fixture, request):
+    client = request.getfixturevalue(app_fixture).app.test_client()
+    body = client.get('/api/solve', query_string={'params': '7B', 'gpu_capacity': '40', 'num_gpus': '2',
+                                                  'seq_lens': '2048,8192'}).get_json()
+    assert body['budget_gb'] == 80 and body['gpu_capacity'] == 40
+    assert body == solve(7e9, 'full', 'fp16', 40, 2, [2048, 8192])
@@ -0,0 +1,57 @@
+import json
+import threading
+import time
+
+import pytest
+
+ANSWER = {'memory_gb': 56.0, 'gpu_hours': 1.25, 'inf_memory_gb': 28.0, 'inf_gpu_hours': 0.25,
+          'gpus_ft': 1, 'flops_ft': 4.2e10, 'gpus_inf': 1, 'flops_inf': 1.4e10}
+ARGS = (7e9, 10.0, 4, 1, 'full', 'fp16', 2048, 80)
+
+
+@pytest.fixture
+def upstream(assignment3, monkeypatch):
+    calls = []
+
+    def fake_stream(prompt):
+        calls.append(prompt)
+        text = json.dumps(ANSWER)
+        for i in range(0, len(text), 16):
+            time.sleep(0.01)
+            yield text[i:i + 16]
+    monkeypatch.setattr(assignment3, 'stream_generate_content', fake_stream)
+    assignment3.gemini_cache.clear()
+    yield calls
+    assignment3.gemini_cache.clear()
+
+
+def test_identical_streams_share_one_upstream_call(assignment3, upstream):
+    results = []
+
+    def consume():
+        events = list(assignment3.stream_gemini_estimate(*ARGS))
+        results.append(events[-1])
+    threads = [threading.Thread(target=consume) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(upstream) == 1
+    assert [name for name, _ in results] == ['result'] * 5
+    assert all(data == results[0][1] for _, data in results)
+    assert assignment3.gemini_cache.stats()['coalesced'] == 4
+
+
+def test_waiting_stream_falls_back_when_the_first_is_abandoned(assignment3, upstream):
+    leader = assignment3.stream_gemini_estimate(*ARGS)
+    assert next(leader)[0] == 'local'
+    assert next(leader)[0] == 'field'  # upstream call in flight
+    events = []
+    follower = threading.Thread(target=lambda: events.extend(assignment3.stream_gemini_estimate(*ARGS)))
+    follower.start()
+    time.sleep(0.05)
+    leader.close()  # client went away
+    follower.join(5)
+    assert len(upstream) == 1
+    name, data = events[-1]
+    assert name == 'result' and data['source'].startswith('local fallback')
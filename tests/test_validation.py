@@ -0,0 +1,40 @@
+import pytest
+
+from llm_estimator import parse_finite, parse_params
+
+ASSIGNMENT2_FORM = {'params': '7B', 'method': 'full', 'precision': 'fp16', 'seq_len': 2048, 'batch_size': 4,
+                    'gpu_capacity': 80}
+ASSIGNMENT3_FORM = dict(ASSIGNMENT2_FORM, dataset_size_gb=10, epochs=1, calculation_method='local')
+
+
+@pytest.mark.parametrize('text', ['inf', '-inf', 'nan', '1e400', '1e300B', 'infM'])
+def test_parse_params_rejects_non_finite(text):
+    with pytest.raises(ValueError, match='finite'):
+        parse_params(text)
+
+
+def test_parse_finite():
+    assert parse_finite('2.5') == 2.5
+    with pytest.raises(ValueError, match='dataset_size_gb must be a finite number'):
+        parse_finite('nan', 'dataset_size_gb')
+
+
+@pytest.mark.parametrize('app_fixture, form', [('assignment2', ASSIGNMENT2_FORM), ('assignment3', ASSIGNMENT3_FORM)])
+@pytest.mark.parametrize('field, value', [('params', 'inf'), ('params', '1e400'), ('params', 'nan')])
+def test_api_estimate_rejects_non_finite_input(app_fixture, form, field, value, request):
+    client = request.getfixturevalue(app_fixture).app.test_client()
+    response = client.post('/api/estimate', data=dict(form, **{field: value}))
+    assert response.status_code == 400
+    assert 'finite' in response.get_json()['error']
+
+
+def test_assignment3_rejects_non_finite_dataset_size(assignment3):
+    response = assignment3.app.test_client().post('/api/estimate', data=dict(ASSIGNMENT3_FORM, dataset_size_gb='1e400'))
+    assert response.status_code == 400
+    assert 'dataset_size_gb must be a finite number' in response.get_json()['error']
+
+
+def test_assignment2_rejects_overflowing_memory(assignment2):
+    response = assignment2.app.test_client().post('/api/estimate', data=dict(ASSIGNMENT2_FORM, params='1.7e308',
+                                                                              precision='fp32'))
+    assert response.status_code == 400
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.mark.parametrize('app_fixture', ['assignment2', 'assignment3'])
+def test_shell_page_varies_on_accept(app_fixture, request):
+    client = request.getfixturevalue(app_fixture).app.test_client()
+    page = client.get('/')
+    assert page.status_code == 200
+    assert page.cache_control.public
+    assert {'Accept', 'Accept-Encoding'} <= set(page.vary)
+    assert client.get('/', headers={'Accept': 'application/json'}).mimetype == 'application/json'